@@ -33,7 +33,9 @@ from server.models import (
     permissao_model,
     usuario_model,
     vinculo_usuario_funcao_model,
-    vinculo_permissao_funcao_model
+    vinculo_permissao_funcao_model,
+    evento_outbox_model,
+    email_fila_model
 )
 
 
@@ -0,0 +1,46 @@
+"""empty message
+
+Revision ID: 9a4f6d2c8e15
+Revises: 5c7e2b9d1f36
+Create Date: 2026-10-18 16:37:52.214809
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4f6d2c8e15'
+down_revision = '5c7e2b9d1f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tb_email_fila', sa.Column('falhou_em', sa.DateTime(), nullable=True))
+    op.add_column('tb_evento_outbox', sa.Column('falhou_em', sa.DateTime(), nullable=True))
+
+    # Os índices parciais passam a ignorar os itens com falha definitiva
+    op.drop_index('ix_tb_email_fila_pendente', table_name='tb_email_fila')
+    op.create_index('ix_tb_email_fila_pendente', 'tb_email_fila', ['id'], unique=False,
+                    postgresql_where=sa.text('enviado_em IS NULL AND falhou_em IS NULL'))
+    op.drop_index('ix_tb_evento_outbox_usuario_pendente', table_name='tb_evento_outbox')
+    op.drop_index('ix_tb_evento_outbox_pendente', table_name='tb_evento_outbox')
+    op.create_index('ix_tb_evento_outbox_pendente', 'tb_evento_outbox', ['id'], unique=False,
+                    postgresql_where=sa.text('publicado_em IS NULL AND falhou_em IS NULL'))
+    op.create_index('ix_tb_evento_outbox_usuario_pendente', 'tb_evento_outbox', ['guid_usuario', 'id'], unique=False,
+                    postgresql_where=sa.text('publicado_em IS NULL AND falhou_em IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_tb_evento_outbox_usuario_pendente', table_name='tb_evento_outbox')
+    op.drop_index('ix_tb_evento_outbox_pendente', table_name='tb_evento_outbox')
+    op.create_index('ix_tb_evento_outbox_pendente', 'tb_evento_outbox', ['id'], unique=False,
+                    postgresql_where=sa.text('publicado_em IS NULL'))
+    op.create_index('ix_tb_evento_outbox_usuario_pendente', 'tb_evento_outbox', ['guid_usuario', 'id'], unique=False,
+                    postgresql_where=sa.text('publicado_em IS NULL'))
+    op.drop_index('ix_tb_email_fila_pendente', table_name='tb_email_fila')
+    op.create_index('ix_tb_email_fila_pendente', 'tb_email_fila', ['id'], unique=False,
+                    postgresql_where=sa.text('enviado_em IS NULL'))
+    op.drop_column('tb_evento_outbox', 'falhou_em')
+    op.drop_column('tb_email_fila', 'falhou_em')
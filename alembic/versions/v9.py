@@ -0,0 +1,30 @@
+"""empty message
+
+Revision ID: 5c7e2b9d1f36
+Revises: d41a6f93e0b8
+Create Date: 2026-10-18 14:21:06.418372
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7e2b9d1f36'
+down_revision = 'd41a6f93e0b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A paginação de GET /users utiliza a chave (created_at, id): usuários
+    # sem created_at seriam ignorados pela comparação da chave
+    op.execute(
+        "UPDATE tb_usuario SET created_at = COALESCE(updated_at, TIMESTAMP 'epoch') "
+        "WHERE created_at IS NULL"
+    )
+    op.alter_column('tb_usuario', 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    op.alter_column('tb_usuario', 'created_at', existing_type=sa.DateTime(), nullable=True)
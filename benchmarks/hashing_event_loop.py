@@ -0,0 +1,90 @@
+"""
+    Benchmark da latência de /ping enquanto logins saturam o hashing de senhas
+
+    Compara o bcrypt executado diretamente no event loop (comportamento antigo)
+    com o HashingService utilizando o pool de processos.
+
+    Uso: python -m benchmarks.hashing_event_loop [--duration 10] [--logins 16]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from httpx import AsyncClient
+from server import _init_app
+from server.configuration.hashing_executor import build_hashing_executor
+from server.services import hashing_service
+from server.services.hashing_service import HashingService
+
+
+HASHED_PASSWORD = hashing_service.criptografa_senha("pass")
+
+
+async def login_inline(stop_at: float):
+    while time.perf_counter() < stop_at:
+        hashing_service.verifica_senha("pass", HASHED_PASSWORD)
+        await asyncio.sleep(0)
+
+
+async def login_executor(service: HashingService, stop_at: float):
+    while time.perf_counter() < stop_at:
+        await service.verifica_senha("pass", HASHED_PASSWORD)
+
+
+async def ping(client: AsyncClient, stop_at: float, interval: float):
+    """
+        As requisições são agendadas em intervalos fixos. A latência é medida
+        a partir do horário agendado, incluindo o tempo em que o event loop
+        ficou bloqueado
+    """
+    latencies = []
+    scheduled = time.perf_counter()
+    while scheduled < stop_at:
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        await client.get("/ping")
+        latencies.append(time.perf_counter() - scheduled)
+        scheduled += interval
+    return latencies
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(mode: str, duration: float, logins: int):
+    app = _init_app()
+    executor = build_hashing_executor('process', 0)
+    service = HashingService(executor)
+
+    # Aquecimento do pool de processos
+    await asyncio.gather(*[service.verifica_senha("pass", HASHED_PASSWORD) for _ in range(os.cpu_count() or 1)])
+
+    async with AsyncClient(app=app, base_url="http://benchmark") as client:
+        stop_at = time.perf_counter() + duration
+        if mode == 'inline':
+            login_tasks = [login_inline(stop_at) for _ in range(logins)]
+        else:
+            login_tasks = [login_executor(service, stop_at) for _ in range(logins)]
+        latencies, *_ = await asyncio.gather(ping(client, stop_at, 0.01), *login_tasks)
+
+    executor.shutdown()
+
+    print(
+        f"{mode:>8} | pings={len(latencies):>5} | "
+        f"p50={statistics.median(latencies) * 1000:8.2f}ms | "
+        f"p99={percentile(latencies, 0.99) * 1000:8.2f}ms | "
+        f"max={max(latencies) * 1000:8.2f}ms"
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--logins', type=int, default=16)
+    args = parser.parse_args()
+
+    for mode in ['inline', 'executor']:
+        asyncio.run(run(mode, args.duration, args.logins))
@@ -0,0 +1,124 @@
+"""
+    Benchmark da vazão de requisições com os logs desligados, com o
+    StreamHandler síncrono (comportamento antigo) e com o pipeline QueueHandler/QueueListener
+
+    As requisições são feitas em GET /users/me, que registra 5 linhas por requisição
+    (endpoint_exception_handler e get_current_user). Os logs são escritos em --log-file;
+    --write-delay-us simula um stdout lento (ex.: pipe do coletor de logs cheio).
+
+    Uso: python -m benchmarks.logging_throughput [--requests 5000] [--concurrency 20] [--log-file /dev/null] [--write-delay-us 0]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import timedelta
+from httpx import AsyncClient
+from mock import Mock
+from server import _init_app
+from server.configuration.custom_logging import Logger, MICROSERVICE_LOGGER_NAME, get_main_logger
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.services.usuario_service import UsuarioService
+
+
+class SlowWriter:
+
+    def __init__(self, file, delay: float):
+        self.file = file
+        self.delay = delay
+
+    def write(self, data: str):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+
+def build_environment():
+    return Mock(
+        ACCESS_TOKEN_SECRET_KEY="secret",
+        ACCESS_TOKEN_ALGORITHM="HS256",
+        ACCESS_TOKEN_EMBED_PERMISSIONS=False,
+        ACCESS_TOKEN_CACHE_MAX_SIZE=1000,
+        ACCESS_TOKEN_PRIVATE_KEYS={},
+        ACCESS_TOKEN_ACTIVE_KID='',
+        PERMISSION_SNAPSHOT_TTL_IN_SECONDS=300
+    )
+
+
+def build_token() -> str:
+    return UsuarioService.gera_token(
+        {
+            'guid': str(uuid.uuid4()),
+            'name': 'Teste',
+            'email': 'teste@unicamp.br',
+            'username': 'user',
+            'roles': []
+        },
+        timedelta(seconds=1800),
+        'secret',
+        'HS256'
+    )
+
+
+def configura_modo(mode: str):
+    logger = get_main_logger()
+    logger.disabled = mode == 'off'
+    if mode == 'sync':
+        listener = Logger.LISTENERS[MICROSERVICE_LOGGER_NAME]
+        Logger.stop_listener(MICROSERVICE_LOGGER_NAME)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        for handler in listener.handlers:
+            logger.addHandler(handler)
+
+
+async def run(mode: str, requests: int, concurrency: int) -> float:
+    app = _init_app()
+    app.dependency_overrides[get_environment_cached] = build_environment
+    configura_modo(mode)
+
+    headers = {'Authorization': f'Bearer {build_token()}'}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with AsyncClient(app=app, base_url="http://benchmark") as client:
+
+        async def request():
+            async with semaphore:
+                response = await client.get("/users/me", headers=headers)
+                assert response.status_code == 200
+
+        await request()
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    Logger.stop_listeners()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--log-file', default='/dev/null')
+    parser.add_argument('--write-delay-us', type=float, default=0)
+    args = parser.parse_args()
+
+    with open(args.log_file, 'w') as log_file:
+        for mode in ['off', 'sync', 'queue']:
+            sys.stdout = SlowWriter(log_file, args.write_delay_us / 1e6)
+            try:
+                elapsed = asyncio.run(run(mode, args.requests, args.concurrency))
+            finally:
+                sys.stdout = sys.__stdout__
+            print(f"{mode:>6} | {args.requests / elapsed:8.1f} req/s | "
+                  f"{elapsed / args.requests * 1e6:8.1f} us/req")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+    Benchmark do envio de e-mails com e sem o pool de conexões SMTP
+
+    Sobe um servidor SMTP local (aiosmtpd) que descarta as mensagens e compara
+    o FastMail original (uma conexão por mensagem) com o SMTPConnectionPool.
+    O atraso artificial de cada comando simula a latência de rede até o MAIL_SERVER.
+
+    Requer: pip install aiosmtpd
+    Uso: python -m benchmarks.smtp_pool [--messages 500] [--concurrency 20] [--pool-size 0] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import time
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP as SMTPServer
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema
+from server.configuration.smtp_pool import SMTPConnectionPool
+
+
+class DiscardHandler:
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        return '250 OK'
+
+
+class LatencySMTPServer(SMTPServer):
+
+    """
+        Simula a latência do handshake de uma nova conexão
+    """
+
+    latency = 0.0
+
+    async def _handle_client(self):
+        await asyncio.sleep(self.latency)
+        await super()._handle_client()
+
+
+def build_config(port: int) -> ConnectionConfig:
+    return ConnectionConfig(
+        MAIL_USERNAME='bench',
+        MAIL_PASSWORD='bench',
+        MAIL_FROM='noreply@unicamp.br',
+        MAIL_PORT=port,
+        MAIL_SERVER='127.0.0.1',
+        MAIL_TLS=False,
+        MAIL_SSL=False,
+        USE_CREDENTIALS=False
+    )
+
+
+def build_message(i: int) -> MessageSchema:
+    return MessageSchema(
+        subject=f"Verificação {i}",
+        recipients=["teste@unicamp.br"],
+        html="<p>Clique no link para verificar o seu e-mail</p>",
+        subtype="html"
+    )
+
+
+async def run(email_api, messages: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i):
+        async with semaphore:
+            await email_api.send_message(build_message(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(messages)))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--pool-size', type=int, default=0, help='0 utiliza o valor de --concurrency')
+    parser.add_argument('--latency-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    LatencySMTPServer.latency = latency
+
+    class BenchController(Controller):
+        def factory(self):
+            return LatencySMTPServer(self.handler)
+
+    controller = BenchController(DiscardHandler(latency), hostname='127.0.0.1', port=8025)
+    controller.start()
+    try:
+        config = build_config(controller.port)
+        pool = SMTPConnectionPool.from_config(config, args.pool_size or args.concurrency, 100, 30, 300)
+        for name, email_api in [('sem pool', FastMail(config)), ('com pool', pool)]:
+            elapsed = await run(email_api, args.messages, args.concurrency)
+            print(f"{name:>8} | {args.messages / elapsed:8.1f} mensagens/s | {elapsed:6.2f} s")
+        print(f"Conexões abertas pelo pool: {pool.connections_opened}")
+        await pool.close()
+    finally:
+        controller.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+    Micro-benchmark da decodificação do token de acesso em get_current_user
+
+    Compara a verificação completa (assinatura JWT + validação dos modelos
+    pydantic) com a recuperação a partir do cache de tokens verificados.
+
+    Uso: python -m benchmarks.token_decode [--iterations 20000] [--algorithm HS256]
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from datetime import timedelta
+from mock import Mock
+from server.dependencies.get_current_user import decodifica_token
+from server.services.key_ring_service import KeyRingService
+from server.services.token_cache_service import TokenCacheService
+from server.services.usuario_service import UsuarioService
+
+
+def build_key_ring(algorithm: str) -> KeyRingService:
+    if algorithm in ('HS256', 'HS512'):
+        return KeyRingService(algorithm, 'secret')
+
+    import rsa
+    _, private_key = rsa.newkeys(2048)
+    return KeyRingService(algorithm, private_keys={'k1': private_key.save_pkcs1().decode('utf-8')}, active_kid='k1')
+
+
+def decode_sem_cache(token, key_ring, environment, iterations):
+    for _ in range(iterations):
+        decodifica_token(token, key_ring, environment)
+
+
+def decode_com_cache(token, key_ring, environment, iterations, token_cache):
+    for _ in range(iterations):
+        current_user = token_cache.get(token)
+        if current_user is None:
+            current_user, exp = decodifica_token(token, key_ring, environment)
+            token_cache.put(token, current_user, exp)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--algorithm', default='HS256')
+    args = parser.parse_args()
+
+    key_ring = build_key_ring(args.algorithm)
+    environment = Mock(ACCESS_TOKEN_EMBED_PERMISSIONS=False)
+    signing_key, headers = key_ring.get_signing_key()
+    token = UsuarioService.gera_token(
+        {
+            'guid': str(uuid.uuid4()),
+            'name': 'Teste',
+            'email': 'teste@unicamp.br',
+            'username': 'user',
+            'roles': [1]
+        },
+        timedelta(seconds=1800),
+        signing_key,
+        args.algorithm,
+        headers=headers
+    )
+
+    token_cache = TokenCacheService(10000)
+    for name, run in [
+        ('sem cache', lambda: decode_sem_cache(token, key_ring, environment, args.iterations)),
+        ('com cache', lambda: decode_com_cache(token, key_ring, environment, args.iterations, token_cache)),
+    ]:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10} | {args.iterations / elapsed:12.0f} decodificações/s | "
+              f"{elapsed / args.iterations * 1e6:8.2f} us/decodificação")
+
+    # Estimativa de memória por entrada do cache (digest + modelo construído)
+    current_user, _ = decodifica_token(token, key_ring, environment)
+    entry_size = sys.getsizeof(token_cache.get_token_digest(token)) + sys.getsizeof(current_user.__dict__) + sum(
+        sys.getsizeof(value) for value in current_user.__dict__.values()
+    )
+    print(f"Memória aproximada por entrada: {entry_size} bytes "
+          f"({entry_size * token_cache.max_size / 1024 / 1024:.1f} MiB para {token_cache.max_size} entradas)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+    Benchmark da exportação NDJSON do diretório de usuários
+
+    Popula a tabela tb_usuario do banco de dados de DATABASE_URL com usuários
+    sintéticos (caso ainda não existam) e percorre a exportação por cursor do
+    lado do servidor, reportando a vazão e o pico de memória (RSS) do processo.
+
+    ATENÇÃO: utilize um banco de dados descartável, os usuários sintéticos
+    (username 'bench_user_*') são mantidos ao fim do benchmark.
+
+    Uso: python -m benchmarks.users_export [--users 1000000] [--batch-size 1000] [--gzip]
+"""
+
+import argparse
+import asyncio
+import resource
+import time
+from sqlalchemy import text
+from server.configuration.db import build_async_session_maker
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.repository.usuario_repository import UsuarioRepository
+from server.services.usuario_service import UsuarioService
+
+
+SEED_USERS_SQL = text("""
+    INSERT INTO tb_usuario (created_at, updated_at, guid, nome, username, hashed_password, email, email_verificado)
+    SELECT
+        now() - (i || ' seconds')::interval,
+        now(),
+        md5(i::text)::uuid,
+        'Bench ' || i,
+        'bench_user_' || i,
+        'hash',
+        'bench_user_' || i || '@unicamp.br',
+        true
+    FROM generate_series(:start, :stop) AS i
+    ON CONFLICT DO NOTHING
+""")
+
+
+def get_peak_rss_mib() -> float:
+    # ru_maxrss é reportado em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed_users(session_maker, users: int):
+    async with session_maker() as session:
+        count = (await session.execute(
+            text("SELECT count(*) FROM tb_usuario WHERE username LIKE 'bench_user_%'")
+        )).scalar()
+        if count >= users:
+            return
+        print(f"Populando {users - count} usuários...")
+        await session.execute(SEED_USERS_SQL, {'start': count + 1, 'stop': users})
+        await session.commit()
+
+
+async def export(session_maker, batch_size: int, gzip: bool):
+    async with session_maker() as session:
+        service = UsuarioService(UsuarioRepository(session))
+        lines = 0
+        total_bytes = 0
+        async for chunk in service.exporta_usuarios_ndjson(batch_size, gzip):
+            total_bytes += len(chunk)
+            if not gzip:
+                lines += chunk.count(b'\n')
+        return lines, total_bytes
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=get_environment_cached().USERS_EXPORT_BATCH_SIZE)
+    parser.add_argument('--gzip', action='store_true')
+    args = parser.parse_args()
+
+    session_maker = build_async_session_maker()
+    await seed_users(session_maker, args.users)
+
+    rss_before = get_peak_rss_mib()
+    start = time.perf_counter()
+    lines, total_bytes = await export(session_maker, args.batch_size, args.gzip)
+    elapsed = time.perf_counter() - start
+
+    if not args.gzip:
+        print(f"Usuários exportados: {lines}")
+    print(f"Tempo: {elapsed:.1f} s | {total_bytes / elapsed / 1024 / 1024:.1f} MiB/s"
+          + ("" if args.gzip else f" | {lines / elapsed:.0f} usuários/s"))
+    print(f"Pico de RSS: {rss_before:.1f} MiB antes da exportação, {get_peak_rss_mib():.1f} MiB ao fim")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -2,18 +2,33 @@ from fastapi import FastAPI
 from server.configuration import exceptions
 from server.controllers.usuario_controller import usuario_router
 from server.controllers.ping_controller import ping_router
+from server.controllers.admin_controller import admin_router
+from server.controllers.jwks_controller import jwks_router
+from server.controllers.metrics_controller import metrics_router
 from starlette_context.middleware import RawContextMiddleware
 from starlette_context import plugins
-from server.configuration.custom_logging import MICROSERVICE_LOGGER_KWARGS, Logger
+from server.configuration.custom_logging import MICROSERVICE_LOGGER_KWARGS, MICROSERVICE_LOGGER_NAME, Logger
+from server.configuration.bulk_log_handler import BulkLogHandler
 from server.middleware.plugins import custom_request_plugin
+from server.middleware.metrics_middleware import PrometheusMiddleware
 from server.configuration import db
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
+from server.configuration.hashing_executor import shutdown_hashing_executor
+from server.configuration.publisher_executor import shutdown_publisher_executor
+from server.dependencies.get_permission_snapshot import carrega_permission_snapshot
+from server.dependencies.get_outbox_dispatcher import inicia_outbox_dispatcher, encerra_outbox_dispatcher
+from server.dependencies.get_email_worker import inicia_email_worker, encerra_email_worker
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.configuration.redis import fecha_redis_clients
 
 
 routers = [
     usuario_router,
-    ping_router
+    ping_router,
+    admin_router,
+    jwks_router,
+    metrics_router
 ]
 
 
@@ -23,6 +38,7 @@ def _init_app():
     app = configura_middlewares(app)
     configura_logger()
     configura_routers(app)
+    configura_eventos(app)
     return app
 
 
@@ -30,6 +46,22 @@ def configura_logger():
     Logger(**MICROSERVICE_LOGGER_KWARGS).get_logger()
 
 
+async def configura_logger_por_ambiente():
+    environment = get_environment_cached()
+    Logger.configura_nivel(MICROSERVICE_LOGGER_NAME, environment.LOG_LEVEL)
+    Logger.configura_amostragem(environment.LOG_SAMPLING_RATES)
+    if environment.LOG_SINK_URL:
+        bulk_log_handler = BulkLogHandler(
+            environment.LOG_SINK_URL,
+            environment.LOG_SINK_INDEX,
+            environment.LOG_SINK_BATCH_SIZE,
+            environment.LOG_SINK_FLUSH_INTERVAL_IN_SECONDS,
+            environment.LOG_SINK_BUFFER_SIZE
+        )
+        bulk_log_handler.setFormatter(MICROSERVICE_LOGGER_KWARGS['formatter'])
+        Logger.adiciona_handler(MICROSERVICE_LOGGER_NAME, bulk_log_handler)
+
+
 def configura_middlewares(app):
     app.add_middleware(
         RawContextMiddleware,
@@ -45,6 +77,8 @@ def configura_middlewares(app):
         allow_methods=["*"],
         allow_headers=["*"]
     )
+    # Adicionado por último, para medir também os demais middlewares
+    app.add_middleware(PrometheusMiddleware)
     return app
 
 
@@ -68,6 +102,21 @@ def configura_exception_handlers(app):
     return app
 
 
+def configura_eventos(app):
+    app.add_event_handler("startup", configura_logger_por_ambiente)
+    app.add_event_handler("startup", carrega_permission_snapshot)
+    app.add_event_handler("startup", inicia_outbox_dispatcher)
+    app.add_event_handler("startup", inicia_email_worker)
+    app.add_event_handler("shutdown", encerra_outbox_dispatcher)
+    app.add_event_handler("shutdown", encerra_email_worker)
+    app.add_event_handler("shutdown", shutdown_hashing_executor)
+    app.add_event_handler("shutdown", fecha_redis_clients)
+    app.add_event_handler("shutdown", shutdown_publisher_executor)
+    # Os logs emitidos pelos demais handlers de encerramento só são
+    # enviados enquanto os listeners estão ativos: deve ser o último
+    app.add_event_handler("shutdown", Logger.stop_listeners)
+
+
 def configura_routers(app):
     for router in routers:
         app.include_router(**router),
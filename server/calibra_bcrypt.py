@@ -0,0 +1,83 @@
+"""
+    Calibração do custo do bcrypt para a CPU da máquina
+
+    Mede o tempo de um hash na máquina atual e escolhe o maior custo (rounds)
+    cujo hash não excede --target-ms. Deve ser executado na máquina (ou no tipo
+    de instância) em que a API é implantada. O valor escolhido deve ser
+    configurado em HASHING_BCRYPT_ROUNDS.
+
+    Cada round a mais dobra o tempo do hash, tanto do cadastro quanto do login.
+
+    Uso: python -m server.calibra_bcrypt [--target-ms 250] [--samples 5] [--min-rounds 10]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Callable
+from server.services.hashing_service import criptografa_senha
+
+
+# Limites do custo aceito pelo bcrypt
+
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+
+
+def mede_tempo_hash(rounds: int, samples: int) -> float:
+    """
+        Retorna a mediana do tempo, em segundos, de samples hashes com o custo rounds
+    """
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        criptografa_senha('calibracao-bcrypt', rounds)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def escolhe_rounds(target: float, min_rounds: int, mede: Callable[[int], float]) -> int:
+    """
+        Parte do custo min_rounds e extrapola o tempo dos custos seguintes (o tempo
+        dobra a cada round). A estimativa é conferida medindo o custo escolhido
+    """
+    rounds = min_rounds
+    duration = mede(rounds)
+    while rounds < BCRYPT_MAX_ROUNDS and duration * 2 <= target:
+        rounds += 1
+        duration *= 2
+
+    # Corrige a extrapolação com o tempo medido no custo escolhido
+    duration = mede(rounds)
+    while rounds > min_rounds and duration > target:
+        rounds -= 1
+        duration /= 2
+    while rounds < BCRYPT_MAX_ROUNDS and duration * 2 <= target:
+        rounds += 1
+        duration *= 2
+    return rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibra o custo do bcrypt (HASHING_BCRYPT_ROUNDS)')
+    parser.add_argument('--target-ms', type=float, default=250, help='Tempo máximo de um hash, em ms')
+    parser.add_argument('--samples', type=int, default=5, help='Hashes medidos por custo')
+    parser.add_argument('--min-rounds', type=int, default=10, help='Menor custo aceito')
+    args = parser.parse_args()
+
+    min_rounds = max(BCRYPT_MIN_ROUNDS, min(args.min_rounds, BCRYPT_MAX_ROUNDS))
+    rounds = escolhe_rounds(args.target_ms / 1000, min_rounds, lambda r: mede_tempo_hash(r, args.samples))
+    duration = mede_tempo_hash(rounds, args.samples)
+
+    if duration > args.target_ms / 1000:
+        print(f"Aviso: mesmo o menor custo aceito ({min_rounds}) excede {args.target_ms:.0f} ms nessa CPU")
+
+    workers = os.cpu_count() or 1
+    print(f"Custo escolhido: {rounds} rounds ({duration * 1000:.1f} ms por hash)")
+    print(f"Capacidade estimada com {workers} workers de hashing: {workers / duration:.1f} logins/s")
+    print(f"HASHING_BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == '__main__':
+    main()
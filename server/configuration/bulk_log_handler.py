@@ -0,0 +1,141 @@
+import json
+import logging
+import threading
+import time
+import httpx
+from collections import deque
+from typing import Deque, List
+
+
+class BulkLogHandler(logging.Handler):
+
+    """
+        Envia os registros de log para a API _bulk de um servidor compatível
+        com o Elasticsearch.
+
+        O emit apenas formata o registro e o adiciona a um buffer em memória.
+        Uma thread em segundo plano envia os registros em lotes de no máximo
+        batch_size registros, assim que o lote enche ou a cada flush_interval
+        segundos. Com o buffer cheio (buffer_size), o registro mais antigo é
+        descartado e contado em dropped. Falhas no envio não são repetidas:
+        os registros do lote são contados em failed e a falha é informada no
+        stderr (logging.lastResort) no máximo uma vez a cada error_interval segundos
+    """
+
+    def __init__(self, url: str, index: str, batch_size: int = 500, flush_interval: float = 2.0,
+                 buffer_size: int = 10000, timeout: float = 5.0, error_interval: float = 60.0):
+        super().__init__()
+        self.url = f"{url.rstrip('/')}/_bulk"
+        self.action = json.dumps({"index": {"_index": index}}, separators=(',', ':'))
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer: Deque[str] = deque(maxlen=buffer_size)
+        self.client = httpx.Client(timeout=timeout)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.in_flight = 0
+        self.error_interval = error_interval
+        self.last_error_at = float('-inf')
+        self.failed_since_last_error = 0
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="BulkLogHandler", daemon=True)
+        self.thread.start()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            document = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self.condition:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(document)
+            if len(self.buffer) >= self.batch_size:
+                self.condition.notify()
+
+    def get_batch(self) -> List[str]:
+        with self.condition:
+            if len(self.buffer) < self.batch_size and not self.stopping:
+                self.condition.wait(self.flush_interval)
+            batch = [self.buffer.popleft() for _ in range(min(self.batch_size, len(self.buffer)))]
+            self.in_flight = len(batch)
+            return batch
+
+    def run(self):
+        while True:
+            batch = self.get_batch()
+            if batch:
+                self.send(batch)
+                self.in_flight = 0
+            elif self.stopping:
+                return
+
+    def send(self, batch: List[str]):
+        body = "".join(f"{self.action}\n{document}\n" for document in batch)
+        try:
+            response = self.client.post(
+                self.url, content=body.encode('utf-8'), headers={'Content-Type': 'application/x-ndjson'}
+            )
+            response.raise_for_status()
+            result = response.json()
+            failed = sum(
+                1 for item in result.get('items', [])
+                if next(iter(item.values()), {}).get('status', 200) >= 300
+            ) if result.get('errors') else 0
+        except Exception as ex:
+            self.failed += len(batch)
+            self.report_error(len(batch), ex)
+            return
+        self.sent += len(batch) - failed
+        self.failed += failed
+
+    def report_error(self, count: int, ex: Exception):
+        """
+            O erro não é enviado ao próprio logger, para não realimentar o envio
+        """
+        self.failed_since_last_error += count
+        now = time.monotonic()
+        if logging.lastResort is None or now - self.last_error_at < self.error_interval:
+            return
+        self.last_error_at = now
+        logging.lastResort.handle(logging.makeLogRecord({
+            'name': __name__,
+            'levelno': logging.ERROR,
+            'levelname': 'ERROR',
+            'msg': "Falha no envio de %d registros de log para %s: %r",
+            'args': (self.failed_since_last_error, self.url, ex)
+        }))
+        self.failed_since_last_error = 0
+
+    def flush(self):
+        """
+            Aguarda o envio dos registros já presentes no buffer
+        """
+        with self.condition:
+            self.condition.notify()
+        while (self.buffer or self.in_flight) and self.thread.is_alive():
+            time.sleep(0.01)
+
+    def close(self):
+        """
+            Encerra a thread de envio após enviar os registros restantes
+        """
+        with self.condition:
+            if self.stopping:
+                return
+            self.stopping = True
+            self.condition.notify()
+        self.thread.join()
+        self.client.close()
+        super().close()
+
+    def get_stats(self) -> dict:
+        return {
+            'buffered': len(self.buffer),
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped
+        }
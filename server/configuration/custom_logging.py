@@ -1,79 +1,253 @@
+import atexit
+import json
 import logging
+import queue
+import random
 import sys
+import zlib
+from logging.handlers import QueueHandler, QueueListener
 from starlette_context import context
 from server.schemas.usuario_schema import CurrentUserToken
-from typing import List
+from typing import Dict, List
 from starlette.requests import HTTPConnection
 
 
 class CurrentUserFilter(logging.Filter):
+
+    """
+        Copia os dados do usuário atual para o registro no momento da emissão.
+        Fora de uma requisição, os campos ficam vazios
+    """
+
     def filter(self, record: logging.LogRecord):
-        if context.exists():
-            current_user: CurrentUserToken = context.data.get('current_user', None)
-            record.username = current_user.username if current_user else ""
-            record.user_email = current_user.email if current_user else ""
-            record.user_guid = current_user.guid if current_user else ""
-            return True
-        return False
+        current_user: CurrentUserToken = context.data.get('current_user', None) if context.exists() else None
+        record.username = current_user.username if current_user else ""
+        record.user_email = current_user.email if current_user else ""
+        record.user_guid = current_user.guid if current_user else ""
+        return True
 
 
 class RequestFilter(logging.Filter):
+
+    """
+        Copia os dados da requisição atual para o registro no momento da emissão.
+        Fora de uma requisição, os campos ficam vazios
+    """
+
     def filter(self, record: logging.LogRecord):
+        record.request_method = None
+        record.request_path = None
+        record.request_id = None
         if context.exists():
             request_dict = context.data.get('request', None)
             request: HTTPConnection = request_dict['request'] if request_dict else None
             record.request_method = request.scope['method'] if request else None
             record.request_path = request.scope['path'] if request else None
+            record.request_id = context.data.get('X-Request-ID', None)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+
+    """
+        Amostra os registros de nível inferior a WARNING com a taxa informada
+        (entre 0 e 1). Avisos e erros são sempre emitidos.
+
+        Dentro de uma requisição, a decisão é derivada do X-Request-ID, de forma
+        que os registros de uma mesma requisição são mantidos ou descartados juntos
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
 
-            request_id = context.data.get('X-Request-ID', None)
-            record.request_id = request_id
+    def filter(self, record: logging.LogRecord):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
             return True
-        return False
+        request_id = context.data.get('X-Request-ID', None) if context.exists() else None
+        if request_id:
+            keep = zlib.crc32(str(request_id).encode('utf-8')) % 10000 < self.rate * 10000
+        else:
+            keep = random.random() < self.rate
+        if not keep:
+            self.sampled_out += 1
+        return keep
+
+
+class JsonFormatter(logging.Formatter):
+
+    """
+        Formata o registro como um objeto JSON compacto, em uma única linha.
+        fields mapeia a chave do JSON para o atributo do registro
+    """
+
+    def __init__(self, fields: Dict[str, str]):
+        super().__init__()
+        self.fields = fields
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.message = record.getMessage()
+        record.asctime = self.formatTime(record)
+        log = {key: getattr(record, attr, None) for key, attr in self.fields.items()}
+        if record.exc_info:
+            log['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            log['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(log, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+
+    """
+        Enfileira os registros sem formatá-los: a formatação e a escrita são
+        feitas pela thread do QueueListener. Com a fila cheia, o registro é
+        descartado (e contado) em vez de bloquear o event loop
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Apenas a mensagem é resolvida aqui, para não manter referências aos
+        # argumentos. A exceção (exc_info) é formatada pela thread do listener
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 class Logger:
 
+    # Listeners em execução, por nome do logger
+
+    LISTENERS = {}
+
     @staticmethod
     def get_logger_by_name(logger_name: str):
         return logging.getLogger(logger_name)
 
-    def __init__(self, logger_name: str, formatter: logging.Formatter, logger_filters: List[logging.Filter]):
+    def __init__(self, logger_name: str, formatter: logging.Formatter, logger_filters: List[logging.Filter],
+                 queue_max_size: int = 10000):
         self.logger_name = logger_name
         self.formatter = formatter
         self.logger_filters = logger_filters
+        self.queue_max_size = queue_max_size
         self.logger = logging.getLogger(logger_name)
-        for logger_filter in logger_filters:
-            self.logger.addFilter(logger_filter)
-        self.build_stdout_logger()
+        self.build_queue_logger()
         self.logger.setLevel(logging.DEBUG)
 
-    def build_stdout_logger(self):
+    def build_stdout_handler(self) -> logging.Handler:
         handler = logging.StreamHandler(stream=sys.stdout)
         handler.setFormatter(self.formatter)
         handler.setLevel(logging.DEBUG)
-        self.logger.addHandler(handler)
+        return handler
+
+    def build_queue_logger(self):
+        """
+            O logger apenas enfileira os registros (QueueHandler). A formatação e a
+            escrita no stdout são feitas por uma thread em segundo plano (QueueListener).
+            Uma nova configuração do mesmo logger encerra o listener anterior.
+
+            Os filtros de contexto ficam no handler, e não no logger, para que
+            também sejam aplicados aos registros dos loggers filhos (ex.: ENDPOINT_LOGGER_NAME)
+        """
+        Logger.stop_listener(self.logger_name)
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+
+        log_queue = queue.Queue(maxsize=self.queue_max_size)
+        listener = QueueListener(log_queue, self.build_stdout_handler(), respect_handler_level=True)
+        queue_handler = DroppingQueueHandler(log_queue)
+        for logger_filter in self.logger_filters:
+            queue_handler.addFilter(logger_filter)
+        self.logger.addHandler(queue_handler)
+        listener.start()
+        Logger.LISTENERS[self.logger_name] = listener
+
+    @staticmethod
+    def adiciona_handler(logger_name: str, handler: logging.Handler):
+        """
+            Adiciona um handler ao listener do logger. O handler é executado pela
+            thread do listener, fora do event loop
+        """
+        listener = Logger.LISTENERS.pop(logger_name)
+        listener.stop()
+        listener = QueueListener(listener.queue, *listener.handlers, handler, respect_handler_level=True)
+        listener.start()
+        Logger.LISTENERS[logger_name] = listener
+
+    @staticmethod
+    def stop_listener(logger_name: str):
+        """
+            Encerra o listener do logger, escrevendo os registros ainda na fila.
+            Os handlers do listener são fechados em seguida
+        """
+        listener = Logger.LISTENERS.pop(logger_name, None)
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+    @staticmethod
+    def stop_listeners():
+        for logger_name in list(Logger.LISTENERS):
+            Logger.stop_listener(logger_name)
+
+    @staticmethod
+    def configura_nivel(logger_name: str, level: str):
+        logging.getLogger(logger_name).setLevel(level.upper())
+
+    @staticmethod
+    def configura_amostragem(sampling_rates: Dict[str, float]):
+        """
+            Substitui a amostragem de cada logger informado pela taxa configurada.
+            Taxas maiores ou iguais a 1 removem a amostragem do logger
+        """
+        for logger_name, rate in sampling_rates.items():
+            logger = logging.getLogger(logger_name)
+            for logger_filter in list(logger.filters):
+                if isinstance(logger_filter, SamplingFilter):
+                    logger.removeFilter(logger_filter)
+            if rate < 1:
+                logger.addFilter(SamplingFilter(rate))
 
     def get_logger(self):
         return logging.getLogger(self.logger_name)
 
 
+atexit.register(Logger.stop_listeners)
+
+
 MICROSERVICE_LOGGER_NAME = "AUTHENTICATOR_LOGGER"
+
+# Logger filho dos registros repetitivos de cada requisição (início e fim dos
+# endpoints), que podem ser amostrados separadamente (LOG_SAMPLING_RATES)
+
+ENDPOINT_LOGGER_NAME = f"{MICROSERVICE_LOGGER_NAME}.endpoint"
+
 MICROSERVICE_LOGGER_KWARGS = {
     "logger_name": MICROSERVICE_LOGGER_NAME,
-    "formatter": logging.Formatter("{\n"
-        f'\t"levelname": "%(levelname)s",\n'
-        f'\t"asctime": "%(asctime)s",\n'
-        f'\t"request_id": "%(request_id)s",\n'
-        f'\t"request_method": "%(request_method)s",\n'                     
-        f'\t"request_path": "%(request_path)s",\n'
-        f'\t"funcName": "%(funcName)s",\n'
-        f'\t"module": "%(module)s",\n'
-        f'\t"message": "%(message)s",\n'
-        f'\t"username": "%(username)s",\n'
-        f'\t"user_email": "%(user_email)s",\n'
-        f'\t"user_guid": "%(user_guid)s",\n'
-        '}'
-    ),
+    "formatter": JsonFormatter({
+        "levelname": "levelname",
+        "asctime": "asctime",
+        "logger": "name",
+        "request_id": "request_id",
+        "request_method": "request_method",
+        "request_path": "request_path",
+        "funcName": "funcName",
+        "module": "module",
+        "message": "message",
+        "username": "username",
+        "user_email": "user_email",
+        "user_guid": "user_guid"
+    }),
     "logger_filters": [
         RequestFilter(),
         CurrentUserFilter()
@@ -84,3 +258,6 @@ MICROSERVICE_LOGGER_KWARGS = {
 def get_main_logger():
     return Logger.get_logger_by_name(MICROSERVICE_LOGGER_NAME)
 
+
+def get_endpoint_logger():
+    return Logger.get_logger_by_name(ENDPOINT_LOGGER_NAME)
@@ -1,28 +1,266 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from functools import lru_cache
+from collections import Counter
+from typing import Awaitable, Callable, Optional, Tuple
+from server.configuration.custom_logging import get_main_logger
+from server.configuration.db_metrics import DB_METRICS, InstrumentedAsyncAdaptedQueuePool, instrumenta_engine
 from server.dependencies.get_environment_cached import get_environment_cached
 
 
 Base = declarative_base()
+MAIN_LOGGER = get_main_logger()
 
 
 @lru_cache
 def create_async_engine_cached():
     environment = get_environment_cached()
-    return create_async_engine(
+    engine = create_async_engine(
         environment.get_db_conn_async(environment.DATABASE_URL),
         echo=environment.DB_ECHO,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
         pool_size=environment.DB_POOL_SIZE,
         max_overflow=environment.DB_MAX_OVERFLOW,
         pool_pre_ping=environment.DB_POOL_PRE_PING
     )
+    instrumenta_engine(engine, 'primary', environment.DB_SLOW_QUERY_THRESHOLD_IN_MS)
+    return engine
 
 
+@lru_cache
 def build_async_session_maker():
+    """
+        Fábrica de sessões única do processo, compartilhada por todas as requisições
+    """
     return sessionmaker(
         create_async_engine_cached(),
         expire_on_commit=False,
         class_=AsyncSession
     )
 
+
+class ReplicaRouter:
+
+    """
+        Distribui as sessões somente leitura entre as réplicas (round-robin).
+
+        Uma réplica com falha de conexão fica indisponível por retry_after
+        segundos. Sem réplicas disponíveis, escolhe() retorna None e a leitura
+        vai para o banco de dados principal
+    """
+
+    def __init__(self, size: int, retry_after: float):
+        self.size = size
+        self.retry_after = retry_after
+        self.next = 0
+        self.unavailable_until = [0.0] * size
+
+    def disponivel(self, replica: int) -> bool:
+        return time.monotonic() >= self.unavailable_until[replica]
+
+    def escolhe(self) -> Optional[int]:
+        for _ in range(self.size):
+            replica = self.next
+            self.next = (self.next + 1) % self.size
+            if self.disponivel(replica):
+                return replica
+        return None
+
+    def marca_falha(self, replica: int):
+        self.unavailable_until[replica] = time.monotonic() + self.retry_after
+
+
+@lru_cache
+def get_replica_router_cached() -> ReplicaRouter:
+    environment = get_environment_cached()
+    return ReplicaRouter(len(environment.DATABASE_REPLICA_URLS), environment.DB_REPLICA_RETRY_AFTER_IN_SECONDS)
+
+
+def configura_fallback_para_principal(engine: AsyncEngine, replica: int):
+
+    """
+        Caso a conexão com a réplica falhe, a réplica é marcada como indisponível
+        e a conexão é aberta no banco de dados principal, com as mesmas
+        configurações (inclusive o modo somente leitura).
+
+        Essas conexões são descartadas no checkout assim que a réplica volta a
+        ficar disponível, e o pool abre uma nova conexão com a réplica
+    """
+
+    @event.listens_for(engine.sync_engine, 'do_connect')
+    def conecta(dialect, connection_record, cargs, cparams):
+        connection_record.info.pop('fallback', None)
+        try:
+            return dialect.connect(*cargs, **cparams)
+        except Exception:
+            get_replica_router_cached().marca_falha(replica)
+            MAIN_LOGGER.warning(
+                f"Falha na conexão com a réplica {replica}. Leitura enviada ao banco de dados principal",
+                exc_info=True
+            )
+            main_cargs, main_cparams = dialect.create_connect_args(create_async_engine_cached().url)
+            main_cparams['server_settings'] = cparams.get('server_settings')
+            connection_record.info['fallback'] = True
+            return dialect.connect(*main_cargs, **main_cparams)
+
+    @event.listens_for(engine.sync_engine, 'checkout')
+    def descarta_fallback(dbapi_connection, connection_record, connection_proxy):
+        if connection_record.info.get('fallback') and get_replica_router_cached().disponivel(replica):
+            raise exc.DisconnectionError("Réplica disponível novamente")
+
+
+@lru_cache
+def create_replica_engines_cached() -> Tuple[AsyncEngine, ...]:
+    """
+        Um engine (e um pool) por réplica. As conexões são abertas com
+        default_transaction_read_only, o que equivale a um SET TRANSACTION READ ONLY
+        em cada transação, sem o custo de um comando a mais por transação
+    """
+    environment = get_environment_cached()
+    engines = []
+    for replica, database_url in enumerate(environment.DATABASE_REPLICA_URLS):
+        engine = create_async_engine(
+            environment.get_db_conn_async(database_url),
+            echo=environment.DB_ECHO,
+            poolclass=InstrumentedAsyncAdaptedQueuePool,
+            pool_size=environment.DB_REPLICA_POOL_SIZE,
+            max_overflow=environment.DB_MAX_OVERFLOW,
+            pool_pre_ping=environment.DB_POOL_PRE_PING,
+            connect_args={'server_settings': {'default_transaction_read_only': 'on'}}
+        )
+        configura_fallback_para_principal(engine, replica)
+        instrumenta_engine(engine, f'replica_{replica}', environment.DB_SLOW_QUERY_THRESHOLD_IN_MS)
+        engines.append(engine)
+    return tuple(engines)
+
+
+@lru_cache
+def build_replica_session_makers_cached() -> Tuple[sessionmaker, ...]:
+    return tuple(
+        sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+        for engine in create_replica_engines_cached()
+    )
+
+
+def build_read_only_session_maker() -> sessionmaker:
+    """
+        Fábrica de sessões das leituras: a próxima réplica disponível ou,
+        sem réplicas configuradas ou disponíveis, o banco de dados principal.
+        Leituras que dependem de uma escrita da mesma requisição devem usar
+        a sessão do banco de dados principal (get_session)
+    """
+    session_makers = build_replica_session_makers_cached()
+    replica = get_replica_router_cached().escolhe() if session_makers else None
+    if replica is None:
+        return build_async_session_maker()
+    return session_makers[replica]
+
+
+class LazyAsyncSession:
+
+    """
+        Sessão assíncrona do banco de dados criada apenas no primeiro uso.
+
+        Requisições que não precisam do banco de dados (ex.: autorização
+        resolvida pelo token ou pelo snapshot de permissões) terminam sem
+        criar uma sessão e sem retirar uma conexão do pool
+    """
+
+    def __init__(self, build_session_maker: Callable[[], sessionmaker], endpoint: Optional[str] = None):
+        self.build_session_maker = build_session_maker
+        self.endpoint = endpoint
+        self.session: Optional[AsyncSession] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.session is not None
+
+    def get(self) -> AsyncSession:
+        if self.session is None:
+            session_maker = self.build_session_maker()
+            self.session = session_maker(info={'endpoint': self.endpoint})
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            if self.endpoint:
+                DB_METRICS.observe_statements_per_request(
+                    self.endpoint, self.session.sync_session.info.get('statements', 0)
+                )
+            await self.session.close()
+
+
+# Quantidade de conexões retiradas do pool por endpoint.
+# Cada início de transação de uma sessão corresponde a um checkout de conexão
+
+POOL_CHECKOUTS_BY_ENDPOINT = Counter()
+
+
+@event.listens_for(Session, 'after_begin')
+def conta_checkout_por_endpoint(session, transaction, connection):
+    endpoint = session.info.get('endpoint')
+    if endpoint:
+        POOL_CHECKOUTS_BY_ENDPOINT[endpoint] += 1
+
+
+# Marca as sessões que escreveram no banco de dados na transação atual,
+# permitindo que as requisições apenas de leitura terminem sem um COMMIT
+
+HAS_WRITES_KEY = 'has_writes'
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def marca_escrita_por_execucao(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def marca_escrita_por_flush(session, flush_context):
+    session.info[HAS_WRITES_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def limpa_marca_de_escrita(session):
+    session.info.pop(HAS_WRITES_KEY, None)
+
+
+def possui_escritas_pendentes(session: AsyncSession) -> bool:
+    """
+        Indica se a sessão possui escritas ainda não confirmadas: comandos
+        já executados na transação atual ou objetos aguardando o flush
+    """
+    return bool(
+        session.sync_session.info.get(HAS_WRITES_KEY)
+        or session.new or session.dirty or session.deleted
+    )
+
+
+# Ações agendadas para depois do commit da sessão (ex.: invalidação de caches),
+# executadas pelo endpoint_exception_handler e descartadas no rollback
+
+AFTER_COMMIT_KEY = 'after_commit_callbacks'
+
+
+def agenda_apos_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]):
+    session.sync_session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, 'after_rollback')
+def descarta_acoes_apos_commit(session):
+    session.info.pop(AFTER_COMMIT_KEY, None)
+
+
+async def executa_apos_commit(session: AsyncSession):
+    """
+        Executa as ações agendadas. Falhas são registradas, mas não
+        interrompem a requisição, cujo commit já foi feito
+    """
+    for callback in session.sync_session.info.pop(AFTER_COMMIT_KEY, []):
+        try:
+            await callback()
+        except Exception:
+            MAIN_LOGGER.warning("Falha em uma ação agendada para depois do commit", exc_info=True)
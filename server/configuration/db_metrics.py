@@ -0,0 +1,159 @@
+import time
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Optional
+from server.configuration.custom_logging import get_main_logger
+from server.constants.metrics import LATENCY_BUCKETS
+
+
+MAIN_LOGGER = get_main_logger()
+
+STATEMENT_OPERATIONS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE'}
+STATEMENTS_PER_REQUEST_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+SLOW_STATEMENT_MAX_LENGTH = 1000
+
+# Chave, em connection.info, das informações da sessão que está utilizando a conexão
+
+SESSION_INFO_KEY = 'session_info'
+
+STATEMENT_LATENCY = Histogram(
+    'authenticator_db_statement_duration_seconds',
+    'Latência dos comandos SQL, por operação (SELECT, INSERT...)',
+    ['operation'],
+    buckets=LATENCY_BUCKETS
+)
+STATEMENTS_PER_REQUEST = Histogram(
+    'authenticator_db_statements_per_request',
+    'Quantidade de comandos SQL por requisição, por endpoint',
+    ['endpoint'],
+    buckets=STATEMENTS_PER_REQUEST_BUCKETS
+)
+CHECKOUT_WAIT = Histogram(
+    'authenticator_db_pool_checkout_wait_seconds',
+    'Tempo de espera por uma conexão do pool, por engine',
+    ['engine'],
+    buckets=LATENCY_BUCKETS
+)
+SLOW_STATEMENTS = Counter(
+    'authenticator_db_slow_statements',
+    'Quantidade de comandos SQL acima de DB_SLOW_QUERY_THRESHOLD_IN_MS, por operação',
+    ['operation']
+)
+
+# Com vários processos, o estado dos pools é somado entre os processos ativos
+
+POOL_SIZE = Gauge(
+    'authenticator_db_pool_size',
+    'Tamanho configurado (pool_size) dos pools de conexões, por engine',
+    ['engine'],
+    multiprocess_mode='livesum'
+)
+POOL_CONNECTIONS = Gauge(
+    'authenticator_db_pool_connections',
+    'Conexões dos pools, por engine e estado (checked_out, checked_in, overflow)',
+    ['engine', 'state'],
+    multiprocess_mode='livesum'
+)
+
+
+class DbMetrics:
+
+    """
+        Registra as métricas dos comandos SQL deste processo, expostas em /metrics:
+            - latência dos comandos SQL, por operação (SELECT, INSERT...)
+            - quantidade de comandos SQL por requisição, por endpoint
+            - quantidade de comandos acima de slow_statement_threshold, que são registrados no log
+    """
+
+    def __init__(self):
+        self.slow_statement_threshold: Optional[float] = None
+
+    @staticmethod
+    def get_operation(statement: str) -> str:
+        operation = statement.lstrip()[:6].upper()
+        return operation if operation in STATEMENT_OPERATIONS else 'OTHER'
+
+    def observe_statement(self, statement: str, elapsed: float):
+        operation = DbMetrics.get_operation(statement)
+        STATEMENT_LATENCY.labels(operation).observe(elapsed)
+        if self.slow_statement_threshold is not None and elapsed >= self.slow_statement_threshold:
+            SLOW_STATEMENTS.labels(operation).inc()
+            MAIN_LOGGER.warning(
+                f"Comando SQL lento ({elapsed * 1000:.0f} ms): {statement[:SLOW_STATEMENT_MAX_LENGTH]}"
+            )
+
+    @staticmethod
+    def observe_statements_per_request(endpoint: str, statements: int):
+        STATEMENTS_PER_REQUEST.labels(endpoint).observe(statements)
+
+
+DB_METRICS = DbMetrics()
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+
+    """
+        Pool que mede o tempo de cada checkout (a espera por uma conexão livre
+        e, quando necessário, a abertura de uma nova conexão) e que atualiza
+        o estado das suas conexões a cada checkout e checkin
+    """
+
+    metrics_name = 'default'
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            CHECKOUT_WAIT.labels(self.metrics_name).observe(time.perf_counter() - start)
+            self.atualiza_estado()
+
+    def _do_return_conn(self, conn):
+        try:
+            super()._do_return_conn(conn)
+        finally:
+            self.atualiza_estado()
+
+    def atualiza_estado(self):
+        POOL_CONNECTIONS.labels(self.metrics_name, 'checked_out').set(self.checkedout())
+        POOL_CONNECTIONS.labels(self.metrics_name, 'checked_in').set(self.checkedin())
+        POOL_CONNECTIONS.labels(self.metrics_name, 'overflow').set(max(self.overflow(), 0))
+
+
+def instrumenta_engine(engine: AsyncEngine, name: str, slow_statement_threshold_in_ms: int):
+
+    """
+        Registra a latência de cada comando SQL do engine e as métricas do seu pool.
+        O engine deve ser criado com poolclass=InstrumentedAsyncAdaptedQueuePool
+    """
+
+    DB_METRICS.slow_statement_threshold = slow_statement_threshold_in_ms / 1000
+    pool = engine.sync_engine.pool
+    pool.metrics_name = name
+    if isinstance(pool, InstrumentedAsyncAdaptedQueuePool):
+        POOL_SIZE.labels(name).set(pool.size())
+        pool.atualiza_estado()
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def inicia_comando(conn, cursor, statement, parameters, context, executemany):
+        context.statement_start = time.perf_counter()
+        session_info = conn.info.get(SESSION_INFO_KEY)
+        if session_info is not None:
+            session_info['statements'] = session_info.get('statements', 0) + 1
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def finaliza_comando(conn, cursor, statement, parameters, context, executemany):
+        DB_METRICS.observe_statement(statement, time.perf_counter() - context.statement_start)
+
+    @event.listens_for(engine.sync_engine, 'checkin')
+    def desvincula_sessao(dbapi_connection, connection_record):
+        connection_record.info.pop(SESSION_INFO_KEY, None)
+
+
+@event.listens_for(Session, 'after_begin')
+def vincula_sessao(session, transaction, connection):
+    # Os comandos executados pela conexão são contados na sessão
+    connection.info[SESSION_INFO_KEY] = session.info
@@ -1,34 +1,144 @@
 import re
 import pathlib
 from pydantic import BaseSettings, EmailStr, Field
+from typing import Dict, List
 
 
 class Environment(BaseSettings):
 
     # Configurações do banco de dados
 
-    DB_ECHO: bool = True
+    # DB_ECHO: registra todos os comandos SQL no log (apenas para depuração)
+    # DB_SLOW_QUERY_THRESHOLD_IN_MS: registra no log apenas os comandos mais lentos que o limite
+
+    DB_ECHO: bool = False
+    DB_SLOW_QUERY_THRESHOLD_IN_MS: int = 200
     DB_POOL_SIZE: int = 80
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_PRE_PING: bool = True
 
     DATABASE_URL: str
 
+    # Réplicas de leitura (opcional)
+    # DATABASE_REPLICA_URLS: JSON com a lista das URLs das réplicas, ex.: ["postgres://..."]
+    # As sessões somente leitura são distribuídas entre as réplicas (round-robin). Uma
+    # réplica com falha de conexão é ignorada por DB_REPLICA_RETRY_AFTER_IN_SECONDS,
+    # e as leituras vão para o banco de dados principal
+
+    DATABASE_REPLICA_URLS: List[str] = []
+    DB_REPLICA_POOL_SIZE: int = 20
+    DB_REPLICA_RETRY_AFTER_IN_SECONDS: float = 30
+
     # Configurações do servidor
 
     ENVIRONMENT: str = 'DEV'
+
+    # Configurações dos logs
+    # LOG_SAMPLING_RATES: JSON no formato {"nome do logger": taxa entre 0 e 1}, ex.:
+    # {"AUTHENTICATOR_LOGGER.endpoint": 0.1} emite 10% dos registros de início e fim
+    # dos endpoints. Avisos e erros são sempre emitidos
+
+    LOG_LEVEL: str = 'INFO'
+    LOG_SAMPLING_RATES: Dict[str, float] = {}
+
+    # Envio dos logs em lotes para a API _bulk de um servidor compatível com o
+    # Elasticsearch, além do stdout (LOG_SINK_URL vazio desabilita o envio)
+    # LOG_SINK_BUFFER_SIZE: registros mantidos em memória; os mais antigos são descartados
+
+    LOG_SINK_URL: str = ''
+    LOG_SINK_INDEX: str = 'authenticator-logs'
+    LOG_SINK_BATCH_SIZE: int = 500
+    LOG_SINK_FLUSH_INTERVAL_IN_SECONDS: float = 2.0
+    LOG_SINK_BUFFER_SIZE: int = 10000
+
     HOST: str = 'localhost'
     PORT: int = 8080
 
     ACCESS_TOKEN_EXPIRE_DELTA_IN_SECONDS: int = 1800
     MAIL_TOKEN_EXPIRE_DELTA_IN_SECONDS: int = 600
+    PERMISSION_SNAPSHOT_TTL_IN_SECONDS: int = 300
+
+    # Redis compartilhado pelos processos (vazio desabilita os recursos que dependem dele)
+
+    REDIS_URL: str = ''
+
+    # Cache dos usuários buscados pelo GUID (GET /users/{guid_usuario})
+    # Sem REDIS_URL, apenas o cache em memória do processo (L1) é utilizado
+    # USER_CACHE_L1_TTL_IN_SECONDS: tempo máximo em que um processo não vê a alteração feita por outro
+
+    USER_CACHE_ENABLED: bool = False
+    USER_CACHE_TTL_IN_SECONDS: int = 300
+    USER_CACHE_L1_MAX_SIZE: int = 10000
+    USER_CACHE_L1_TTL_IN_SECONDS: float = 5
+
+    # Quantidade de usuários buscados por vez do cursor do banco de dados na exportação
+
+    USERS_EXPORT_BATCH_SIZE: int = 1000
 
     ACCESS_TOKEN_SECRET_KEY: str
     ACCESS_TOKEN_ALGORITHM: str
 
+    # Chaveiro para algoritmos assimétricos (RS256, ES256...)
+    # ACCESS_TOKEN_PRIVATE_KEYS: JSON no formato {"kid": "chave privada PEM"}
+    # ACCESS_TOKEN_ACTIVE_KID: kid da chave utilizada para assinar novos tokens
+
+    ACCESS_TOKEN_PRIVATE_KEYS: Dict[str, str] = {}
+    ACCESS_TOKEN_ACTIVE_KID: str = ''
+    JWKS_CACHE_MAX_AGE_IN_SECONDS: int = 3600
+
+    # Embute as permissões efetivas do usuário no token de acesso (claim 'perms')
+
+    ACCESS_TOKEN_EMBED_PERMISSIONS: bool = False
+
+    # Quantidade máxima de tokens verificados mantidos em cache (0 desabilita o cache)
+
+    ACCESS_TOKEN_CACHE_MAX_SIZE: int = 10000
+
     MAIL_TOKEN_SECRET_KEY: str
     MAIL_TOKEN_ALGORITHM: str
 
+    # Configurações do hashing de senhas
+    # HASHING_EXECUTOR_TYPE: 'process' ou 'thread'
+    # HASHING_EXECUTOR_MAX_WORKERS: 0 utiliza a quantidade de núcleos da máquina
+
+    # HASHING_BCRYPT_ROUNDS: custo do bcrypt. Pode ser calibrado para a CPU da máquina com
+    # python -m server.calibra_bcrypt. Ao alterar o custo, o hash de cada usuário é
+    # atualizado no seu próximo login
+
+    HASHING_EXECUTOR_TYPE: str = 'process'
+    HASHING_EXECUTOR_MAX_WORKERS: int = 0
+    HASHING_BCRYPT_ROUNDS: int = 12
+
+    # Bulkheads das rotas que fazem hashing (login e cadastro), um por rota
+    # HASHING_BULKHEAD_MAX_CONCURRENT: 0 utiliza a quantidade de workers do executor
+    # Acima da fila, ou após o prazo de espera, a requisição recebe 503 com Retry-After
+
+    HASHING_BULKHEAD_MAX_CONCURRENT: int = 0
+    HASHING_BULKHEAD_MAX_QUEUE: int = 64
+    HASHING_BULKHEAD_QUEUE_TIMEOUT_IN_SECONDS: float = 1.0
+    HASHING_BULKHEAD_RETRY_AFTER_IN_SECONDS: int = 2
+
+    # Limite de tentativas de login (POST /users/token) por username e por IP, em uma
+    # janela deslizante de LOGIN_THROTTLE_WINDOW_IN_SECONDS. Acima do limite, a resposta
+    # é 429 com Retry-After. Limites iguais a 0 desabilitam a chave correspondente
+    # No username são contadas apenas as falhas de autenticação; no IP, todas as tentativas.
+    # Cada tentativa é reservada no username antes da verificação da senha e estornada caso
+    # não falhe, para que tentativas simultâneas não ultrapassem o limite
+    # Com REDIS_URL, as tentativas são contadas no Redis, compartilhadas pelos processos.
+    # Sem REDIS_URL, cada processo conta as suas (até LOGIN_THROTTLE_MAX_KEYS chaves)
+
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_WINDOW_IN_SECONDS: int = 60
+    LOGIN_THROTTLE_MAX_ATTEMPTS_PER_USERNAME: int = 10
+    LOGIN_THROTTLE_MAX_ATTEMPTS_PER_IP: int = 100
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+
+    # Quantidade de proxies confiáveis à frente da API (ex.: 1 para o router do Heroku).
+    # O IP do cliente é lido do X-Forwarded-For adicionado por esses proxies.
+    # Sem proxy à frente da API deve ser 0: o header seria informado pelo próprio cliente
+
+    TRUSTED_PROXY_HOPS: int = 1
+
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
     MAIL_FROM: str
@@ -38,6 +148,29 @@ class Environment(BaseSettings):
     MAIL_SSL: int
     MAIL_USE_CREDENTIALS: int
 
+    # Pool de conexões SMTP persistentes
+    # MAIL_POOL_NOOP_AFTER_IN_SECONDS: conexões ociosas há mais tempo são verificadas com NOOP
+    # MAIL_POOL_MAX_IDLE_IN_SECONDS: conexões ociosas há mais tempo são descartadas
+
+    MAIL_POOL_MAX_SIZE: int = 4
+    MAIL_POOL_MAX_MESSAGES_PER_CONNECTION: int = 100
+    MAIL_POOL_NOOP_AFTER_IN_SECONDS: float = 30
+    MAIL_POOL_MAX_IDLE_IN_SECONDS: float = 300
+
+    # Envio dos e-mails da fila
+    # EMAIL_WORKER_IN_APP: envia os e-mails no próprio processo da API, sem o
+    # processo consumidor separado (python -m server.email_worker)
+
+    EMAIL_WORKER_IN_APP: bool = False
+    EMAIL_WORKER_BATCH_SIZE: int = 50
+    EMAIL_WORKER_POLL_INTERVAL_IN_SECONDS: float = 1.0
+    EMAIL_WORKER_MAX_BACKOFF_IN_SECONDS: int = 300
+
+    # EMAIL_WORKER_MAX_ATTEMPTS: tentativas de envio de um e-mail antes da
+    # falha definitiva, informada em GET /admin/email-queue
+
+    EMAIL_WORKER_MAX_ATTEMPTS: int = 20
+
     SERVER_DNS: str
 
     # Configurações AWS
@@ -46,10 +179,27 @@ class Environment(BaseSettings):
     AWS_SECRET_KEY: str
     AWS_REGION_NAME: str
 
+    # AWS_SNS_ENDPOINT_URL: endpoint alternativo do SNS (ex.: SNS local nos testes)
+
+    AWS_SNS_ENDPOINT_URL: str = ''
+    SNS_PUBLISHER_MAX_WORKERS: int = 4
+
     # TOPIC ARN
 
     USER_CREATED_TOPIC_ARN: str
 
+    # Publicação em segundo plano dos eventos do outbox
+
+    OUTBOX_DISPATCHER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_IN_SECONDS: float = 1.0
+    OUTBOX_MAX_BACKOFF_IN_SECONDS: int = 300
+
+    # OUTBOX_MAX_ATTEMPTS: tentativas de publicação de um evento antes da falha
+    # definitiva, que deixa de bloquear os eventos seguintes do mesmo usuário
+
+    OUTBOX_MAX_ATTEMPTS: int = 20
+
     @staticmethod
     def get_db_conn_async(database_url: str):
         return re.sub(r'\bpostgres://\b', "postgresql+asyncpg://", database_url, count=1)
@@ -12,12 +12,14 @@ class ApiBaseException(HTTPException):
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         error_id='INTERNAL_SERVER_ERROR',
         message='Ocorreu um erro interno no servidor',
-        detail=''
+        detail='',
+        headers=None
     ) -> None:
         self.status_code = status_code
         self.error_id = error_id
         self.message = message
         self.detail = detail
+        self.headers = headers
 
 
 class RequestValidationException(ApiBaseException):
@@ -141,6 +143,41 @@ class NotEnoughPermissionsException(ApiBaseException):
         super().__init__(status_code, error_id, message, detail)
 
 
+class InvalidCursorException(ApiBaseException):
+    def __init__(
+        self,
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        error_id='INVALID_CURSOR',
+        message='Cursor de paginação inválido',
+        detail=''
+    ) -> None:
+        super().__init__(status_code, error_id, message, detail)
+
+
+class ServiceOverloadedException(ApiBaseException):
+    def __init__(
+        self,
+        retry_after: int = 1,
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        error_id='SERVICE_OVERLOADED',
+        message='O serviço está sobrecarregado. Tente novamente em alguns segundos',
+        detail=''
+    ) -> None:
+        super().__init__(status_code, error_id, message, detail, {'Retry-After': str(retry_after)})
+
+
+class TooManyLoginAttemptsException(ApiBaseException):
+    def __init__(
+        self,
+        retry_after: int = 1,
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        error_id='TOO_MANY_LOGIN_ATTEMPTS',
+        message='Muitas tentativas de login. Tente novamente mais tarde',
+        detail=''
+    ) -> None:
+        super().__init__(status_code, error_id, message, detail, {'Retry-After': str(retry_after)})
+
+
 def generic_exception_handler(_: Request, exception: Exception):
     return api_base_exception_handler(_, ApiBaseException())
 
@@ -160,6 +197,7 @@ def api_base_exception_handler(_: Request, exception: ApiBaseException):
             'error_id': exception.error_id,
             'message': exception.message,
             'detail': exception.detail,
-        }
+        },
+        headers=exception.headers
     )
 
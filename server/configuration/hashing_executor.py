@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from server.configuration.custom_logging import get_main_logger
+from server.dependencies.get_environment_cached import get_environment_cached
+
+
+MAIN_LOGGER = get_main_logger()
+
+HASHING_EXECUTOR_PROCESS = 'process'
+HASHING_EXECUTOR_THREAD = 'thread'
+
+
+def build_hashing_executor(executor_type: str, max_workers: int) -> Executor:
+    """
+        Constrói o executor responsável pelo hashing das senhas.
+
+        Por padrão é utilizado um pool de processos com um worker por núcleo,
+        para que o bcrypt não concorra com o event loop pelo GIL. Caso a
+        plataforma não suporte o pool de processos, é utilizado um pool de threads
+    """
+
+    max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+
+    if executor_type == HASHING_EXECUTOR_PROCESS:
+        try:
+            return ProcessPoolExecutor(max_workers=max_workers)
+        except (ImportError, NotImplementedError, OSError):
+            MAIN_LOGGER.warning(
+                "Não foi possível criar o pool de processos de hashing. "
+                "Utilizando um pool de threads",
+                exc_info=True
+            )
+
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hashing')
+
+
+@lru_cache
+def create_hashing_executor_cached() -> Executor:
+    environment = get_environment_cached()
+    return build_hashing_executor(
+        environment.HASHING_EXECUTOR_TYPE,
+        environment.HASHING_EXECUTOR_MAX_WORKERS
+    )
+
+
+def shutdown_hashing_executor():
+    if create_hashing_executor_cached.cache_info().currsize:
+        create_hashing_executor_cached().shutdown(wait=False)
+        create_hashing_executor_cached.cache_clear()
+
+
+def recria_hashing_executor(broken_executor: Executor) -> Executor:
+    """
+        Substitui o executor compartilhado quando ele estiver quebrado (ex.: um worker
+        do pool de processos foi encerrado pelo sistema). Requisições simultâneas que
+        encontram o mesmo executor quebrado recriam o pool uma única vez
+    """
+    if create_hashing_executor_cached() is broken_executor:
+        MAIN_LOGGER.error("O pool de hashing está quebrado. Recriando o pool")
+        broken_executor.shutdown(wait=False)
+        create_hashing_executor_cached.cache_clear()
+    return create_hashing_executor_cached()
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from server.dependencies.get_environment_cached import get_environment_cached
+
+
+def build_publisher_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+        Constrói o executor responsável pelas publicações no SNS.
+        As publicações são chamadas HTTPS bloqueantes e por isso são
+        executadas em um pool de threads, fora do event loop
+    """
+    return ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix='sns-publisher')
+
+
+@lru_cache
+def create_publisher_executor_cached() -> ThreadPoolExecutor:
+    environment = get_environment_cached()
+    return build_publisher_executor(environment.SNS_PUBLISHER_MAX_WORKERS)
+
+
+def shutdown_publisher_executor():
+    """
+        Aguarda as publicações pendentes antes de encerrar o executor
+    """
+    if create_publisher_executor_cached.cache_info().currsize:
+        create_publisher_executor_cached().shutdown(wait=True)
+        create_publisher_executor_cached.cache_clear()
@@ -0,0 +1,24 @@
+import aioredis
+from typing import Dict
+
+
+# Clientes Redis compartilhados pelo processo, por URL
+
+REDIS_CLIENTS: Dict[str, aioredis.Redis] = {}
+
+
+def get_redis_client_cached(redis_url: str) -> aioredis.Redis:
+    """
+        As conexões do pool do cliente são abertas apenas no primeiro uso
+    """
+    client = REDIS_CLIENTS.get(redis_url)
+    if client is None:
+        client = REDIS_CLIENTS[redis_url] = aioredis.from_url(redis_url)
+    return client
+
+
+async def fecha_redis_clients():
+    while REDIS_CLIENTS:
+        _, client = REDIS_CLIENTS.popitem()
+        await client.close()
+        await client.connection_pool.disconnect()
@@ -0,0 +1,209 @@
+import asyncio
+import time
+import aiosmtplib
+from collections import deque
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid, parseaddr
+from fastapi_mail import ConnectionConfig, MessageSchema
+from typing import Awaitable, Callable, Deque, List, Optional
+from server.configuration.custom_logging import get_main_logger
+
+
+MAIN_LOGGER = get_main_logger()
+
+
+def build_email_message(message: MessageSchema, sender: str) -> EmailMessage:
+
+    """
+        Monta a mensagem a partir do MessageSchema do fastapi_mail. O conteúdo é
+        codificado em quoted-printable, para que a mensagem seja enviada em ASCII
+        a qualquer servidor. Os destinatários em cópia oculta (bcc) não são
+        incluídos nos headers, apenas no envelope (get_envelope_recipients)
+    """
+
+    if message.attachments or message.template_body:
+        raise ValueError("Anexos e templates não são suportados pelo pool de conexões SMTP")
+
+    email_message = EmailMessage()
+    email_message['Date'] = formatdate(localtime=True)
+    email_message['Message-ID'] = make_msgid()
+    email_message['From'] = sender
+    email_message['To'] = ', '.join(message.recipients)
+    if message.cc:
+        email_message['Cc'] = ', '.join(message.cc)
+    if message.reply_to:
+        email_message['Reply-To'] = ', '.join(message.reply_to)
+    if message.subject:
+        email_message['Subject'] = message.subject
+
+    if message.html:
+        content, subtype = message.html, 'html'
+    else:
+        content, subtype = message.body or '', message.subtype or 'plain'
+    email_message.set_content(content, subtype=subtype, charset=message.charset, cte='quoted-printable')
+    return email_message
+
+
+def get_envelope_recipients(message: MessageSchema) -> List[str]:
+    return [*message.recipients, *message.cc, *message.bcc]
+
+
+class PooledSMTPConnection:
+
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+    async def close(self):
+        try:
+            if self.smtp.is_connected:
+                await self.smtp.quit()
+        except Exception:
+            self.smtp.close()
+
+
+class SMTPConnectionPool:
+
+    """
+        Pool de conexões SMTP persistentes, compartilhado pelo processo.
+
+        Expõe o mesmo send_message(MessageSchema) do FastMail, mas reutiliza conexões
+        já autenticadas entre os envios, evitando um handshake TCP + TLS + AUTH por
+        mensagem:
+            - no máximo max_size conexões abertas ao mesmo tempo
+            - conexões ociosas por mais de noop_after segundos são verificadas com NOOP
+            - conexões ociosas por mais de max_idle segundos são descartadas
+            - cada conexão envia no máximo max_messages mensagens antes de ser renovada
+            - em caso de desconexão antes do DATA (ex.: conexão ociosa encerrada pelo
+              servidor), o envio é repetido uma vez em uma nova conexão. Após o DATA
+              a mensagem pode ter sido aceita, e não é reenviada para não duplicá-la
+    """
+
+    def __init__(self, connect: Callable[[], Awaitable[aiosmtplib.SMTP]], sender: str,
+                 max_size: int = 4, max_messages: int = 100,
+                 noop_after: float = 30, max_idle: float = 300, suppress_send: bool = False):
+        self.connect = connect
+        self.sender = sender
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.noop_after = noop_after
+        self.max_idle = max_idle
+        self.suppress_send = suppress_send
+        self.idle: Deque[PooledSMTPConnection] = deque()
+        self.connections_opened = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def from_config(config: ConnectionConfig, max_size: int, max_messages: int,
+                    noop_after: float, max_idle: float) -> 'SMTPConnectionPool':
+
+        async def connect() -> aiosmtplib.SMTP:
+            smtp = aiosmtplib.SMTP(
+                hostname=config.MAIL_SERVER,
+                port=config.MAIL_PORT,
+                use_tls=config.MAIL_SSL,
+                start_tls=config.MAIL_TLS,
+                validate_certs=config.VALIDATE_CERTS
+            )
+            await smtp.connect()
+            if config.USE_CREDENTIALS:
+                await smtp.login(config.MAIL_USERNAME, config.MAIL_PASSWORD)
+            return smtp
+
+        sender = config.MAIL_FROM
+        if config.MAIL_FROM_NAME is not None:
+            sender = f"{config.MAIL_FROM_NAME} <{config.MAIL_FROM}>"
+
+        return SMTPConnectionPool(
+            connect, sender, max_size, max_messages, noop_after, max_idle, bool(config.SUPPRESS_SEND)
+        )
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        # Criado no primeiro uso, dentro do event loop da aplicação
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_size)
+        return self._semaphore
+
+    async def new_connection(self) -> PooledSMTPConnection:
+        connection = PooledSMTPConnection(await self.connect())
+        self.connections_opened += 1
+        return connection
+
+    async def get_idle_connection(self) -> Optional[PooledSMTPConnection]:
+        while self.idle:
+            connection = self.idle.pop()
+            idle_time = time.monotonic() - connection.last_used
+            if not connection.smtp.is_connected or idle_time > self.max_idle:
+                await connection.close()
+                continue
+            if idle_time > self.noop_after:
+                try:
+                    await connection.smtp.noop()
+                except aiosmtplib.SMTPException:
+                    await connection.close()
+                    continue
+            return connection
+        return None
+
+    @asynccontextmanager
+    async def acquire(self, new_connection: bool = False):
+        """
+            Retira uma conexão do pool (ou abre uma nova), devolvendo-a ao fim do uso.
+            Com new_connection, as conexões ociosas são ignoradas.
+            Conexões com erro não são devolvidas
+        """
+        async with self.get_semaphore():
+            if new_connection:
+                connection = await self.new_connection()
+            else:
+                connection = await self.get_idle_connection() or await self.new_connection()
+            try:
+                yield connection
+            except Exception:
+                await connection.close()
+                raise
+            except BaseException:
+                # Cancelamento (ex.: CancelledError): a conexão pode estar no meio de um
+                # comando. O socket é fechado imediatamente, sem aguardar o QUIT
+                connection.smtp.close()
+                raise
+            connection.last_used = time.monotonic()
+            if connection.messages_sent >= self.max_messages:
+                await connection.close()
+            else:
+                self.idle.append(connection)
+
+    async def send(self, message: EmailMessage, recipients: List[str]):
+        for attempt in range(2):
+            data_sent = False
+            try:
+                async with self.acquire(new_connection=attempt > 0) as connection:
+                    await connection.smtp.mail(parseaddr(self.sender)[1])
+                    # Como no sendmail do aiosmtplib, basta um destinatário aceito
+                    refused = []
+                    for recipient in recipients:
+                        try:
+                            await connection.smtp.rcpt(recipient)
+                        except aiosmtplib.SMTPRecipientRefused as ex:
+                            refused.append(ex)
+                    if len(refused) == len(recipients):
+                        raise aiosmtplib.SMTPRecipientsRefused(refused)
+                    data_sent = True
+                    await connection.smtp.data(message.as_bytes())
+                    connection.messages_sent += 1
+                return
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                if attempt or data_sent:
+                    raise
+                MAIN_LOGGER.warning("Conexão SMTP encerrada pelo servidor. Reenviando em uma nova conexão")
+
+    async def send_message(self, message: MessageSchema):
+        email_message = build_email_message(message, self.sender)
+        if not self.suppress_send:
+            await self.send(email_message, get_envelope_recipients(message))
+
+    async def close(self):
+        while self.idle:
+            await self.idle.pop().close()
@@ -0,0 +1,8 @@
+"""
+    Define as faixas comuns dos histogramas de latência expostos em /metrics
+"""
+
+
+# Limites superiores (em segundos) das faixas dos histogramas de latência
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
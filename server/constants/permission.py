@@ -10,3 +10,17 @@ class RoleBasedPermission:
         'description': 'Capacidade de visualizar todos os usuários do sistema'
     }
 
+    MANAGE_PERMISSIONS = {
+        'name': 'MANAGE_PERMISSIONS',
+        'description': 'Capacidade de administrar o cache de permissões do microsserviço'
+    }
+
+    READ_METRICS = {
+        'name': 'READ_METRICS',
+        'description': 'Capacidade de visualizar as métricas internas do microsserviço'
+    }
+
+    EXPORT_USERS = {
+        'name': 'EXPORT_USERS',
+        'description': 'Capacidade de exportar o diretório completo de usuários do sistema'
+    }
@@ -6,24 +6,27 @@
 """
 
 from server.configuration.exceptions import ApiBaseException
-from server.configuration.db import AsyncSession
-from server.configuration.custom_logging import get_main_logger
+from server.configuration.db import AsyncSession, possui_escritas_pendentes, executa_apos_commit
+from server.configuration.custom_logging import get_main_logger, get_endpoint_logger
 from functools import wraps
 
 
 MAIN_LOGGER = get_main_logger()
+ENDPOINT_LOGGER = get_endpoint_logger()
 
 
 def endpoint_exception_handler(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        MAIN_LOGGER.info("Início do endpoint")
+        ENDPOINT_LOGGER.info("Início do endpoint")
         session: AsyncSession = kwargs.get('session', None)
         try:
             result = await func(*args, **kwargs)
-            MAIN_LOGGER.info("Fim da rotina do endpoint. Commit da sessão do banco de dados acionado")
-            if session:
+            # Requisições apenas de leitura não acionam o commit
+            if session and possui_escritas_pendentes(session):
+                ENDPOINT_LOGGER.info("Fim da rotina do endpoint. Commit da sessão do banco de dados acionado")
                 await session.commit()
+                await executa_apos_commit(session)
             return result
         except ApiBaseException as ex:
             MAIN_LOGGER.warning(
@@ -44,10 +47,9 @@ def endpoint_exception_handler(func):
                 await session.rollback()
             raise ex
         finally:
-            MAIN_LOGGER.info(
-                "Fim do endpoint e da sessão do banco de dados"
+            # A sessão é fechada uma única vez, pela dependência que a criou (get_lazy_session)
+            ENDPOINT_LOGGER.info(
+                "Fim do endpoint"
             )
-            if session:
-                await session.close()
     return wrapper
 
@@ -0,0 +1,359 @@
+from server.schemas import usuario_schema, admin_schema, error_schema
+from fastapi import APIRouter, Depends, Security, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional
+from server.dependencies.session import get_session, get_lazy_read_only_session
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.configuration.db import AsyncSession, LazyAsyncSession, POOL_CHECKOUTS_BY_ENDPOINT
+from server.configuration.environment import Environment
+from server.controllers import endpoint_exception_handler
+from server.dependencies.get_current_user import get_current_user
+from server.constants.permission import RoleBasedPermission
+from server.repository.permissao_repository import PermissaoRepository
+from server.dependencies.get_permission_snapshot import get_permission_snapshot_cached
+from server.services.permission_snapshot_service import PermissionSnapshotService
+from server.dependencies.get_token_cache import get_token_cache
+from server.services.token_cache_service import TokenCacheService
+from server.dependencies.get_user_cache import get_user_cache
+from server.services.user_cache_service import UserCacheService
+from server.repository.usuario_repository import UsuarioRepository
+from server.repository.email_fila_repository import EmailFilaRepository
+from server.utils.accept_encoding import aceita_gzip
+from server.services.usuario_service import UsuarioService
+
+
+router = APIRouter()
+admin_router = dict(
+    router=router,
+    prefix="/admin",
+    tags=["Administração"],
+)
+
+
+@router.get(
+    "/permissions/snapshot",
+    response_model=admin_schema.PermissionSnapshotOutput,
+    summary='Retorna o estado do snapshot de permissões em memória',
+    response_description='Versão, momento de carga e contadores do snapshot',
+    responses={
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def get_permission_snapshot(
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.MANAGE_PERMISSIONS['name']]),
+    permission_snapshot: PermissionSnapshotService = Depends(get_permission_snapshot_cached)
+):
+
+    """
+        # Descrição
+
+        Retorna o estado do snapshot de funções -> permissões deste processo,
+        incluindo os contadores de hits e misses.
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
+    return permission_snapshot.get_stats()
+
+
+@router.post(
+    "/permissions/reload",
+    response_model=admin_schema.PermissionSnapshotOutput,
+    summary='Recarrega o snapshot de permissões em memória',
+    response_description='Estado do snapshot após a recarga',
+    responses={
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def reload_permission_snapshot(
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.MANAGE_PERMISSIONS['name']]),
+    session: AsyncSession = Depends(get_session),
+    permission_snapshot: PermissionSnapshotService = Depends(get_permission_snapshot_cached)
+):
+
+    """
+        # Descrição
+
+        Força a recarga do snapshot de funções -> permissões a partir do banco de dados.
+        Deve ser utilizado após alterações nos vínculos de permissões com funções.
+
+        Note que a recarga é aplicada apenas ao processo que atendeu a requisição. Os demais
+        processos recarregam o snapshot ao fim do TTL (PERMISSION_SNAPSHOT_TTL_IN_SECONDS).
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
+    await permission_snapshot.load(PermissaoRepository(session))
+    return permission_snapshot.get_stats()
+
+
+@router.get(
+    "/db/checkouts",
+    response_model=Dict[str, int],
+    summary='Retorna a quantidade de conexões retiradas do pool por endpoint',
+    response_description='Mapa do template da rota para a quantidade de checkouts',
+    responses={
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def get_pool_checkouts(
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.READ_METRICS['name']]),
+):
+
+    """
+        # Descrição
+
+        Retorna, para cada endpoint, a quantidade de conexões retiradas do pool do
+        banco de dados por este processo. Endpoints que não acessam o banco de dados
+        não aparecem na resposta.
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
+    return dict(POOL_CHECKOUTS_BY_ENDPOINT)
+
+
+@router.get(
+    "/token-cache",
+    response_model=admin_schema.TokenCacheOutput,
+    summary='Retorna o estado do cache de tokens de acesso verificados',
+    response_description='Tamanho, limite e contadores do cache',
+    responses={
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def get_token_cache_stats(
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.READ_METRICS['name']]),
+    token_cache: TokenCacheService = Depends(get_token_cache)
+):
+
+    """
+        # Descrição
+
+        Retorna o estado do cache de tokens de acesso verificados deste processo.
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
+    return token_cache.get_stats()
+
+
+@router.get(
+    "/user-cache",
+    response_model=admin_schema.UserCacheOutput,
+    summary='Retorna o estado do cache de usuários buscados pelo GUID',
+    response_description='Tamanho do cache em memória e contadores de cada nível do cache',
+    responses={
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def get_user_cache_stats(
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.READ_METRICS['name']]),
+    user_cache: Optional[UserCacheService] = Depends(get_user_cache)
+):
+
+    """
+        # Descrição
+
+        Retorna o estado do cache de usuários deste processo: acertos no cache em
+        memória (L1), acertos no Redis (L2), buscas no banco de dados e falhas do Redis.
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
+    if user_cache is None:
+        return {'enabled': False}
+    return {'enabled': True, **user_cache.get_stats()}
+
+
+@router.get(
+    "/email-queue",
+    response_model=admin_schema.EmailQueueOutput,
+    summary='Retorna a profundidade da fila de e-mails',
+    response_description='Quantidade de e-mails pendentes, com falha, data do mais antigo e falhas definitivas',
+    responses={
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def get_email_queue_stats(
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.READ_METRICS['name']]),
+    session: AsyncSession = Depends(get_session)
+):
+
+    """
+        # Descrição
+
+        Retorna a profundidade da fila de e-mails: a quantidade de e-mails pendentes,
+        quantos deles já falharam ao menos uma vez, a data de criação do e-mail
+        pendente mais antigo e a quantidade de e-mails com falha definitiva
+        (**failed**), cujas tentativas de envio foram encerradas. Os valores são lidos do banco de dados e por isso
+        consideram todos os consumidores da fila.
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
+    return await EmailFilaRepository(session).get_estatisticas()
+
+
+@router.get(
+    "/users/export",
+    response_class=StreamingResponse,
+    summary='Exporta todos os usuários registrados no formato NDJSON',
+    response_description='Um usuário (UsuarioOutput) por linha, opcionalmente comprimido com gzip',
+    responses={
+        200: {
+            'content': {'application/x-ndjson': {}}
+        },
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def export_users(
+    request: Request,
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.EXPORT_USERS['name']]),
+    lazy_session: LazyAsyncSession = Depends(get_lazy_read_only_session),
+    environment: Environment = Depends(get_environment_cached),
+):
+
+    """
+        # Descrição
+
+        Exporta todos os usuários registrados no microsserviço de autenticação, no
+        formato NDJSON (um usuário por linha), ordenados por data de criação.
+
+        A resposta é transmitida em partes enquanto os usuários são lidos de um cursor
+        do banco de dados, de forma que o uso de memória do servidor não depende da
+        quantidade de usuários. Caso a requisição contenha o header
+        **Accept-Encoding: gzip**, a resposta é comprimida com gzip.
+
+        # Permissões
+
+        Para acessar esse endpoint é necessário que o usuário seja vinculado à funções
+        especiais no sistema.
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
+    # A sessão é obtida da sessão preguiçosa (e não de get_session) para que não seja
+    # fechada ao fim do endpoint: o cursor é percorrido durante o envio da resposta
+    # e a sessão é fechada pela dependência apenas após o envio do último chunk
+
+    gzip = aceita_gzip(request.headers.get('accept-encoding', ''))
+    service = UsuarioService(
+        UsuarioRepository(lazy_session.get(), environment),
+        environment
+    )
+
+    headers = {'Vary': 'Accept-Encoding'}
+    if gzip:
+        headers['Content-Encoding'] = 'gzip'
+
+    return StreamingResponse(
+        service.exporta_usuarios_ndjson(environment.USERS_EXPORT_BATCH_SIZE, gzip),
+        media_type='application/x-ndjson',
+        headers=headers
+    )
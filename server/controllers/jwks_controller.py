@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi import status
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.configuration.environment import Environment
+from server.dependencies.get_key_ring import get_key_ring
+from server.services.key_ring_service import KeyRingService
+
+
+router = APIRouter()
+jwks_router = dict(
+    router=router,
+    prefix="/.well-known",
+    tags=["JWKS"],
+)
+
+
+@router.get(
+    "/jwks.json",
+    summary='Retorna as chaves públicas utilizadas na assinatura dos tokens de acesso',
+    response_description='JSON Web Key Set com as chaves públicas do chaveiro'
+)
+async def get_jwks(
+    request: Request,
+    key_ring: KeyRingService = Depends(get_key_ring),
+    environment: Environment = Depends(get_environment_cached)
+):
+
+    """
+        # Descrição
+
+        Retorna o JWKS (JSON Web Key Set) com as chaves públicas do chaveiro. Os demais
+        microsserviços podem verificar os tokens de acesso localmente, selecionando a chave
+        pelo header 'kid' do token.
+
+        A resposta pode ser armazenada em cache (Cache-Control) e revalidada pelo ETag
+        (If-None-Match). Com algoritmos HMAC, o conjunto de chaves é vazio.
+
+    """
+
+    content, etag = key_ring.get_jwks_response_content()
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={environment.JWKS_CACHE_MAX_AGE_IN_SECONDS}'
+    }
+
+    if_none_match = request.headers.get('if-none-match', '')
+    if etag in [tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=content, media_type='application/json', headers=headers)
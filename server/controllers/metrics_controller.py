@@ -0,0 +1,55 @@
+import os
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+
+router = APIRouter()
+metrics_router = dict(
+    router=router,
+    prefix="/metrics",
+    tags=["Métricas"],
+)
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    """
+        Com vários processos (ex.: uvicorn --workers N), a variável de ambiente
+        PROMETHEUS_MULTIPROC_DIR deve apontar para um diretório vazio, compartilhado
+        pelos processos. Nesse caso, as métricas de todos os processos são agregadas
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+@router.get(
+    "",
+    summary='Retorna as métricas do microsserviço no formato texto do Prometheus',
+    response_description='Métricas no formato de exposição do Prometheus'
+)
+async def get_metrics():
+
+    """
+        # Descrição
+
+        Retorna as métricas das requisições HTTP, por método e template da rota, e do
+        banco de dados, no formato texto do Prometheus:
+
+        - **authenticator_http_request_duration_seconds**: histograma da latência das requisições.
+        - **authenticator_http_requests_total**: quantidade de requisições, por status.
+        - **authenticator_db_statement_duration_seconds**: histograma da latência dos comandos SQL,
+        por operação.
+        - **authenticator_db_statements_per_request**: histograma da quantidade de comandos SQL por
+        requisição, por endpoint.
+        - **authenticator_db_slow_statements_total**: quantidade de comandos acima de
+        DB_SLOW_QUERY_THRESHOLD_IN_MS, por operação.
+        - **authenticator_db_pool_checkout_wait_seconds**: histograma do tempo de espera por uma
+        conexão do pool, por engine.
+        - **authenticator_db_pool_size** e **authenticator_db_pool_connections**: tamanho e conexões
+        em uso, disponíveis e excedentes (max_overflow) de cada pool.
+
+    """
+
+    return Response(generate_latest(get_metrics_registry()), headers={'Content-Type': CONTENT_TYPE_LATEST})
@@ -1,13 +1,13 @@
 from server.schemas import usuario_schema, token_shema
-from fastapi import APIRouter, Request, Response
+from fastapi import APIRouter, Request, Response, Query
 from server.services.usuario_service import UsuarioService
-from server.dependencies.session import get_session
+from server.dependencies.session import get_session, get_read_only_session
 from server.dependencies.get_environment_cached import get_environment_cached
 from server.configuration.db import AsyncSession
 from fastapi import Depends, Security
 from server.controllers import endpoint_exception_handler
 from fastapi.security import OAuth2PasswordRequestForm
-from typing import List
+from typing import List, Optional
 from server.dependencies.get_current_user import get_current_user
 from server.constants.permission import RoleBasedPermission
 from fastapi.responses import HTMLResponse
@@ -17,8 +17,21 @@ from server.configuration.environment import Environment
 from server.services.email_service import EmailService
 from server.dependencies.get_email_sender_service import get_email_sender_service
 from server.schemas import error_schema
-from server.dependencies.get_sns_publisher_service import get_sns_publisher_service
-from server.services.aws_publisher_service import AWSPublisherService
+from server.dependencies.get_hashing_service import get_hashing_service
+from server.services.hashing_service import HashingService
+from server.dependencies.get_permission_snapshot import get_permission_snapshot_cached
+from server.services.permission_snapshot_service import PermissionSnapshotService
+from server.repository.permissao_repository import PermissaoRepository
+from server.repository.outbox_repository import OutboxRepository
+from server.dependencies.get_key_ring import get_key_ring
+from server.services.key_ring_service import KeyRingService
+from server.dependencies.get_user_cache import get_user_cache
+from server.services.user_cache_service import UserCacheService
+from server.dependencies.get_hashing_bulkhead import get_login_bulkhead, get_signup_bulkhead
+from server.utils.bulkhead import Bulkhead
+from server.dependencies.get_login_throttle import get_login_throttle
+from server.services.login_throttle_service import LoginThrottleService
+from server.utils.client_ip import get_client_ip
 import boto3
 
 
@@ -32,9 +45,9 @@ usuario_router = dict(
 
 @router.get(
     "",
-    response_model=List[usuario_schema.UsuarioOutput],
-    summary='Retorna todos os usuários registrados no microsserviço de autenticação',
-    response_description='Lista dos usuários retornados',
+    response_model=usuario_schema.UsuarioPageOutput,
+    summary='Retorna os usuários registrados no microsserviço de autenticação, paginados',
+    response_description='Página dos usuários retornados e cursor da próxima página',
     responses={
         401: {
             'model': error_schema.ErrorOutput401,
@@ -50,14 +63,22 @@ usuario_router = dict(
 @endpoint_exception_handler
 async def get_all_users(
     _: usuario_schema.CurrentUserToken = Security(get_current_user, scopes=[RoleBasedPermission.READ_ALL_USERS['name']]),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_only_session),
     environment: Environment = Depends(get_environment_cached),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
 ):
 
     """
         # Descrição
 
-        Retorna todos os usuários registrados no microsserviço de autenticação.
+        Retorna os usuários registrados no microsserviço de autenticação, ordenados
+        por data de criação.
+
+        A paginação é feita por cursor: cada página contém no máximo **limit** usuários
+        e, caso existam mais usuários, o campo **next_cursor** deve ser enviado como o
+        parâmetro **cursor** da próxima requisição. A última página retorna
+        **next_cursor** nulo.
 
         # Permissões
 
@@ -71,6 +92,7 @@ async def get_all_users(
         - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
         - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
         recurso.
+        - **(INVALID_CURSOR, 422)**: O cursor informado não é um cursor de paginação válido.
         - **(REQUEST_VALIDATION_ERROR, 422)**: Validação padrão da requisição. O detalhamento é um JSON,
         no formato de string, contendo os erros de validação encontrados.
         - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
@@ -81,7 +103,7 @@ async def get_all_users(
         UsuarioRepository(session, environment),
         environment
     )
-    return await service.get_all_users()
+    return await service.get_all_users(limit, cursor)
 
 
 @router.get(
@@ -142,6 +164,9 @@ async def get_current_user(
         },
         500: {
             'model': error_schema.ErrorOutput500
+        },
+        503: {
+            'model': error_schema.ErrorOutput503
         }
     }
 )
@@ -150,7 +175,8 @@ async def post_novo_usuario(
     usuario_input: usuario_schema.UsuarioInput,
     session: AsyncSession = Depends(get_session),
     environment: Environment = Depends(get_environment_cached),
-    publisher_service: AWSPublisherService = Depends(get_sns_publisher_service)
+    hashing_service: HashingService = Depends(get_hashing_service),
+    hashing_bulkhead: Bulkhead = Depends(get_signup_bulkhead)
 ):
 
     """
@@ -168,13 +194,17 @@ async def post_novo_usuario(
         no formato de string, contendo os erros de validação encontrados.
         - **(INVALID_EMAIL, 422)**: E-mail não pertence ao domínio da UNICAMP.
         - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+        - **(SERVICE_OVERLOADED, 503)**: Capacidade de cadastros simultâneos esgotada. O header
+        **Retry-After** indica em quantos segundos a requisição pode ser repetida.
 
     """
 
     service = UsuarioService(
         UsuarioRepository(session, environment),
         environment,
-        publisher_service=publisher_service
+        outbox_repo=OutboxRepository(session),
+        hashing_service=hashing_service,
+        hashing_bulkhead=hashing_bulkhead
     )
     return await service.cria_novo_usuario(usuario_input)
 
@@ -191,16 +221,28 @@ async def post_novo_usuario(
         422: {
             'model': error_schema.ErrorOutput422
         },
+        429: {
+            'model': error_schema.ErrorOutput429
+        },
         500: {
             'model': error_schema.ErrorOutput500
+        },
+        503: {
+            'model': error_schema.ErrorOutput503
         }
     }
 )
 @endpoint_exception_handler
 async def get_login_access_token(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: AsyncSession = Depends(get_session),
-    environment: Environment = Depends(get_environment_cached)
+    environment: Environment = Depends(get_environment_cached),
+    hashing_service: HashingService = Depends(get_hashing_service),
+    permission_snapshot: PermissionSnapshotService = Depends(get_permission_snapshot_cached),
+    key_ring: KeyRingService = Depends(get_key_ring),
+    hashing_bulkhead: Bulkhead = Depends(get_login_bulkhead),
+    login_throttle: Optional[LoginThrottleService] = Depends(get_login_throttle)
 ):
 
     """
@@ -221,15 +263,26 @@ async def get_login_access_token(
             - Usuário não encontrado no sistema
         - **(REQUEST_VALIDATION_ERROR, 422)**: Validação padrão da requisição. O detalhamento é um JSON,
         no formato de string, contendo os erros de validação encontrados.
+        - **(TOO_MANY_LOGIN_ATTEMPTS, 429)**: Limite de falhas de autenticação excedido para o username
+        ou limite de tentativas de login excedido para o IP do cliente. O header **Retry-After** indica em quantos segundos a requisição pode
+        ser repetida.
         - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+        - **(SERVICE_OVERLOADED, 503)**: Capacidade de logins simultâneos esgotada. O header
+        **Retry-After** indica em quantos segundos a requisição pode ser repetida.
 
     """
 
     service = UsuarioService(
         UsuarioRepository(session, environment),
-        environment
+        environment,
+        hashing_service=hashing_service,
+        permission_repo=PermissaoRepository(session, environment),
+        permission_snapshot=permission_snapshot,
+        key_ring=key_ring,
+        hashing_bulkhead=hashing_bulkhead,
+        login_throttle=login_throttle
     )
-    return await service.gera_novo_token_login(form_data)
+    return await service.gera_novo_token_login(form_data, get_client_ip(request, environment.TRUSTED_PROXY_HOPS))
 
 
 @router.post(
@@ -261,8 +314,9 @@ async def send_email_verification_link(
         Envia um email de verificação ao usuário contendo um link de verificação.
         Nesse link, há um token criado por esse endpoint.
 
-        Note que o e-mail é enviado de maneira assíncrona. O endpoint retorna o sucesso
-        mesmo sem saber se o e-mail foi enviado.
+        Note que o e-mail é enviado de maneira assíncrona: o e-mail é gravado em uma fila
+        e enviado por um processo consumidor. O endpoint retorna o sucesso mesmo sem
+        saber se o e-mail foi enviado.
 
         Quando o usuário clicar no link, o e-mail do usuário é confirmado.
 
@@ -296,14 +350,79 @@ async def send_email_verification_link(
 async def verify_email(
     request: Request, code: str,
     session: AsyncSession = Depends(get_session),
+    environment: Environment = Depends(get_environment_cached),
+    user_cache: Optional[UserCacheService] = Depends(get_user_cache)
+):
+
+    service = UsuarioService(
+        UsuarioRepository(session, environment),
+        environment,
+        user_cache=user_cache
+    )
+    return await service.verify_email(request, code)
+
+
+@router.post(
+    "/batch",
+    response_model=usuario_schema.UsuarioBatchOutput,
+    summary='Retorna os usuários de uma lista de GUIDs, em uma única requisição',
+    response_description='Usuários encontrados, indexados pelo GUID, e GUIDs não encontrados',
+    responses={
+        401: {
+            'model': error_schema.ErrorOutput401,
+        },
+        422: {
+            'model': error_schema.ErrorOutput422,
+        },
+        500: {
+            'model': error_schema.ErrorOutput500
+        }
+    }
+)
+@endpoint_exception_handler
+async def get_users_by_guids(
+    batch_input: usuario_schema.UsuarioBatchInput,
+    _: usuario_schema.CurrentUserToken = Security(
+        get_current_user, scopes=[RoleBasedPermission.READ_ALL_USERS['name']]),
+    session: AsyncSession = Depends(get_read_only_session),
     environment: Environment = Depends(get_environment_cached)
 ):
 
+    """
+        # Descrição
+
+        Retorna os usuários de uma lista de até 500 GUIDs, buscados em uma única consulta. Deve ser
+        utilizado no lugar de várias requisições ao endpoint **GET /users/{guid_usuario}**, por exemplo,
+        para exibir os membros de um projeto.
+
+        Os usuários encontrados são retornados no campo **users**, indexados pelo GUID, e os GUIDs
+        sem usuário correspondente são listados no campo **not_found**. GUIDs repetidos são
+        considerados apenas uma vez.
+
+        # Permissões
+
+        Apenas usuários com cargos com permissão 'READ_ALL_USERS' (Leitura de qualquer usuário)
+        possuem a autorização para acessar essa requisição.
+
+        # Erros
+
+        Segue a lista de erros, por (**error_id**, **status_code**), que podem ocorrer nesse endpoint:
+
+        - **(INVALID_OR_EXPIRED_TOKEN, 401)**: Token de acesso inválido ou expirado.
+        - **(NOT_ENOUGH_PERMISSION, 401)**: A sessão atual do usuário não permite que o usuário acesse o
+        recurso.
+        - **(REQUEST_VALIDATION_ERROR, 422)**: Validação padrão da requisição, incluindo GUIDs inválidos
+        e listas vazias ou com mais de 500 GUIDs. O detalhamento é um JSON, no formato de string, contendo
+        os erros de validação encontrados.
+        - **(INTERNAL_SERVER_ERROR, 500)**: Erro interno no sistema
+
+    """
+
     service = UsuarioService(
         UsuarioRepository(session, environment),
         environment
     )
-    return await service.verify_email(request, code)
+    return await service.get_users_by_guids(batch_input.guids)
 
 
 @router.get(
@@ -332,8 +451,9 @@ async def get_user_by_guid(
     guid_usuario: str,
     _: usuario_schema.CurrentUserToken = Security(
         get_current_user, scopes=[RoleBasedPermission.READ_ALL_USERS['name']]),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_only_session),
     environment: Environment = Depends(get_environment_cached),
+    user_cache: Optional[UserCacheService] = Depends(get_user_cache)
 ):
 
     """
@@ -358,7 +478,8 @@ async def get_user_by_guid(
             db_session=session,
             environment=environment
         ),
-        environment=environment
+        environment=environment,
+        user_cache=user_cache
     )
 
     return await usuario_service.get_user_by_guid(guid_usuario)
@@ -1,89 +1,116 @@
 from fastapi import Depends
 from server.dependencies.oauth2 import oauth2_scheme
-from server.dependencies.session import get_session
-from server.configuration.db import AsyncSession
+from server.dependencies.session import get_lazy_session
+from server.configuration.db import LazyAsyncSession
 from server.schemas.usuario_schema import CurrentUserToken
-from jose import JWTError, jwt
+from jose import JWTError
 from server.configuration import exceptions
 from pydantic import ValidationError
 from server.schemas.token_shema import DecodedAccessToken
 from server.repository.permissao_repository import PermissaoRepository
 from starlette_context import context
-from server.configuration.custom_logging import get_main_logger
+from server.configuration.custom_logging import get_endpoint_logger
 from server.dependencies.get_environment_cached import get_environment_cached
 from server.configuration.environment import Environment
 from server.dependencies.get_security_scopes import get_security_scopes
 from fastapi.security import SecurityScopes
+from typing import Optional, Tuple
+from server.dependencies.get_permission_snapshot import get_permission_snapshot_cached
+from server.services.permission_snapshot_service import PermissionSnapshotService
+from server.dependencies.get_key_ring import get_key_ring
+from server.services.key_ring_service import KeyRingService
+from server.dependencies.get_token_cache import get_token_cache
+from server.services.token_cache_service import TokenCacheService
 
 
-MAIN_LOGGER = get_main_logger()
+ENDPOINT_LOGGER = get_endpoint_logger()
 
 
-async def get_current_user(
-    required_security_permission_scopes: SecurityScopes = Depends(get_security_scopes),
-    session: AsyncSession = Depends(get_session),
-    token: str = Depends(oauth2_scheme),
-    environment: Environment = Depends(get_environment_cached)
-) -> CurrentUserToken:
+def decodifica_token(token: str, key_ring: KeyRingService,
+                     environment: Environment) -> Tuple[CurrentUserToken, Optional[float]]:
 
-    try:
+    """
+        Verifica a assinatura e a expiração do token e constrói o usuário atual.
+        Retorna o usuário e o timestamp de expiração do token.
+        Lança InvalidExpiredTokenException caso o token seja inválido ou expirado
+    """
 
-        """
-            Verifique se o token foi expirado ou é inválido
-    
-            Verifica as permissões requeridas pelo endpoint atual
-            em required_security_permission_scopes e compara com as
-            permissões vinculadas às funções do usuário
-    
-            Se as condições forem satisfeitas, retorna o usuário
-            atual, que fez a requisição
-        """
-
-        MAIN_LOGGER.info("Início da rotina de decodificação de token do usuário")
-
-        try:
-            decoded_token_dict = jwt.decode(
-                token,
-                environment.ACCESS_TOKEN_SECRET_KEY,
-                algorithms=[environment.ACCESS_TOKEN_ALGORITHM]
-            )
-            decoded_token = DecodedAccessToken(**decoded_token_dict)
-        except (JWTError, ValidationError) as ex:
-            raise exceptions.InvalidExpiredTokenException()
+    try:
+        decoded_token_dict = key_ring.decode(token)
+        decoded_token = DecodedAccessToken(**decoded_token_dict)
+    except (JWTError, ValidationError):
+        raise exceptions.InvalidExpiredTokenException()
 
-        permission_repo = PermissaoRepository(session)
-        roles = [int(role) for role in decoded_token.roles]
+    user_dict = {
+        'username': decoded_token.username,
+        'email': decoded_token.email,
+        'guid': decoded_token.guid,
+        'name': decoded_token.name,
+        'roles': [int(role) for role in decoded_token.roles]
+    }
 
-        user_dict = {
-            'username': decoded_token.username,
-            'email': decoded_token.email,
-            'guid': decoded_token.guid,
-            'name': decoded_token.name,
-            'roles': roles
-        }
+    if environment.ACCESS_TOKEN_EMBED_PERMISSIONS and decoded_token.perms is not None:
+        user_dict['permissions'] = decoded_token.perms
 
-        if len(required_security_permission_scopes.scopes) > 0:
-            user_permissions = await permission_repo.find_permissions_by_roles_list(roles)
-            user_permissions_names = [permission.nome for permission in user_permissions]
+    return CurrentUserToken(**user_dict), decoded_token_dict.get('exp')
 
-            for required_permission_scope in required_security_permission_scopes.scopes:
-                if required_permission_scope not in user_permissions_names:
-                    raise exceptions.NotEnoughPermissionsException(
-                        detail=f'O usuário {decoded_token.username} não tem as permissões necessárias para acessar esse recurso'
-                    )
 
-        current_user = CurrentUserToken(**user_dict)
+async def get_current_user(
+    required_security_permission_scopes: SecurityScopes = Depends(get_security_scopes),
+    lazy_session: LazyAsyncSession = Depends(get_lazy_session),
+    token: str = Depends(oauth2_scheme),
+    environment: Environment = Depends(get_environment_cached),
+    permission_snapshot: PermissionSnapshotService = Depends(get_permission_snapshot_cached),
+    key_ring: KeyRingService = Depends(get_key_ring),
+    token_cache: TokenCacheService = Depends(get_token_cache)
+) -> CurrentUserToken:
 
-        # Determina o contexto para que o usuário possa ser recuperado globalmente
-        context.data['current_user'] = current_user
+    """
+        Verifique se o token foi expirado ou é inválido. Tokens já
+        verificados são recuperados do cache de tokens até a sua expiração
+
+        Verifica as permissões requeridas pelo endpoint atual
+        em required_security_permission_scopes e compara com as
+        permissões vinculadas às funções do usuário, resolvidas
+        a partir do snapshot em memória de funções -> permissões.
+        No modo de permissões embutidas, são utilizadas as permissões
+        assinadas no próprio token, sem acesso ao banco de dados
+
+        A sessão do banco de dados é compartilhada com o endpoint e só é
+        aberta caso as permissões precisem ser resolvidas no servidor. As
+        permissões são sempre lidas do primário, e não de uma réplica
+        possivelmente atrasada
+
+        Se as condições forem satisfeitas, retorna o usuário
+        atual, que fez a requisição
+    """
+
+    ENDPOINT_LOGGER.info("Início da rotina de decodificação de token do usuário")
+
+    current_user = token_cache.get(token)
+    if current_user is None:
+        current_user, exp = decodifica_token(token, key_ring, environment)
+        token_cache.put(token, current_user, exp)
+
+    if len(required_security_permission_scopes.scopes) > 0:
+        if current_user.permissions is not None:
+            user_permissions_names = set(current_user.permissions)
+        else:
+            user_permissions_names = await permission_snapshot.get_permissions(
+                current_user.roles,
+                PermissaoRepository(lazy_session.get()),
+                environment.PERMISSION_SNAPSHOT_TTL_IN_SECONDS
+            )
 
-        MAIN_LOGGER.info("Fim da rotina de decodificação de token de usuário. O usuário foi autenticado e autorizado")
+        for required_permission_scope in required_security_permission_scopes.scopes:
+            if required_permission_scope not in user_permissions_names:
+                raise exceptions.NotEnoughPermissionsException(
+                    detail=f'O usuário {current_user.username} não tem as permissões necessárias para acessar esse recurso'
+                )
 
-        return current_user
+    # Determina o contexto para que o usuário possa ser recuperado globalmente
+    context.data['current_user'] = current_user
 
-    except Exception as ex:
-        await session.rollback()
-        raise ex
-    finally:
-        await session.close()
+    ENDPOINT_LOGGER.info("Fim da rotina de decodificação de token de usuário. O usuário foi autenticado e autorizado")
 
+    return current_user
@@ -1,30 +1,19 @@
-from fastapi_mail import ConnectionConfig, FastMail
 from server.services.email_service import EmailService
-from fastapi import BackgroundTasks, Depends
-from server.dependencies.get_environment_cached import get_environment_cached
-from server.configuration.environment import Environment
+from server.repository.email_fila_repository import EmailFilaRepository
+from fastapi import Depends
+from server.dependencies.session import get_session
+from server.configuration.db import AsyncSession
 
 
 def get_email_sender_service(
-    background_tasks: BackgroundTasks,
-    environment: Environment = Depends(get_environment_cached)
+    session: AsyncSession = Depends(get_session)
 ):
 
-    email_api = FastMail(
-        ConnectionConfig(
-            MAIL_USERNAME=environment.MAIL_USERNAME,
-            MAIL_PASSWORD=environment.MAIL_PASSWORD,
-            MAIL_FROM=environment.MAIL_FROM,
-            MAIL_PORT=environment.MAIL_PORT,
-            MAIL_SERVER=environment.MAIL_SERVER,
-            MAIL_TLS=bool(environment.MAIL_TLS),
-            MAIL_SSL=bool(environment.MAIL_SSL),
-            USE_CREDENTIALS=bool(environment.MAIL_USE_CREDENTIALS)
-        )
-    )
+    """
+        Retorna o serviço de envio de e-mails. Os e-mails são gravados na fila
+        com a sessão da requisição e enviados pelo EmailWorkerService
+    """
 
     return EmailService(
-        email_api,
-        background_tasks
+        EmailFilaRepository(session)
     )
-
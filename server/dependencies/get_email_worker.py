@@ -0,0 +1,70 @@
+from fastapi_mail import ConnectionConfig
+from functools import lru_cache
+from server.configuration.db import build_async_session_maker
+from server.configuration.smtp_pool import SMTPConnectionPool
+from server.configuration.custom_logging import get_main_logger
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.services.email_worker_service import EmailWorkerService
+
+
+MAIN_LOGGER = get_main_logger()
+
+
+@lru_cache
+def create_smtp_pool_cached() -> SMTPConnectionPool:
+    environment = get_environment_cached()
+    return SMTPConnectionPool.from_config(
+        ConnectionConfig(
+            MAIL_USERNAME=environment.MAIL_USERNAME,
+            MAIL_PASSWORD=environment.MAIL_PASSWORD,
+            MAIL_FROM=environment.MAIL_FROM,
+            MAIL_PORT=environment.MAIL_PORT,
+            MAIL_SERVER=environment.MAIL_SERVER,
+            MAIL_TLS=bool(environment.MAIL_TLS),
+            MAIL_SSL=bool(environment.MAIL_SSL),
+            USE_CREDENTIALS=bool(environment.MAIL_USE_CREDENTIALS)
+        ),
+        environment.MAIL_POOL_MAX_SIZE,
+        environment.MAIL_POOL_MAX_MESSAGES_PER_CONNECTION,
+        environment.MAIL_POOL_NOOP_AFTER_IN_SECONDS,
+        environment.MAIL_POOL_MAX_IDLE_IN_SECONDS
+    )
+
+
+@lru_cache
+def get_email_worker_cached() -> EmailWorkerService:
+    environment = get_environment_cached()
+    return EmailWorkerService(
+        build_async_session_maker,
+        create_smtp_pool_cached(),
+        environment.EMAIL_WORKER_BATCH_SIZE,
+        environment.EMAIL_WORKER_POLL_INTERVAL_IN_SECONDS,
+        environment.EMAIL_WORKER_MAX_BACKOFF_IN_SECONDS,
+        environment.MAIL_POOL_MAX_SIZE,
+        environment.EMAIL_WORKER_MAX_ATTEMPTS
+    )
+
+
+async def inicia_email_worker():
+
+    """
+        Inicia o envio dos e-mails da fila no próprio processo da API, apenas
+        quando EMAIL_WORKER_IN_APP está habilitado. Por padrão os e-mails são
+        enviados por um processo separado (python -m server.email_worker)
+    """
+
+    try:
+        if get_environment_cached().EMAIL_WORKER_IN_APP:
+            get_email_worker_cached().start()
+    except Exception:
+        MAIN_LOGGER.warning(
+            "Não foi possível iniciar o envio de e-mails da fila",
+            exc_info=True
+        )
+
+
+async def encerra_email_worker():
+    if get_email_worker_cached.cache_info().currsize:
+        await get_email_worker_cached().stop()
+    if create_smtp_pool_cached.cache_info().currsize:
+        await create_smtp_pool_cached().close()
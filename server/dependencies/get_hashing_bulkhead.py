@@ -0,0 +1,46 @@
+import os
+from fastapi import Depends
+from functools import lru_cache
+from server.configuration.environment import Environment
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.utils.bulkhead import Bulkhead
+
+
+LOGIN_BULKHEAD = 'login'
+SIGNUP_BULKHEAD = 'signup'
+
+
+@lru_cache
+def build_hashing_bulkhead_cached(name: str, max_concurrent: int, max_queue: int,
+                                  queue_timeout: float, retry_after: int) -> Bulkhead:
+    return Bulkhead(name, max_concurrent, max_queue, queue_timeout, retry_after)
+
+
+def get_hashing_bulkhead(name: str, environment: Environment) -> Bulkhead:
+
+    """
+        Cada rota possui seu próprio bulkhead, para que uma rajada de logins
+        não impeça novos cadastros (e vice-versa)
+    """
+
+    max_concurrent = environment.HASHING_BULKHEAD_MAX_CONCURRENT
+    if max_concurrent <= 0:
+        max_concurrent = environment.HASHING_EXECUTOR_MAX_WORKERS
+    if max_concurrent <= 0:
+        max_concurrent = os.cpu_count() or 1
+
+    return build_hashing_bulkhead_cached(
+        name,
+        max_concurrent,
+        environment.HASHING_BULKHEAD_MAX_QUEUE,
+        environment.HASHING_BULKHEAD_QUEUE_TIMEOUT_IN_SECONDS,
+        environment.HASHING_BULKHEAD_RETRY_AFTER_IN_SECONDS
+    )
+
+
+def get_login_bulkhead(environment: Environment = Depends(get_environment_cached)) -> Bulkhead:
+    return get_hashing_bulkhead(LOGIN_BULKHEAD, environment)
+
+
+def get_signup_bulkhead(environment: Environment = Depends(get_environment_cached)) -> Bulkhead:
+    return get_hashing_bulkhead(SIGNUP_BULKHEAD, environment)
@@ -0,0 +1,20 @@
+from fastapi import Depends
+from server.configuration.environment import Environment
+from server.configuration.hashing_executor import create_hashing_executor_cached, recria_hashing_executor
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.services.hashing_service import HashingService
+
+
+def get_hashing_service(environment: Environment = Depends(get_environment_cached)) -> HashingService:
+
+    """
+        Retorna o serviço de hashing de senhas utilizando o executor
+        compartilhado pelo processo e o custo do bcrypt configurado.
+        Caso o executor esteja quebrado, ele é recriado
+    """
+
+    return HashingService(
+        create_hashing_executor_cached(),
+        environment.HASHING_BCRYPT_ROUNDS,
+        recria_hashing_executor
+    )
@@ -0,0 +1,27 @@
+from fastapi import Depends
+from functools import lru_cache
+from typing import Tuple
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.configuration.environment import Environment
+from server.services.key_ring_service import KeyRingService
+
+
+@lru_cache
+def build_key_ring_cached(algorithm: str, secret_key: str, private_keys: Tuple[Tuple[str, str], ...],
+                          active_kid: str) -> KeyRingService:
+    return KeyRingService(algorithm, secret_key, dict(private_keys), active_kid)
+
+
+def get_key_ring(environment: Environment = Depends(get_environment_cached)) -> KeyRingService:
+
+    """
+        Retorna o chaveiro dos tokens de acesso.
+        As chaves são carregadas uma única vez para cada configuração
+    """
+
+    return build_key_ring_cached(
+        environment.ACCESS_TOKEN_ALGORITHM,
+        environment.ACCESS_TOKEN_SECRET_KEY,
+        tuple(sorted(environment.ACCESS_TOKEN_PRIVATE_KEYS.items())),
+        environment.ACCESS_TOKEN_ACTIVE_KID
+    )
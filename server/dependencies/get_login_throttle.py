@@ -0,0 +1,36 @@
+from fastapi import Depends
+from functools import lru_cache
+from typing import Optional
+from server.configuration.environment import Environment
+from server.configuration.redis import get_redis_client_cached
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.services.login_throttle_service import LoginThrottleService
+from server.utils.rate_limiter import InMemoryRateLimiter, RedisRateLimiter
+
+
+@lru_cache
+def build_login_throttle_cached(redis_url: str, window: int, max_attempts_per_username: int,
+                                max_attempts_per_ip: int, max_keys: int) -> LoginThrottleService:
+    if redis_url:
+        limiter = RedisRateLimiter(get_redis_client_cached(redis_url), window)
+    else:
+        limiter = InMemoryRateLimiter(window, max_keys)
+    return LoginThrottleService(limiter, max_attempts_per_username, max_attempts_per_ip)
+
+
+def get_login_throttle(environment: Environment = Depends(get_environment_cached)) -> Optional[LoginThrottleService]:
+
+    """
+        Retorna o limite de tentativas de login compartilhado pelo processo,
+        ou None caso o limite esteja desabilitado
+    """
+
+    if not environment.LOGIN_THROTTLE_ENABLED:
+        return None
+    return build_login_throttle_cached(
+        environment.REDIS_URL,
+        environment.LOGIN_THROTTLE_WINDOW_IN_SECONDS,
+        environment.LOGIN_THROTTLE_MAX_ATTEMPTS_PER_USERNAME,
+        environment.LOGIN_THROTTLE_MAX_ATTEMPTS_PER_IP,
+        environment.LOGIN_THROTTLE_MAX_KEYS
+    )
@@ -0,0 +1,45 @@
+from functools import lru_cache
+from server.configuration.db import build_async_session_maker
+from server.configuration.custom_logging import get_main_logger
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.dependencies.get_sns_publisher_service import get_sns_publisher_service_cached
+from server.services.outbox_dispatcher_service import OutboxDispatcherService
+
+
+MAIN_LOGGER = get_main_logger()
+
+
+@lru_cache
+def get_outbox_dispatcher_cached() -> OutboxDispatcherService:
+    environment = get_environment_cached()
+    return OutboxDispatcherService(
+        build_async_session_maker,
+        get_sns_publisher_service_cached(environment),
+        environment.OUTBOX_BATCH_SIZE,
+        environment.OUTBOX_POLL_INTERVAL_IN_SECONDS,
+        environment.OUTBOX_MAX_BACKOFF_IN_SECONDS,
+        environment.OUTBOX_MAX_ATTEMPTS
+    )
+
+
+async def inicia_outbox_dispatcher():
+
+    """
+        Inicia a publicação dos eventos do outbox em segundo plano.
+        Uma falha não impede a inicialização: os eventos permanecem
+        no outbox até que algum processo os publique
+    """
+
+    try:
+        if get_environment_cached().OUTBOX_DISPATCHER_ENABLED:
+            get_outbox_dispatcher_cached().start()
+    except Exception:
+        MAIN_LOGGER.warning(
+            "Não foi possível iniciar o publicador de eventos do outbox",
+            exc_info=True
+        )
+
+
+async def encerra_outbox_dispatcher():
+    if get_outbox_dispatcher_cached.cache_info().currsize:
+        await get_outbox_dispatcher_cached().stop()
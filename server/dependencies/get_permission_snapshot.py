@@ -0,0 +1,32 @@
+from functools import lru_cache
+from server.configuration.db import build_async_session_maker
+from server.configuration.custom_logging import get_main_logger
+from server.repository.permissao_repository import PermissaoRepository
+from server.services.permission_snapshot_service import PermissionSnapshotService
+
+
+MAIN_LOGGER = get_main_logger()
+
+
+@lru_cache
+def get_permission_snapshot_cached() -> PermissionSnapshotService:
+    return PermissionSnapshotService()
+
+
+async def carrega_permission_snapshot():
+
+    """
+        Carrega o snapshot de permissões na inicialização da aplicação.
+        Uma falha não impede a inicialização, já que o snapshot também
+        é carregado no primeiro uso
+    """
+
+    try:
+        session_maker = build_async_session_maker()
+        async with session_maker() as session:
+            await get_permission_snapshot_cached().load(PermissaoRepository(session))
+    except Exception:
+        MAIN_LOGGER.warning(
+            "Não foi possível carregar o snapshot de permissões na inicialização",
+            exc_info=True
+        )
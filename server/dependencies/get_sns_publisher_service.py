@@ -1,7 +1,7 @@
 import boto3
-from fastapi import Depends
+from functools import lru_cache
 from server.configuration.custom_logging import get_main_logger
-from server.dependencies.get_environment_cached import get_environment_cached
+from server.configuration.publisher_executor import create_publisher_executor_cached
 from server.configuration.environment import Environment
 from server.services.aws_publisher_service import AWSPublisherService
 
@@ -9,20 +9,38 @@ from server.services.aws_publisher_service import AWSPublisherService
 MAIN_LOGGER = get_main_logger()
 
 
-async def get_sns_publisher_service(
-    environment: Environment = Depends(get_environment_cached)
-) -> AWSPublisherService:
-
+def build_sns_client(access_key_id: str, secret_key: str, region_name: str, endpoint_url: str = ''):
     """
-        Retorna um client boto3 para as mensagens SNS para a AWS
+        Constrói um client boto3 para o SNS. O endpoint_url permite apontar
+        o client para um SNS local (ex.: localstack ou moto) nos testes
     """
-
-    boto3_client = boto3.client(
+    return boto3.client(
         'sns',
-        aws_access_key_id=environment.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=environment.AWS_SECRET_KEY,
-        region_name=environment.AWS_REGION_NAME
+        aws_access_key_id=access_key_id,
+        aws_secret_access_key=secret_key,
+        region_name=region_name,
+        endpoint_url=endpoint_url or None
+    )
+
+
+@lru_cache
+def build_sns_publisher_service_cached(access_key_id: str, secret_key: str, region_name: str,
+                                       endpoint_url: str) -> AWSPublisherService:
+    return AWSPublisherService(
+        build_sns_client(access_key_id, secret_key, region_name, endpoint_url),
+        create_publisher_executor_cached()
     )
 
-    return AWSPublisherService(boto3_client)
+
+def get_sns_publisher_service_cached(environment: Environment) -> AWSPublisherService:
+    """
+        Retorna o publicador de mensagens SNS utilizado pelo OutboxDispatcherService.
+        O client boto3 é criado uma única vez por processo
+    """
+    return build_sns_publisher_service_cached(
+        environment.AWS_ACCESS_KEY_ID,
+        environment.AWS_SECRET_KEY,
+        environment.AWS_REGION_NAME,
+        environment.AWS_SNS_ENDPOINT_URL
+    )
 
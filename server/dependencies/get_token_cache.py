@@ -0,0 +1,19 @@
+from fastapi import Depends
+from functools import lru_cache
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.configuration.environment import Environment
+from server.services.token_cache_service import TokenCacheService
+
+
+@lru_cache
+def build_token_cache_cached(max_size: int) -> TokenCacheService:
+    return TokenCacheService(max_size)
+
+
+def get_token_cache(environment: Environment = Depends(get_environment_cached)) -> TokenCacheService:
+
+    """
+        Retorna o cache de tokens verificados compartilhado pelo processo
+    """
+
+    return build_token_cache_cached(environment.ACCESS_TOKEN_CACHE_MAX_SIZE)
@@ -0,0 +1,34 @@
+from fastapi import Depends
+from functools import lru_cache
+from typing import Optional
+from server.configuration.environment import Environment
+from server.configuration.redis import get_redis_client_cached
+from server.dependencies.get_environment_cached import get_environment_cached
+from server.services.user_cache_service import UserCacheService
+
+
+@lru_cache
+def build_user_cache_cached(redis_url: str, ttl: int, l1_max_size: int, l1_ttl: float) -> UserCacheService:
+    return UserCacheService(
+        get_redis_client_cached(redis_url) if redis_url else None,
+        ttl,
+        l1_max_size,
+        l1_ttl
+    )
+
+
+def get_user_cache(environment: Environment = Depends(get_environment_cached)) -> Optional[UserCacheService]:
+
+    """
+        Retorna o cache de usuários compartilhado pelo processo,
+        ou None caso o cache esteja desabilitado
+    """
+
+    if not environment.USER_CACHE_ENABLED:
+        return None
+    return build_user_cache_cached(
+        environment.REDIS_URL,
+        environment.USER_CACHE_TTL_IN_SECONDS,
+        environment.USER_CACHE_L1_MAX_SIZE,
+        environment.USER_CACHE_L1_TTL_IN_SECONDS
+    )
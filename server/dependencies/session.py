@@ -1,8 +1,40 @@
-from server.configuration.db import AsyncSession, build_async_session_maker
+from fastapi import Depends, Request
+from server.configuration.db import AsyncSession, LazyAsyncSession, build_async_session_maker, \
+    build_read_only_session_maker
+from server.utils.routes import get_route_path
 
 
-async def get_session() -> AsyncSession:
-    session_maker = build_async_session_maker()
-    async with session_maker() as session:
-        yield session
-        await session.close()
+async def get_lazy_session(request: Request) -> LazyAsyncSession:
+    lazy_session = LazyAsyncSession(
+        build_async_session_maker,
+        endpoint=get_route_path(request.scope)
+    )
+    try:
+        yield lazy_session
+    finally:
+        await lazy_session.close()
+
+
+async def get_session(lazy_session: LazyAsyncSession = Depends(get_lazy_session)) -> AsyncSession:
+    return lazy_session.get()
+
+
+async def get_lazy_read_only_session(request: Request) -> LazyAsyncSession:
+    """
+        Sessão das dependências apenas de leitura, enviada a uma réplica
+        quando DATABASE_REPLICA_URLS estiver configurada
+    """
+    lazy_session = LazyAsyncSession(
+        build_read_only_session_maker,
+        endpoint=get_route_path(request.scope)
+    )
+    try:
+        yield lazy_session
+    finally:
+        await lazy_session.close()
+
+
+async def get_read_only_session(
+    lazy_session: LazyAsyncSession = Depends(get_lazy_read_only_session)
+) -> AsyncSession:
+    return lazy_session.get()
@@ -0,0 +1,34 @@
+"""
+    Processo consumidor da fila de e-mails
+
+    Envia os e-mails gravados pela API em tb_email_fila, mantendo os processos
+    da API livres do trabalho de SMTP. Vários consumidores podem ser executados
+    ao mesmo tempo.
+
+    Uso: python -m server.email_worker
+"""
+
+import asyncio
+import signal
+from server import configura_logger, configura_logger_por_ambiente
+from server.configuration.custom_logging import Logger
+from server.dependencies.get_email_worker import get_email_worker_cached, encerra_email_worker
+
+
+async def main():
+    configura_logger()
+    await configura_logger_por_ambiente()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    get_email_worker_cached().start()
+    await stop.wait()
+    await encerra_email_worker()
+    Logger.stop_listeners()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
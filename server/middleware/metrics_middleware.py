@@ -0,0 +1,67 @@
+import time
+from prometheus_client import Counter, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Tuple
+from server.constants.metrics import LATENCY_BUCKETS
+from server.utils.routes import get_route_path
+
+
+# Requisições que não correspondem a nenhuma rota são agrupadas em um único
+# rótulo, para que paths arbitrários não aumentem a cardinalidade das métricas
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+REQUEST_LATENCY = Histogram(
+    'authenticator_http_request_duration_seconds',
+    'Latência das requisições HTTP, por método e template da rota',
+    ['method', 'route'],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter(
+    'authenticator_http_requests',
+    'Quantidade de requisições HTTP, por método, template da rota e status',
+    ['method', 'route', 'status']
+)
+
+
+class PrometheusMiddleware:
+
+    """
+        Middleware ASGI que registra a latência e o status de cada requisição HTTP,
+        rotulados pelo template da rota (ex.: /users/{guid_usuario}), e não pelo path bruto.
+
+        A latência inclui o envio de todo o corpo da resposta (inclusive das
+        respostas em streaming). Exceções não tratadas são contadas com status 500
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.latency_by_route: Dict[Tuple[str, str], Histogram] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = get_route_path(scope) if scope.get('endpoint') is not None else UNMATCHED_ROUTE
+            self.get_latency_histogram(scope['method'], route).observe(time.perf_counter() - start)
+            REQUESTS.labels(scope['method'], route, str(status_code)).inc()
+
+    def get_latency_histogram(self, method: str, route: str) -> Histogram:
+        # Evita a busca dos rótulos no histograma (com lock) a cada requisição
+        histogram = self.latency_by_route.get((method, route))
+        if histogram is None:
+            histogram = self.latency_by_route[(method, route)] = REQUEST_LATENCY.labels(method, route)
+        return histogram
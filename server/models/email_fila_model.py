@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from server.models import AuthenticatorBase
+from server.configuration import db
+
+
+class EmailFila(db.Base, AuthenticatorBase):
+
+    """
+        E-mail a ser enviado, gravado na mesma transação da requisição que o
+        originou. Os e-mails pendentes são enviados pelo EmailWorkerService,
+        fora dos processos da API
+    """
+
+    def __init__(self, **kwargs):
+        super(EmailFila, self).__init__(**kwargs)
+
+    __tablename__ = "tb_email_fila"
+    __table_args__ = (
+        Index('ix_tb_email_fila_pendente', 'id', postgresql_where=text('enviado_em IS NULL AND falhou_em IS NULL')),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    destinatarios = Column(ARRAY(String()), nullable=False)
+    assunto = Column(String(), nullable=False)
+    html = Column(Text(), nullable=False)
+    tentativas = Column(Integer(), nullable=False, default=0)
+    proxima_tentativa_em = Column(DateTime, nullable=False, default=datetime.now)
+    enviado_em = Column(DateTime)
+    # Falha definitiva: as tentativas foram esgotadas
+    falhou_em = Column(DateTime)
+    ultimo_erro = Column(String())
@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from server.models import AuthenticatorBase
+from server.configuration import db
+
+
+class EventoOutbox(db.Base, AuthenticatorBase):
+
+    """
+        Evento a ser publicado no SNS, gravado na mesma transação da alteração
+        que o originou (transactional outbox). Os eventos pendentes são
+        publicados em segundo plano pelo OutboxDispatcherService
+    """
+
+    def __init__(self, **kwargs):
+        super(EventoOutbox, self).__init__(**kwargs)
+
+    __tablename__ = "tb_evento_outbox"
+    __table_args__ = (
+        Index('ix_tb_evento_outbox_pendente', 'id', postgresql_where=text('publicado_em IS NULL AND falhou_em IS NULL')),
+        Index('ix_tb_evento_outbox_usuario_pendente', 'guid_usuario', 'id', postgresql_where=text('publicado_em IS NULL AND falhou_em IS NULL')),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    guid_usuario = Column(UUID(as_uuid=True), nullable=False)
+    topico_arn = Column(String(), nullable=False)
+    payload = Column(Text(), nullable=False)
+    tentativas = Column(Integer(), nullable=False, default=0)
+    proxima_tentativa_em = Column(DateTime, nullable=False, default=datetime.now)
+    publicado_em = Column(DateTime)
+    # Falha definitiva: as tentativas foram esgotadas
+    falhou_em = Column(DateTime)
+    ultimo_erro = Column(String())
@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, BigInteger, String, Boolean
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, String, Boolean, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from server.models import AuthenticatorBase
 from server.configuration import db
@@ -13,6 +14,9 @@ class Usuario(db.Base, AuthenticatorBase):
         super(Usuario, self).__init__(**kwargs)
 
     __tablename__ = "tb_usuario"
+    __table_args__ = (
+        Index('ix_tb_usuario_created_at_id', 'created_at', 'id'),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     guid = Column(UUID(as_uuid=True), nullable=False, unique=True, default=uuid.uuid4)
@@ -22,6 +26,9 @@ class Usuario(db.Base, AuthenticatorBase):
     email = Column(String(), unique=True, nullable=False)
     email_verificado = Column(Boolean(), default=False)
 
+    # Obrigatório: created_at faz parte da chave de paginação de GET /users
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+
     vinculos_usuario_funcao = relationship(
         "VinculoUsuarioFuncao",
         back_populates='usuario',
@@ -0,0 +1,104 @@
+from datetime import datetime
+from server.configuration.db import AsyncSession
+from server.models.email_fila_model import EmailFila
+from sqlalchemy import select, insert, update, func
+from typing import List, Optional
+from server.configuration.environment import Environment
+
+
+class EmailFilaRepository:
+
+    def __init__(self, db_session: AsyncSession, environment: Optional[Environment] = None):
+        self.db_session = db_session
+        self.environment = environment
+
+    async def insere_email(self, email_dict: dict):
+        stmt = (
+            insert(EmailFila).
+            values(**email_dict)
+        )
+        await self.db_session.execute(stmt)
+
+    async def find_emails_pendentes(self, limit: int) -> List[EmailFila]:
+        """
+            Retorna os e-mails pendentes prontos para envio, bloqueando-os até
+            o fim da transação. E-mails bloqueados por outro processo são
+            ignorados (SKIP LOCKED), assim como os e-mails com falha definitiva
+        """
+        stmt = (
+            select(EmailFila).
+            where(
+                EmailFila.enviado_em.is_(None),
+                EmailFila.falhou_em.is_(None),
+                EmailFila.proxima_tentativa_em <= datetime.now()
+            ).
+            order_by(EmailFila.id).
+            limit(limit).
+            with_for_update(skip_locked=True)
+        )
+        query = await self.db_session.execute(stmt)
+        return query.scalars().all()
+
+    async def marca_emails_enviados(self, ids: List[int]):
+        stmt = (
+            update(EmailFila).
+            where(EmailFila.id.in_(ids)).
+            values(enviado_em=datetime.now()).
+            execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
+
+    async def agenda_nova_tentativa(self, id_email: int, proxima_tentativa_em: datetime, erro: str):
+        stmt = (
+            update(EmailFila).
+            where(EmailFila.id == id_email).
+            values(
+                tentativas=EmailFila.tentativas + 1,
+                proxima_tentativa_em=proxima_tentativa_em,
+                ultimo_erro=erro
+            ).
+            execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
+
+    async def marca_falha_definitiva(self, id_email: int, erro: str):
+        """
+            Encerra as tentativas de envio do e-mail, que permanece na
+            fila apenas para consulta (falhou_em)
+        """
+        stmt = (
+            update(EmailFila).
+            where(EmailFila.id == id_email).
+            values(
+                tentativas=EmailFila.tentativas + 1,
+                falhou_em=datetime.now(),
+                ultimo_erro=erro
+            ).
+            execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
+
+    async def get_estatisticas(self) -> dict:
+        """
+            Retorna a profundidade da fila: quantidade de e-mails pendentes,
+            quantos deles já falharam ao menos uma vez, a data do mais antigo
+            e a quantidade de e-mails com falha definitiva (não enviados)
+        """
+        pendente = EmailFila.falhou_em.is_(None)
+        stmt = (
+            select(
+                func.count(EmailFila.id).filter(pendente),
+                func.count(EmailFila.id).filter(pendente, EmailFila.tentativas > 0),
+                func.min(EmailFila.created_at).filter(pendente),
+                func.count(EmailFila.id).filter(EmailFila.falhou_em.isnot(None))
+            ).
+            where(EmailFila.enviado_em.is_(None))
+        )
+        query = await self.db_session.execute(stmt)
+        pendentes, com_falha, mais_antigo, falhos = query.one()
+        return dict(
+            pending=pendentes,
+            failing=com_falha,
+            oldest_pending_at=mais_antigo,
+            failed=falhos
+        )
@@ -0,0 +1,93 @@
+from datetime import datetime
+from server.configuration.db import AsyncSession
+from server.models.evento_outbox_model import EventoOutbox
+from sqlalchemy import select, insert, update, exists, and_
+from sqlalchemy.orm import aliased
+from typing import List, Optional
+from server.configuration.environment import Environment
+
+
+class OutboxRepository:
+
+    def __init__(self, db_session: AsyncSession, environment: Optional[Environment] = None):
+        self.db_session = db_session
+        self.environment = environment
+
+    async def insere_evento(self, evento_dict: dict):
+        stmt = (
+            insert(EventoOutbox).
+            values(**evento_dict)
+        )
+        await self.db_session.execute(stmt)
+
+    async def find_eventos_pendentes(self, limit: int) -> List[EventoOutbox]:
+        """
+            Retorna os eventos pendentes prontos para publicação, bloqueando-os
+            até o fim da transação. Eventos bloqueados por outro processo são
+            ignorados (SKIP LOCKED).
+
+            Para preservar a ordem dos eventos de um mesmo usuário, apenas o evento
+            pendente mais antigo de cada usuário é retornado. Eventos com falha
+            definitiva não são retornados nem bloqueiam os eventos seguintes
+        """
+        evento_anterior = aliased(EventoOutbox)
+        stmt = (
+            select(EventoOutbox).
+            where(
+                EventoOutbox.publicado_em.is_(None),
+                EventoOutbox.falhou_em.is_(None),
+                EventoOutbox.proxima_tentativa_em <= datetime.now(),
+                ~exists().where(
+                    and_(
+                        evento_anterior.guid_usuario == EventoOutbox.guid_usuario,
+                        evento_anterior.publicado_em.is_(None),
+                        evento_anterior.falhou_em.is_(None),
+                        evento_anterior.id < EventoOutbox.id
+                    )
+                )
+            ).
+            order_by(EventoOutbox.id).
+            limit(limit).
+            with_for_update(skip_locked=True)
+        )
+        query = await self.db_session.execute(stmt)
+        return query.scalars().all()
+
+    async def marca_eventos_publicados(self, ids: List[int]):
+        stmt = (
+            update(EventoOutbox).
+            where(EventoOutbox.id.in_(ids)).
+            values(publicado_em=datetime.now()).
+            execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
+
+    async def agenda_nova_tentativa(self, id_evento: int, proxima_tentativa_em: datetime, erro: str):
+        stmt = (
+            update(EventoOutbox).
+            where(EventoOutbox.id == id_evento).
+            values(
+                tentativas=EventoOutbox.tentativas + 1,
+                proxima_tentativa_em=proxima_tentativa_em,
+                ultimo_erro=erro
+            ).
+            execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
+
+    async def marca_falha_definitiva(self, id_evento: int, erro: str):
+        """
+            Encerra as tentativas de publicação do evento, que permanece no
+            outbox apenas para consulta (falhou_em)
+        """
+        stmt = (
+            update(EventoOutbox).
+            where(EventoOutbox.id == id_evento).
+            values(
+                tentativas=EventoOutbox.tentativas + 1,
+                falhou_em=datetime.now(),
+                ultimo_erro=erro
+            ).
+            execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
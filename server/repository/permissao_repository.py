@@ -3,7 +3,7 @@ from server.models.permissao_model import Permissao
 from server.models.vinculo_permissao_funcao_model import VinculoPermissaoFuncao
 from server.models.funcao_model import Funcao
 from sqlalchemy import select
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from server.configuration.environment import Environment
 
 
@@ -30,3 +30,18 @@ class PermissaoRepository:
         )
         query = await self.db_session.execute(stmt)
         return query.scalars().all()
+
+    async def find_all_role_permissions(self) -> List[Tuple[int, str]]:
+        """
+            Retorna todos os vínculos de funções com permissões,
+            no formato (id da função, nome da permissão)
+        """
+        stmt = (
+            select(VinculoPermissaoFuncao.id_funcao, Permissao.nome).
+            join(
+                Permissao,
+                VinculoPermissaoFuncao.id_permissao == Permissao.id
+            )
+        )
+        query = await self.db_session.execute(stmt)
+        return query.all()
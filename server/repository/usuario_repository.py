@@ -1,8 +1,12 @@
 from server.configuration.db import AsyncSession
 from server.models.usuario_model import Usuario
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select, insert, literal_column
-from typing import List, Optional
+from sqlalchemy import select, insert, update, literal_column, or_, tuple_, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+from datetime import datetime
 from server.configuration.environment import Environment
 
 
@@ -22,6 +26,39 @@ class UsuarioRepository:
         row_to_dict = dict(query.fetchone())
         return Usuario(**row_to_dict)
 
+    async def insere_usuario_se_nao_existe(self, usuario_dict: dict) -> Optional[Usuario]:
+        """
+            Insere o usuário em um único comando (INSERT ... ON CONFLICT DO NOTHING RETURNING).
+            As restrições de unicidade da tabela garantem que não há duplicidade, mesmo
+            com cadastros concorrentes. Retorna None caso haja conflito
+        """
+        stmt = (
+            pg_insert(Usuario).
+            values(**usuario_dict).
+            on_conflict_do_nothing().
+            returning(literal_column('*'))
+        )
+        query = await self.db_session.execute(stmt)
+        row = query.fetchone()
+        return Usuario(**dict(row)) if row else None
+
+    async def find_conflitos_usuario(self, username: str, email: str) -> List:
+        """
+            Retorna o username e o e-mail dos usuários que conflitam
+            com o username ou com o e-mail informados
+        """
+        stmt = (
+            select(Usuario.username, Usuario.email).
+            where(
+                or_(
+                    Usuario.username == username,
+                    Usuario.email == email
+                )
+            )
+        )
+        query = await self.db_session.execute(stmt)
+        return query.all()
+
     async def insere_usuario_2(self, usuario_dict: dict) -> Usuario:
         new_user_entity = Usuario(**usuario_dict)
         self.db_session.add(new_user_entity)
@@ -39,6 +76,53 @@ class UsuarioRepository:
         query = await self.db_session.execute(stmt)
         return query.scalars().all()
 
+    @staticmethod
+    def select_usuario_output():
+        """
+            Seleciona apenas as colunas expostas pelo UsuarioOutput (e o id, utilizado
+            na paginação), sem carregar a senha ou os vínculos do usuário
+        """
+        return select(
+            Usuario.id,
+            Usuario.guid,
+            Usuario.nome,
+            Usuario.username,
+            Usuario.email,
+            Usuario.email_verificado,
+            Usuario.created_at,
+            Usuario.updated_at
+        )
+
+    async def find_usuarios_page(self, limit: int,
+                                 after: Optional[Tuple[datetime, int]] = None) -> List:
+        """
+            Retorna uma página de usuários ordenada por (created_at, id), paginada
+            por keyset: a página começa após a chave 'after' (exclusiva)
+        """
+        stmt = (
+            UsuarioRepository.select_usuario_output().
+            order_by(Usuario.created_at, Usuario.id).
+            limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Usuario.created_at, Usuario.id) > tuple_(*after))
+        query = await self.db_session.execute(stmt)
+        return query.all()
+
+    async def stream_usuarios(self, batch_size: int) -> AsyncIterator[List]:
+        """
+            Percorre todos os usuários por um cursor do lado do servidor,
+            retornando lotes de no máximo batch_size usuários. Apenas um lote
+            é mantido em memória por vez
+        """
+        stmt = (
+            UsuarioRepository.select_usuario_output().
+            order_by(Usuario.created_at, Usuario.id)
+        )
+        result = await self.db_session.stream(stmt)
+        async for partition in result.partitions(batch_size):
+            yield partition
+
     async def find_usuario_by_guid(self, guid_usuario: str) -> List[Usuario]:
         stmt = (
             select(Usuario).
@@ -47,7 +131,36 @@ class UsuarioRepository:
         query = await self.db_session.execute(stmt)
         return query.scalars().first()
 
+    async def find_usuarios_by_guids(self, guids: List[UUID]) -> List:
+        """
+            Busca os usuários em um único comando (guid = ANY(:guids)), utilizando o
+            índice único da coluna guid. Os GUIDs são enviados como um único parâmetro
+            do tipo array, de modo que o comando é o mesmo para qualquer quantidade de GUIDs
+        """
+        stmt = (
+            UsuarioRepository.select_usuario_output().
+            where(Usuario.guid == any_(bindparam('guids', guids, type_=ARRAY(Usuario.guid.type))))
+        )
+        query = await self.db_session.execute(stmt)
+        return query.all()
+
     async def verify_email(self, user: Usuario) -> Usuario:
         user.email_verificado = True
         await self.db_session.flush()
         return user
+
+    async def atualiza_hashed_password(self, id_usuario: int, hashed_password: str, new_hashed_password: str):
+        """
+            Atualiza o hash apenas se a senha não foi alterada desde a leitura do usuário.
+            O novo hash não altera o usuário: updated_at é mantido
+        """
+        stmt = (
+            update(Usuario).
+            where(
+                Usuario.id == id_usuario,
+                Usuario.hashed_password == hashed_password
+            ).
+            values(hashed_password=new_hashed_password, updated_at=Usuario.updated_at).
+            execution_options(synchronize_session=False)
+        )
+        await self.db_session.execute(stmt)
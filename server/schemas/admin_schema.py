@@ -0,0 +1,39 @@
+from server.schemas import AuthenticatorModelOutput
+from pydantic import Field
+from typing import Optional
+from datetime import datetime
+
+
+class PermissionSnapshotOutput(AuthenticatorModelOutput):
+
+    version: int = Field(example=1)
+    loaded_at: datetime = Field(None)
+    roles: int = Field(example=3)
+    hits: int = Field(example=1500)
+    misses: int = Field(example=2)
+
+
+class TokenCacheOutput(AuthenticatorModelOutput):
+
+    size: int = Field(example=120)
+    max_size: int = Field(example=10000)
+    hits: int = Field(example=1500)
+    misses: int = Field(example=120)
+
+
+class UserCacheOutput(AuthenticatorModelOutput):
+
+    enabled: bool = Field(example=True)
+    l1_size: int = Field(0, example=120)
+    l1_hits: int = Field(0, example=1500)
+    l2_hits: int = Field(0, example=300)
+    misses: int = Field(0, example=40)
+    errors: int = Field(0, example=0)
+
+
+class EmailQueueOutput(AuthenticatorModelOutput):
+
+    pending: int = Field(example=12)
+    failing: int = Field(example=1)
+    oldest_pending_at: Optional[datetime] = Field(None)
+    failed: int = Field(0, example=0)
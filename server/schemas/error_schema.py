@@ -60,6 +60,18 @@ class ErrorOutput422(AuthenticatorModelOutput):
         arbitrary_types_allowed = True
 
 
+class ErrorOutput429(AuthenticatorModelOutput):
+
+    status_code: int = Field(example=429)
+    error_id: str = Field(example='ID único do tipo do erro no serviço')
+    message: str = Field(example='Mensagem do erro')
+    detail: str = Field(None, example='Detalhamento do erro')
+
+    class Config:
+        orm_mode = True
+        arbitrary_types_allowed = True
+
+
 class ErrorOutput500(AuthenticatorModelOutput):
 
     status_code: int = Field(example=500)
@@ -71,3 +83,14 @@ class ErrorOutput500(AuthenticatorModelOutput):
         orm_mode = True
         arbitrary_types_allowed = True
 
+
+class ErrorOutput503(AuthenticatorModelOutput):
+
+    status_code: int = Field(example=503)
+    error_id: str = Field(example='ID único do tipo do erro no serviço')
+    message: str = Field(example='Mensagem do erro')
+    detail: str = Field(None, example='Detalhamento do erro')
+
+    class Config:
+        orm_mode = True
+        arbitrary_types_allowed = True
@@ -3,7 +3,7 @@ from uuid import UUID as GUID
 from pydantic import Field
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
-from typing import List
+from typing import List, Optional
 
 
 class AccessTokenOutput(AuthenticatorModelOutput):
@@ -31,6 +31,7 @@ class DecodedAccessToken(BaseModel):
     email: EmailStr
     username: str
     roles: List[str]
+    perms: Optional[List[str]] = None
 
 
 class DecodedMailToken(BaseModel):
@@ -1,7 +1,7 @@
 from server.schemas import AuthenticatorModelInput, AuthenticatorModelOutput
 from pydantic import Field, BaseModel, EmailStr
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID as GUID
 
 
@@ -35,6 +35,28 @@ class UsuarioOutput(AuthenticatorModelOutput):
         arbitrary_types_allowed = True
 
 
+class UsuarioPageOutput(AuthenticatorModelOutput):
+
+    items: List[UsuarioOutput]
+    next_cursor: Optional[str] = Field(None, example='WyIyMDIxLTA5LTI1VDE0OjQ4OjA5IiwgMTBd')
+
+
+class UsuarioBatchInput(AuthenticatorModelInput):
+
+    guids: List[GUID] = Field(min_items=1, max_items=500, example=['78628c23-aae3-4d58-84a9-0c8d7ea63672'])
+
+    def convert_to_dict(self):
+        return self.dict()
+
+
+class UsuarioBatchOutput(AuthenticatorModelOutput):
+
+    users: Dict[str, UsuarioOutput] = Field(
+        example={'78628c23-aae3-4d58-84a9-0c8d7ea63672': {'guid': '78628c23-aae3-4d58-84a9-0c8d7ea63672'}}
+    )
+    not_found: List[GUID] = Field(example=[])
+
+
 class UsuarioPublishInput(BaseModel):
 
     guid: GUID
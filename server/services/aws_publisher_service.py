@@ -1,19 +1,44 @@
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Tuple
+
+
 class AWSPublisherService:
 
-    def __init__(self, boto3_client):
+    def __init__(self, boto3_client, executor: Optional[Executor] = None):
+        """
+            O client boto3 e o executor são compartilhados pelo processo. As chamadas
+            bloqueantes do boto3 (publish_batch) são executadas no executor, fora do
+            event loop. Quando o executor não é definido, é utilizado o executor
+            padrão do event loop
+        """
         self.boto3_client = boto3_client
+        self.executor = executor
 
-    def publish(self, msg: str, target_arn: str) -> dict:
+    def publish_batch(self, messages: List[Tuple[str, str, str]], target_arn: str) -> Tuple[List[str], Dict[str, str]]:
         """
-        Função responsável por publicar uma mensagem para a AWS
-        utilizando o client definido no objeto de classe.
+        Publica até 10 mensagens em uma única chamada (PublishBatch).
+        Em tópicos FIFO, o grupo da mensagem garante a ordem entre as
+        mensagens de um mesmo grupo.
 
-        :param msg: Mensagem enviada para o SNS ou SQS
-        :param target_arn: ARN do SQS ou SNS
-        :return: response
+        :param messages: Lista de (id, mensagem, grupo) das mensagens
+        :param target_arn: ARN do tópico SNS
+        :return: Ids das mensagens publicadas e erros das mensagens não publicadas, por id
         """
-        response = self.boto3_client.publish(
-            TargetArn=target_arn,
-            Message=msg
+        fifo = target_arn.endswith('.fifo')
+        entries = []
+        for message_id, msg, group_id in messages:
+            entry = dict(Id=message_id, Message=msg)
+            if fifo:
+                entry.update(MessageGroupId=group_id, MessageDeduplicationId=message_id)
+            entries.append(entry)
+
+        response = self.boto3_client.publish_batch(
+            TopicArn=target_arn,
+            PublishBatchRequestEntries=entries
         )
-        return response
+        successful = [entry['Id'] for entry in response.get('Successful', [])]
+        failed = {
+            entry['Id']: entry.get('Message') or entry.get('Code', '')
+            for entry in response.get('Failed', [])
+        }
+        return successful, failed
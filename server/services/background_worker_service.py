@@ -0,0 +1,75 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Optional
+from server.configuration.custom_logging import get_main_logger
+
+
+MAIN_LOGGER = get_main_logger()
+
+
+class BackgroundWorkerService(ABC):
+
+    """
+        Tarefa em segundo plano que processa lotes periodicamente.
+
+        A cada ciclo é chamado process_batch, que retorna a quantidade de itens
+        processados. Com o lote completo (batch_size itens) o próximo ciclo é
+        iniciado imediatamente; caso contrário, aguarda poll_interval segundos.
+        Itens com falha devem ser reagendados com get_backoff, até max_attempts
+        tentativas: a partir daí a falha é definitiva (esgotou_tentativas) e o
+        item não é mais reprocessado
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float, max_backoff: float = 300,
+                 max_attempts: int = 20):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.task: Optional[asyncio.Task] = None
+        self._stop: Optional[asyncio.Event] = None
+
+    def get_backoff(self, tentativas: int) -> timedelta:
+        """
+            Backoff exponencial (1s, 2s, 4s...) limitado por max_backoff
+        """
+        return timedelta(seconds=min(2 ** tentativas, self.max_backoff))
+
+    def esgotou_tentativas(self, tentativas: int) -> bool:
+        """
+            Indica se a falha da tentativa atual, após tentativas falhas
+            anteriores, esgota o limite de max_attempts tentativas
+        """
+        return tentativas + 1 >= self.max_attempts
+
+    @abstractmethod
+    async def process_batch(self) -> int:
+        """
+            Processa um lote, retornando a quantidade de itens processados
+        """
+
+    async def run(self):
+        while not self._stop.is_set():
+            processados = 0
+            try:
+                processados = await self.process_batch()
+            except Exception:
+                MAIN_LOGGER.error(f"Erro ao processar o lote de {type(self).__name__}", exc_info=True)
+
+            if processados < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        if self.task is None:
+            self._stop = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self._stop.set()
+            await self.task
+            self.task = None
@@ -1,25 +1,21 @@
-from fastapi import BackgroundTasks
-from fastapi_mail import MessageSchema, FastMail
 from pydantic import EmailStr
 from typing import List
+from server.repository.email_fila_repository import EmailFilaRepository
 
 
 class EmailService:
 
-    def __init__(self, email_api: FastMail, background_tasks: BackgroundTasks):
-        self.email_api = email_api  # FastMail
-        self.background_tasks = background_tasks
-
-    def send_email_background(self, recipient_email_list: List[EmailStr], subject: str,
-                              rendered_html: str):
-        message = MessageSchema(
-            subject=subject,
-            recipients=recipient_email_list,
-            html=rendered_html,
-            subtype="html"
-        )
-        self.background_tasks.add_task(
-            self.email_api.send_message,
-            message
-        )
+    def __init__(self, email_fila_repo: EmailFilaRepository):
+        self.email_fila_repo = email_fila_repo
 
+    async def send_email_background(self, recipient_email_list: List[EmailStr], subject: str,
+                                    rendered_html: str):
+        """
+            Grava o e-mail na fila, na transação da requisição atual.
+            O envio é feito pelo EmailWorkerService, fora dos processos da API
+        """
+        await self.email_fila_repo.insere_email(dict(
+            destinatarios=[str(email) for email in recipient_email_list],
+            assunto=subject,
+            html=rendered_html
+        ))
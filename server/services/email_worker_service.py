@@ -0,0 +1,93 @@
+import asyncio
+import aiosmtplib
+from datetime import datetime
+from fastapi_mail import MessageSchema
+from typing import Callable
+from sqlalchemy.orm import sessionmaker
+from server.configuration.custom_logging import get_main_logger
+from server.repository.email_fila_repository import EmailFilaRepository
+from server.services.background_worker_service import BackgroundWorkerService
+
+
+MAIN_LOGGER = get_main_logger()
+
+
+class EmailWorkerService(BackgroundWorkerService):
+
+    """
+        Envia os e-mails pendentes da fila.
+
+        A cada ciclo, até batch_size e-mails pendentes são bloqueados (FOR UPDATE
+        SKIP LOCKED, permitindo vários consumidores) e enviados com no máximo
+        concurrency envios simultâneos, sobre as conexões compartilhadas do
+        email_api (ex.: SMTPConnectionPool). E-mails não enviados são reagendados
+        com backoff exponencial, até max_attempts tentativas. Erros permanentes
+        do servidor SMTP (respostas 5xx) encerram as tentativas imediatamente
+    """
+
+    def __init__(self, build_session_maker: Callable[[], sessionmaker], email_api,
+                 batch_size: int = 50, poll_interval: float = 1.0, max_backoff: float = 300,
+                 concurrency: int = 4, max_attempts: int = 20):
+        super().__init__(batch_size, poll_interval, max_backoff, max_attempts)
+        self.build_session_maker = build_session_maker
+        self.email_api = email_api
+        self.concurrency = concurrency
+        self.sent = 0
+        self.failed = 0
+
+    async def send(self, email, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            await self.email_api.send_message(MessageSchema(
+                subject=email.assunto,
+                recipients=email.destinatarios,
+                html=email.html,
+                subtype="html"
+            ))
+
+    @staticmethod
+    def is_erro_permanente(erro: Exception) -> bool:
+        return isinstance(erro, aiosmtplib.SMTPResponseException) and 500 <= erro.code < 600
+
+    async def dispatch(self, email_fila_repo: EmailFilaRepository) -> int:
+        """
+            Envia um lote de e-mails pendentes, retornando a quantidade de
+            e-mails processados. A transação da sessão do repositório deve ser
+            confirmada pelo chamador
+        """
+        emails = await email_fila_repo.find_emails_pendentes(self.batch_size)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self.send(email, semaphore) for email in emails),
+            return_exceptions=True
+        )
+
+        enviados = []
+        for email, result in zip(emails, results):
+            if isinstance(result, Exception):
+                self.failed += 1
+                if self.is_erro_permanente(result) or self.esgotou_tentativas(email.tentativas):
+                    MAIN_LOGGER.error(f"Falha definitiva ao enviar o e-mail {email.id}", exc_info=result)
+                    await email_fila_repo.marca_falha_definitiva(email.id, repr(result))
+                else:
+                    MAIN_LOGGER.warning(f"Erro ao enviar o e-mail {email.id}", exc_info=result)
+                    await email_fila_repo.agenda_nova_tentativa(
+                        email.id,
+                        datetime.now() + self.get_backoff(email.tentativas),
+                        repr(result)
+                    )
+            else:
+                enviados.append(email.id)
+
+        if enviados:
+            self.sent += len(enviados)
+            await email_fila_repo.marca_emails_enviados(enviados)
+
+        return len(emails)
+
+    async def process_batch(self) -> int:
+        session_maker = self.build_session_maker()
+        async with session_maker() as session:
+            processados = await self.dispatch(EmailFilaRepository(session))
+            await session.commit()
+            return processados
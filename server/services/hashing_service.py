@@ -0,0 +1,89 @@
+"""
+    Hashing de senhas com bcrypt fora do event loop
+
+    As funções de módulo são executadas nos workers do executor
+    (processos ou threads). Por isso esse módulo deve permanecer leve,
+    sem depender do restante da aplicação
+"""
+
+import asyncio
+from concurrent.futures import BrokenExecutor, Executor
+from functools import lru_cache
+from passlib.context import CryptContext
+from typing import Any, Callable, Optional, Tuple
+
+
+# Custo padrão do bcrypt (2^12 iterações), o mesmo padrão do passlib
+
+DEFAULT_BCRYPT_ROUNDS = 12
+
+
+@lru_cache
+def get_crypt_context(rounds: int = DEFAULT_BCRYPT_ROUNDS) -> CryptContext:
+    """
+        Os hashes com um custo diferente de rounds (maior ou menor)
+        são marcados para atualização (needs_update)
+    """
+    return CryptContext(
+        schemes=['bcrypt'],
+        deprecated='auto',
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds
+    )
+
+
+CRYPT_CONTEXT = get_crypt_context()
+
+
+def verifica_senha(password: str, hashed_password: str, rounds: int = DEFAULT_BCRYPT_ROUNDS) -> bool:
+    return get_crypt_context(rounds).verify(password, hashed_password)
+
+
+def verifica_e_atualiza_senha(password: str, hashed_password: str,
+                              rounds: int = DEFAULT_BCRYPT_ROUNDS) -> Tuple[bool, Optional[str]]:
+    """
+        Retorna se a senha é válida e, caso seja válida e o hash tenha sido gerado
+        com outro custo, o novo hash da senha com o custo atual
+    """
+    return get_crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+def criptografa_senha(password: str, rounds: int = DEFAULT_BCRYPT_ROUNDS) -> str:
+    return get_crypt_context(rounds).hash(password)
+
+
+class HashingService:
+
+    def __init__(self, executor: Optional[Executor] = None, rounds: int = DEFAULT_BCRYPT_ROUNDS,
+                 recria_executor: Optional[Callable[[Executor], Executor]] = None):
+        """
+            Quando o executor não é definido, é utilizado o executor
+            padrão do event loop (pool de threads).
+
+            Caso um worker do pool de processos morra (ex.: OOM), o pool fica
+            quebrado e recusa todas as tarefas seguintes. Nesse caso, recria_executor
+            recebe o executor quebrado e retorna o executor que o substitui
+        """
+        self.executor = executor
+        self.rounds = rounds
+        self.recria_executor = recria_executor
+
+    async def executa(self, func: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, func, *args)
+        except BrokenExecutor:
+            if self.recria_executor is None:
+                raise
+            self.executor = self.recria_executor(self.executor)
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def verifica_senha(self, password: str, hashed_password: str) -> bool:
+        return await self.executa(verifica_senha, password, hashed_password, self.rounds)
+
+    async def verifica_e_atualiza_senha(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self.executa(verifica_e_atualiza_senha, password, hashed_password, self.rounds)
+
+    async def criptografa_senha(self, password: str) -> str:
+        return await self.executa(criptografa_senha, password, self.rounds)
@@ -0,0 +1,86 @@
+import hashlib
+import json
+from jose import jwk, jwt
+from jose.constants import ALGORITHMS
+from typing import Dict, Optional, Tuple
+
+
+class KeyRingService:
+
+    """
+        Chaveiro dos tokens de acesso.
+
+        Com algoritmos HMAC (HS256, HS512...), os tokens são assinados e verificados
+        com o segredo compartilhado ACCESS_TOKEN_SECRET_KEY.
+
+        Com algoritmos assimétricos (RS256, ES256...), os tokens são assinados com a
+        chave privada ativa e carregam o seu identificador no header 'kid'. As chaves
+        públicas de todas as chaves do chaveiro são publicadas no JWKS, permitindo que
+        outros microsserviços verifiquem os tokens localmente. Chaves antigas devem ser
+        mantidas no chaveiro até que os tokens assinados por elas expirem
+    """
+
+    def __init__(self, algorithm: str, secret_key: Optional[str] = None,
+                 private_keys: Optional[Dict[str, str]] = None, active_kid: Optional[str] = None):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.private_keys = private_keys or {}
+        self.active_kid = active_kid
+        self.public_keys = {}
+
+        if self.is_asymmetric:
+            if not self.private_keys:
+                raise ValueError(f"Nenhuma chave privada configurada para o algoritmo {algorithm}")
+            if self.active_kid not in self.private_keys:
+                raise ValueError(f"A chave ativa ({active_kid}) não pertence ao chaveiro")
+            self.public_keys = {
+                kid: jwk.construct(private_key, algorithm).public_key()
+                for kid, private_key in self.private_keys.items()
+            }
+
+        self._jwks_body: Optional[bytes] = None
+        self._jwks_etag: Optional[str] = None
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.algorithm not in ALGORITHMS.HMAC
+
+    def get_signing_key(self) -> Tuple[str, dict]:
+        """
+            Retorna a chave de assinatura e os headers adicionais do token
+        """
+        if not self.is_asymmetric:
+            return self.secret_key, {}
+        return self.private_keys[self.active_kid], {'kid': self.active_kid}
+
+    def decode(self, token: str) -> dict:
+        """
+            Verifica a assinatura e a expiração do token, retornando suas claims.
+            Lança JWTError caso o token seja inválido
+        """
+        if not self.is_asymmetric:
+            key = self.secret_key
+        else:
+            kid = jwt.get_unverified_header(token).get('kid') or self.active_kid
+            key = self.public_keys.get(kid)
+            if key is None:
+                raise jwt.JWTError(f"Chave desconhecida ({kid})")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def get_jwks(self) -> dict:
+        keys = []
+        for kid, public_key in self.public_keys.items():
+            jwk_dict = public_key.to_dict()
+            jwk_dict.update({'kid': kid, 'use': 'sig', 'alg': self.algorithm})
+            keys.append(jwk_dict)
+        return {'keys': keys}
+
+    def get_jwks_response_content(self) -> Tuple[bytes, str]:
+        """
+            Retorna o JWKS serializado e seu ETag. Ambos são calculados uma
+            única vez, já que o chaveiro não muda durante a vida do processo
+        """
+        if self._jwks_body is None:
+            self._jwks_body = json.dumps(self.get_jwks(), sort_keys=True, separators=(',', ':')).encode('utf-8')
+            self._jwks_etag = f'"{hashlib.sha256(self._jwks_body).hexdigest()}"'
+        return self._jwks_body, self._jwks_etag
@@ -0,0 +1,101 @@
+import math
+import time
+import aioredis
+from prometheus_client import Counter
+from typing import List, Optional, Tuple, Union
+from server.configuration import exceptions
+from server.configuration.custom_logging import get_main_logger
+from server.utils.rate_limiter import InMemoryRateLimiter, RedisRateLimiter
+
+
+MAIN_LOGGER = get_main_logger()
+REDIS_ERRORS = (aioredis.RedisError, OSError)
+
+LOGIN_THROTTLED = Counter(
+    'authenticator_login_throttled',
+    'Tentativas de login rejeitadas pelo limite de tentativas'
+)
+
+
+class LoginThrottleService:
+
+    """
+        Limita as tentativas de login por username e por IP do cliente, antes
+        de qualquer consulta ao banco de dados ou verificação de senha (bcrypt).
+
+        No IP, todas as tentativas são contadas, inclusive as rejeitadas: enquanto
+        as tentativas continuarem, o IP continua bloqueado. No username, apenas as
+        falhas de autenticação são contadas, para que tentativas de terceiros
+        rejeitadas pelo limite não mantenham a conta do usuário bloqueada.
+
+        Para que tentativas simultâneas não ultrapassem o limite do username, cada
+        tentativa é reservada no username (incrementando o contador) antes da
+        verificação da senha. A reserva é desfeita (estorna) caso a tentativa seja
+        rejeitada pelo limite ou não resulte em uma falha de autenticação.
+
+        Falhas do Redis não bloqueiam o login: a tentativa é permitida
+    """
+
+    def __init__(self, limiter: Union[InMemoryRateLimiter, RedisRateLimiter],
+                 max_attempts_per_username: int, max_attempts_per_ip: int):
+        self.limiter = limiter
+        self.max_attempts_per_username = max_attempts_per_username
+        self.max_attempts_per_ip = max_attempts_per_ip
+        self.rejected = 0
+        self.errors = 0
+
+    def get_username_keys(self, username: str) -> List[Tuple[str, int]]:
+        if self.max_attempts_per_username > 0:
+            return [(f"username:{username.lower()}", self.max_attempts_per_username)]
+        return []
+
+    def get_ip_keys(self, client_ip: Optional[str]) -> List[Tuple[str, int]]:
+        if self.max_attempts_per_ip > 0 and client_ip:
+            return [(f"ip:{client_ip}", self.max_attempts_per_ip)]
+        return []
+
+    async def verifica(self, username: str, client_ip: Optional[str]) -> Optional[float]:
+        """
+            Registra a tentativa no IP e a reserva no username.
+            Retorna o instante da reserva, a ser informado em estorna, ou None caso
+            nenhuma tentativa tenha sido reservada no username
+        """
+        ip_keys = self.get_ip_keys(client_ip)
+        username_keys = self.get_username_keys(username)
+        reserva = None
+
+        try:
+            wait = await self.limiter.registra(ip_keys) if ip_keys else 0.0
+            if username_keys and wait <= 0:
+                reserva = time.time()
+                wait = await self.limiter.registra(username_keys, reserva)
+        except REDIS_ERRORS:
+            self.errors += 1
+            MAIN_LOGGER.warning("Falha no limite de tentativas de login no Redis", exc_info=True)
+            return None
+
+        if wait > 0:
+            self.rejected += 1
+            LOGIN_THROTTLED.inc()
+            await self.estorna(username, reserva)
+            raise exceptions.TooManyLoginAttemptsException(retry_after=max(1, math.ceil(wait)))
+        return reserva
+
+    async def estorna(self, username: str, reserva: Optional[float]):
+        """
+            Desfaz a tentativa reservada no username por verifica
+        """
+        if reserva is None:
+            return
+
+        try:
+            await self.limiter.estorna(self.get_username_keys(username), reserva)
+        except REDIS_ERRORS:
+            self.errors += 1
+            MAIN_LOGGER.warning("Falha no estorno da tentativa de login no Redis", exc_info=True)
+
+    def get_stats(self) -> dict:
+        return {
+            'rejected': self.rejected,
+            'errors': self.errors
+        }
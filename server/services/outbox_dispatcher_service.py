@@ -0,0 +1,94 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable
+from sqlalchemy.orm import sessionmaker
+from server.configuration.custom_logging import get_main_logger
+from server.repository.outbox_repository import OutboxRepository
+from server.services.aws_publisher_service import AWSPublisherService
+from server.services.background_worker_service import BackgroundWorkerService
+
+
+MAIN_LOGGER = get_main_logger()
+
+# Quantidade máxima de mensagens por chamada do PublishBatch do SNS
+
+PUBLISH_BATCH_MAX_SIZE = 10
+
+
+class OutboxDispatcherService(BackgroundWorkerService):
+
+    """
+        Publica em segundo plano os eventos pendentes do outbox.
+
+        A cada ciclo, até batch_size eventos pendentes são bloqueados (FOR UPDATE
+        SKIP LOCKED, permitindo vários processos), agrupados por tópico e publicados
+        em chamadas PublishBatch de até 10 mensagens. Eventos não publicados são
+        reagendados com backoff exponencial, limitado por max_backoff. Após
+        max_attempts tentativas a falha é definitiva, liberando a publicação dos
+        eventos seguintes do mesmo usuário
+    """
+
+    def __init__(self, build_session_maker: Callable[[], sessionmaker], publisher_service: AWSPublisherService,
+                 batch_size: int = 100, poll_interval: float = 1.0, max_backoff: float = 300,
+                 max_attempts: int = 20):
+        super().__init__(batch_size, poll_interval, max_backoff, max_attempts)
+        self.build_session_maker = build_session_maker
+        self.publisher_service = publisher_service
+
+    async def dispatch(self, outbox_repo: OutboxRepository) -> int:
+        """
+            Publica um lote de eventos pendentes, retornando a quantidade de
+            eventos processados. A transação da sessão do repositório deve ser
+            confirmada pelo chamador
+        """
+        eventos = await outbox_repo.find_eventos_pendentes(self.batch_size)
+
+        eventos_por_topico = defaultdict(list)
+        for evento in eventos:
+            eventos_por_topico[evento.topico_arn].append(evento)
+
+        loop = asyncio.get_running_loop()
+        publicados = []
+        for topico_arn, eventos_topico in eventos_por_topico.items():
+            for i in range(0, len(eventos_topico), PUBLISH_BATCH_MAX_SIZE):
+                lote = eventos_topico[i:i + PUBLISH_BATCH_MAX_SIZE]
+                messages = [(str(evento.id), evento.payload, str(evento.guid_usuario)) for evento in lote]
+                try:
+                    successful, failed = await loop.run_in_executor(
+                        self.publisher_service.executor,
+                        self.publisher_service.publish_batch,
+                        messages,
+                        topico_arn
+                    )
+                except Exception as ex:
+                    MAIN_LOGGER.warning(f"Erro ao publicar lote de eventos no tópico {topico_arn}", exc_info=True)
+                    successful, failed = [], {message[0]: repr(ex) for message in messages}
+
+                publicados.extend(int(message_id) for message_id in successful)
+                for evento in lote:
+                    if str(evento.id) not in failed:
+                        continue
+                    if self.esgotou_tentativas(evento.tentativas):
+                        MAIN_LOGGER.error(
+                            f"Falha definitiva ao publicar o evento {evento.id}: {failed[str(evento.id)]}"
+                        )
+                        await outbox_repo.marca_falha_definitiva(evento.id, failed[str(evento.id)])
+                    else:
+                        await outbox_repo.agenda_nova_tentativa(
+                            evento.id,
+                            datetime.now() + self.get_backoff(evento.tentativas),
+                            failed[str(evento.id)]
+                        )
+
+        if publicados:
+            await outbox_repo.marca_eventos_publicados(publicados)
+
+        return len(eventos)
+
+    async def process_batch(self) -> int:
+        session_maker = self.build_session_maker()
+        async with session_maker() as session:
+            processados = await self.dispatch(OutboxRepository(session))
+            await session.commit()
+            return processados
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+from server.repository.permissao_repository import PermissaoRepository
+from server.configuration.custom_logging import get_main_logger
+
+
+MAIN_LOGGER = get_main_logger()
+
+
+class PermissionSnapshotService:
+
+    """
+        Snapshot em memória do mapa completo de funções -> permissões.
+
+        Os vínculos de permissões com funções quase nunca mudam. Por isso,
+        o mapa é carregado de uma só vez e a autorização dos endpoints
+        passa a ser uma consulta em dicionário. O snapshot é recarregado
+        quando expira (TTL) ou quando é invalidado explicitamente
+    """
+
+    def __init__(self):
+        self.role_permissions: Dict[int, FrozenSet[str]] = {}
+        self.version = 0
+        self.loaded_at: Optional[datetime] = None
+        self.hits = 0
+        self.misses = 0
+        self._loaded_at_monotonic: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def is_stale(self, ttl_in_seconds: int) -> bool:
+        return (
+            self._loaded_at_monotonic is None or
+            time.monotonic() - self._loaded_at_monotonic > ttl_in_seconds
+        )
+
+    def invalidate(self):
+        self._loaded_at_monotonic = None
+
+    async def load(self, permission_repo: PermissaoRepository):
+        role_permissions: Dict[int, Set[str]] = {}
+        for id_funcao, nome_permissao in await permission_repo.find_all_role_permissions():
+            role_permissions.setdefault(id_funcao, set()).add(nome_permissao)
+
+        self.role_permissions = {
+            id_funcao: frozenset(permissions)
+            for id_funcao, permissions in role_permissions.items()
+        }
+        self.version += 1
+        self.loaded_at = datetime.utcnow()
+        self._loaded_at_monotonic = time.monotonic()
+
+        MAIN_LOGGER.info(f"Snapshot de permissões carregado (versão {self.version})")
+
+    async def get_permissions(self, roles: Iterable[int], permission_repo: PermissaoRepository,
+                              ttl_in_seconds: int) -> Set[str]:
+        """
+            Retorna o conjunto de permissões das funções informadas.
+            O repositório só é acessado se o snapshot estiver expirado
+        """
+
+        if self.is_stale(ttl_in_seconds):
+            self.misses += 1
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # Outra requisição pode ter recarregado o snapshot enquanto aguardava
+                if self.is_stale(ttl_in_seconds):
+                    await self.load(permission_repo)
+        else:
+            self.hits += 1
+
+        permissions = set()
+        for role in roles:
+            permissions.update(self.role_permissions.get(role, ()))
+        return permissions
+
+    def get_stats(self) -> dict:
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'roles': len(self.role_permissions),
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,64 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from server.schemas.usuario_schema import CurrentUserToken
+
+
+class TokenCacheService:
+
+    """
+        Cache LRU limitado dos tokens de acesso já verificados.
+
+        A chave é o digest SHA-256 do token e o valor é o CurrentUserToken já
+        construído, junto com o timestamp de expiração do token. Requisições
+        repetidas com o mesmo token evitam a verificação da assinatura e a
+        validação dos modelos. As entradas são descartadas na expiração do token
+        e a quantidade de entradas é limitada por max_size (0 desabilita o cache)
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: 'OrderedDict[bytes, Tuple[CurrentUserToken, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_token_digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str) -> Optional[CurrentUserToken]:
+        if self.max_size <= 0:
+            return None
+
+        digest = TokenCacheService.get_token_digest(token)
+        entry = self.entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        current_user, exp = entry
+        if time.time() >= exp:
+            del self.entries[digest]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(digest)
+        self.hits += 1
+        return current_user
+
+    def put(self, token: str, current_user: CurrentUserToken, exp: Optional[float]):
+        if self.max_size <= 0 or exp is None:
+            return
+
+        self.entries[TokenCacheService.get_token_digest(token)] = (current_user, exp)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,270 @@
+import asyncio
+import random
+import secrets
+import time
+import aioredis
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from server.configuration.custom_logging import get_main_logger
+from server.schemas.usuario_schema import UsuarioOutput
+
+
+MAIN_LOGGER = get_main_logger()
+REDIS_ERRORS = (aioredis.RedisError, OSError)
+
+# Remove o lock apenas se ele ainda pertencer a quem o obteve: um lock expirado
+# pode ter sido obtido por outro processo, que não deve perdê-lo
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class UserCacheService:
+
+    """
+        Cache read-through dos usuários buscados pelo GUID, em dois níveis:
+            - L1: LRU em memória do processo, com TTL curto (l1_ttl), que limita
+              o tempo em que uma alteração feita por outro processo não é vista
+            - L2: Redis compartilhado pelos processos (opcional), com TTL ttl
+
+        Os usuários são armazenados como o JSON compacto do UsuarioOutput.
+
+        Para evitar o efeito manada em chaves muito acessadas, buscas simultâneas
+        da mesma chave no processo aguardam uma única carga do banco de dados. Entre
+        processos, apenas quem obtém o lock da chave no Redis carrega o usuário; os
+        demais aguardam por até lock_wait segundos o valor ser gravado no Redis.
+
+        Uma carga iniciada antes de uma invalidação (ou lida de uma réplica ainda
+        desatualizada) não deve voltar a ser gravada: a invalidação grava no Redis
+        uma marca que expira em invalidation_ttl segundos. Enquanto a marca existe,
+        o usuário carregado não é gravado, e a gravação concorrente à invalidação é
+        desfeita. No processo, a gravação no L1 é descartada caso alguma invalidação
+        ocorra durante a carga.
+
+        Falhas do Redis não interrompem a requisição: o usuário é buscado no banco
+    """
+
+    def __init__(self, redis: Optional[aioredis.Redis], ttl: int = 300, l1_max_size: int = 10000,
+                 l1_ttl: float = 5, key_prefix: str = 'authenticator:user:', lock_wait: float = 0.2,
+                 invalidation_ttl: float = 10):
+        self.redis = redis
+        self.ttl = ttl
+        self.l1_max_size = l1_max_size
+        self.l1_ttl = l1_ttl
+        self.key_prefix = key_prefix
+        self.lock_wait = lock_wait
+        self.invalidation_ttl = invalidation_ttl
+        self.release_lock_script = redis.register_script(RELEASE_LOCK_SCRIPT) if redis is not None else None
+        self.l1: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+        self.loading: Dict[str, asyncio.Future] = {}
+        # Incrementada a cada invalidação no processo
+        self.geracao = 0
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def serializa(user: UsuarioOutput) -> bytes:
+        return user.json(separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def desserializa(data: bytes) -> UsuarioOutput:
+        return UsuarioOutput.parse_raw(data)
+
+    def get_key(self, guid: str) -> str:
+        return f"{self.key_prefix}{guid}"
+
+    def get_invalidation_key(self, guid: str) -> str:
+        return f"{self.get_key(guid)}:invalidado"
+
+    def get_l1(self, guid: str) -> Optional[bytes]:
+        entry = self.l1.get(guid)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self.l1[guid]
+            return None
+        self.l1.move_to_end(guid)
+        return data
+
+    def put_l1(self, guid: str, data: bytes):
+        if self.l1_max_size <= 0:
+            return
+        self.l1[guid] = (data, time.monotonic() + self.l1_ttl)
+        self.l1.move_to_end(guid)
+        while len(self.l1) > self.l1_max_size:
+            self.l1.popitem(last=False)
+
+    async def get_l2(self, guid: str) -> Optional[bytes]:
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(self.get_key(guid))
+        except REDIS_ERRORS:
+            self.errors += 1
+            MAIN_LOGGER.warning("Falha na leitura do cache de usuários no Redis", exc_info=True)
+            return None
+
+    async def put_l2(self, guid: str, data: bytes):
+        if self.redis is None:
+            return
+        # Variação de até 10% no TTL, para que chaves gravadas juntas não expirem juntas
+        ttl = max(1, int(self.ttl * random.uniform(0.9, 1.0)))
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self.get_key(guid), data, ex=ttl).exists(self.get_invalidation_key(guid))
+                _, invalidado = await pipe.execute()
+            # Invalidação concorrente à gravação: o valor gravado pode estar desatualizado
+            if invalidado:
+                await self.redis.delete(self.get_key(guid))
+        except REDIS_ERRORS:
+            self.errors += 1
+            MAIN_LOGGER.warning("Falha na escrita do cache de usuários no Redis", exc_info=True)
+
+    async def is_invalidado(self, guid: str) -> bool:
+        """
+            Retorna True caso o usuário tenha sido invalidado há menos de invalidation_ttl
+            segundos, ou caso o Redis esteja indisponível: na dúvida, o usuário não é gravado
+        """
+        try:
+            return bool(await self.redis.exists(self.get_invalidation_key(guid)))
+        except REDIS_ERRORS:
+            self.errors += 1
+            return True
+
+    def get_lock_key(self, guid: str) -> str:
+        return f"{self.get_key(guid)}:lock"
+
+    async def acquire_lock(self, guid: str, token: str) -> Optional[bool]:
+        """
+            Grava token no lock do usuário, caso ele esteja livre.
+            Retorna None caso o Redis esteja indisponível: o usuário é carregado sem o lock
+        """
+        try:
+            # O lock expira sozinho caso o processo que o obteve não o libere
+            return bool(await self.redis.set(
+                self.get_lock_key(guid), token, nx=True, px=max(1, int(self.lock_wait * 5000))
+            ))
+        except REDIS_ERRORS:
+            self.errors += 1
+            return None
+
+    async def release_lock(self, guid: str, token: str):
+        try:
+            await self.release_lock_script(keys=[self.get_lock_key(guid)], args=[token])
+        except REDIS_ERRORS:
+            self.errors += 1
+
+    async def wait_l2(self, guid: str) -> Optional[bytes]:
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_wait / 10)
+            data = await self.get_l2(guid)
+            if data is not None:
+                return data
+        return None
+
+    async def load(self, guid: str,
+                   loader: Callable[[], Awaitable[Optional[UsuarioOutput]]]) -> Tuple[Optional[bytes], bool]:
+        """
+            Retorna o usuário serializado e se ele pode ser gravado em cache
+        """
+        data = await self.get_l2(guid)
+        if data is not None:
+            self.l2_hits += 1
+            return data, True
+
+        locked = None
+        token = secrets.token_hex(16)
+        if self.redis is not None:
+            locked = await self.acquire_lock(guid, token)
+            if locked is False:
+                data = await self.wait_l2(guid)
+                if data is not None:
+                    self.l2_hits += 1
+                    return data, True
+
+        self.misses += 1
+        try:
+            # Verificado antes da carga: uma invalidação durante a carga é detectada por put_l2
+            invalidado = self.redis is not None and await self.is_invalidado(guid)
+            user = await loader()
+            if user is None:
+                return None, False
+            data = UserCacheService.serializa(user)
+            if not invalidado:
+                await self.put_l2(guid, data)
+            return data, not invalidado
+        finally:
+            if locked:
+                await self.release_lock(guid, token)
+
+    async def get_or_load(self, guid: str,
+                          loader: Callable[[], Awaitable[Optional[UsuarioOutput]]]) -> Optional[UsuarioOutput]:
+        """
+            Retorna o usuário do cache ou, caso não esteja em cache, o carrega
+            com loader e o grava nos dois níveis. Usuários inexistentes não são gravados
+        """
+        data = self.get_l1(guid)
+        if data is not None:
+            self.l1_hits += 1
+            return UserCacheService.desserializa(data)
+
+        # As buscas que aguardam a carga de outra não gravam no L1: apenas quem carrega
+        future = self.loading.get(guid)
+        if future is not None:
+            data = await asyncio.shield(future)
+        else:
+            future = self.loading[guid] = asyncio.get_running_loop().create_future()
+            geracao = self.geracao
+            try:
+                data, cacheavel = await self.load(guid, loader)
+                if data is not None and cacheavel and geracao == self.geracao:
+                    self.put_l1(guid, data)
+                future.set_result(data)
+            except Exception as ex:
+                future.set_exception(ex)
+                # Evita o aviso de exceção não recuperada quando ninguém aguarda a carga
+                future.exception()
+                raise
+            finally:
+                if not future.done():
+                    future.cancel()
+                del self.loading[guid]
+
+        if data is None:
+            return None
+        return UserCacheService.desserializa(data)
+
+    async def invalida(self, guid: str):
+        """
+            Remove o usuário dos dois níveis do cache. Os L1 dos demais processos
+            expiram em até l1_ttl segundos
+        """
+        self.geracao += 1
+        self.l1.pop(guid, None)
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(self.get_invalidation_key(guid), b'1', px=max(1, int(self.invalidation_ttl * 1000)))
+                pipe.delete(self.get_key(guid))
+                await pipe.execute()
+        except REDIS_ERRORS:
+            self.errors += 1
+            MAIN_LOGGER.warning("Falha na invalidação do cache de usuários no Redis", exc_info=True)
+
+    def get_stats(self) -> dict:
+        return {
+            'l1_size': len(self.l1),
+            'l1_hits': self.l1_hits,
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'errors': self.errors
+        }
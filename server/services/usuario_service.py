@@ -1,16 +1,15 @@
 from server.repository.usuario_repository import UsuarioRepository
-from server.configuration.db import AsyncSession
+from server.configuration.db import AsyncSession, agenda_apos_commit
 from server.schemas.usuario_schema import UsuarioInput, UsuarioOutput, UsuarioPublishInput
 from server.models.usuario_model import Usuario
 import re
 from server.configuration import exceptions
-from sqlalchemy import or_, and_
-from passlib.context import CryptContext
+from sqlalchemy import and_
 from jose import JWTError, jwt
 from server.schemas.token_shema import DecodedMailToken
 from datetime import timedelta
 from datetime import datetime
-from typing import List, Optional, Any
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Any
 from fastapi.security import OAuth2PasswordRequestForm
 from server.services.email_service import EmailService
 from fastapi import Request
@@ -18,13 +17,26 @@ from pydantic import ValidationError, EmailStr
 from server.templates import jinja2_templates
 from server.configuration.environment import Environment
 from server.schemas.usuario_schema import CurrentUserOutput
+from server.services import hashing_service
+from server.services.hashing_service import HashingService
+from server.utils.bulkhead import Bulkhead
+from server.services.login_throttle_service import LoginThrottleService
+from server.services.permission_snapshot_service import PermissionSnapshotService
+from server.repository.permissao_repository import PermissaoRepository
+from server.repository.outbox_repository import OutboxRepository
+from server.services.key_ring_service import KeyRingService
+from server.services.user_cache_service import UserCacheService
+from functools import partial
 import json
+import base64
+import binascii
+import uuid
+import zlib
 
 
 class UsuarioService:
 
     EMAIL_REGEX_UNICAMP = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]*unicamp\.br\b$'
-    CRYPT_CONTEXT = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
     @staticmethod
     def valida_email_unicamp(email: EmailStr):
@@ -32,11 +44,30 @@ class UsuarioService:
 
     @staticmethod
     def verifica_senha(password: str, hashed_password: str) -> bool:
-        return UsuarioService.CRYPT_CONTEXT.verify(password, hashed_password)
+        return hashing_service.verifica_senha(password, hashed_password)
 
     @staticmethod
     def criptografa_senha(password: str) -> str:
-        return UsuarioService.CRYPT_CONTEXT.hash(password)
+        return hashing_service.criptografa_senha(password)
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, id_usuario: int) -> str:
+        """
+            Codifica a chave (created_at, id) do último usuário de uma página
+            em um cursor opaco, utilizado para requisitar a próxima página
+        """
+        cursor_json = json.dumps([created_at.isoformat(), id_usuario])
+        return base64.urlsafe_b64encode(cursor_json.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        try:
+            created_at, id_usuario = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return datetime.fromisoformat(created_at), int(id_usuario)
+        except (binascii.Error, UnicodeError, TypeError, ValueError):
+            raise exceptions.InvalidCursorException(
+                detail=f"O cursor ({cursor}) não é um cursor de paginação válido"
+            )
 
     @staticmethod
     def get_user_created_payload(user_created: Usuario):
@@ -49,7 +80,7 @@ class UsuarioService:
 
     @staticmethod
     def gera_token(data_to_encode: dict, expires_delta: timedelta,
-                   secret_key: str, algorithm: str):
+                   secret_key: str, algorithm: str, headers: Optional[dict] = None):
         """
             Função responsável por atualizar o objeto à ser codificado
             adicionando duas informações adicionais:
@@ -73,7 +104,8 @@ class UsuarioService:
         return jwt.encode(
             data_to_encode,
             secret_key,
-            algorithm=algorithm
+            algorithm=algorithm,
+            headers=headers
         )
 
     @staticmethod
@@ -90,30 +122,133 @@ class UsuarioService:
         user_repo: Optional[UsuarioRepository] = None,
         environment: Optional[Environment] = None,
         email_sender_service: Optional[EmailService] = None,
-        publisher_service: Optional[Any] = None
+        outbox_repo: Optional[OutboxRepository] = None,
+        hashing_service: Optional[HashingService] = None,
+        permission_repo: Optional[PermissaoRepository] = None,
+        permission_snapshot: Optional[PermissionSnapshotService] = None,
+        key_ring: Optional[KeyRingService] = None,
+        user_cache: Optional[UserCacheService] = None,
+        hashing_bulkhead: Optional[Bulkhead] = None,
+        login_throttle: Optional[LoginThrottleService] = None
     ):
         self.user_repo = user_repo
         self.environment = environment
         self.email_sender_service = email_sender_service
-        self.publisher_service = publisher_service
+        self.outbox_repo = outbox_repo
+        self.hashing_service = hashing_service or HashingService()
+        self.permission_repo = permission_repo
+        self.permission_snapshot = permission_snapshot
+        self.key_ring = key_ring
+        self.user_cache = user_cache
+        self.hashing_bulkhead = hashing_bulkhead
+        self.login_throttle = login_throttle
+
+    async def executa_hashing(self, hashing_func: Callable[..., Awaitable[Any]], *args) -> Any:
+        """
+            Com o bulkhead, o hashing aguarda uma vaga ou é rejeitado (503)
+            caso a capacidade de hashing esteja esgotada
+        """
+        if self.hashing_bulkhead is None:
+            return await hashing_func(*args)
+        async with self.hashing_bulkhead.acquire():
+            return await hashing_func(*args)
 
-    async def autentica_usuario(self, username: str, password: str):
+    async def autentica_usuario(self, username: str, password: str) -> Tuple[Usuario, Optional[str]]:
         """
             Função responsável por autenticar o usuário
             É verificado se o usuário existe e se a senha está correta
+
+            A verificação do hash é executada fora do event loop. Caso o hash tenha
+            sido gerado com um custo diferente do atual (HASHING_BCRYPT_ROUNDS), o
+            novo hash é gerado no mesmo worker e retornado junto com o usuário, para
+            ser gravado apenas se o login for concluído
         """
 
         user: List[Usuario] = await self.user_repo.find_usuarios_by_filtros([Usuario.username == username])
-        if len(user) == 0 or not UsuarioService.verifica_senha(password, user[0].hashed_password):
+        if len(user) == 0:
+            raise exceptions.InvalidUsernamePasswordException()
+
+        valid, new_hashed_password = await self.executa_hashing(
+            self.hashing_service.verifica_e_atualiza_senha, password, user[0].hashed_password)
+        if not valid:
             raise exceptions.InvalidUsernamePasswordException()
 
-        return user[0]
+        return user[0], new_hashed_password
+
+    async def get_all_users(self, limit: int, cursor: Optional[str] = None) -> dict:
+        """
+            Retorna uma página de usuários e o cursor da próxima página.
+            A página é buscada com um registro a mais, apenas para
+            saber se existe uma próxima página
+        """
+        after = UsuarioService.decode_cursor(cursor) if cursor else None
+        users = await self.user_repo.find_usuarios_page(limit + 1, after)
 
-    async def get_all_users(self):
-        return await self.user_repo.find_usuarios_by_filtros(filtros=[])
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = UsuarioService.encode_cursor(users[-1].created_at, users[-1].id)
+
+        return dict(
+            items=users,
+            next_cursor=next_cursor
+        )
+
+    async def exporta_usuarios_ndjson(self, batch_size: int, gzip: bool = False) -> AsyncIterator[bytes]:
+        """
+            Exporta todos os usuários no formato NDJSON (um UsuarioOutput por linha).
+            Cada lote lido do cursor do banco de dados é serializado e enviado como um
+            chunk, mantendo o uso de memória constante independente da quantidade de
+            usuários. Com gzip, os chunks são comprimidos incrementalmente
+        """
+        compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16) if gzip else None
+
+        async for users in self.user_repo.stream_usuarios(batch_size):
+            chunk = ''.join(
+                UsuarioOutput.from_orm(user).json() + '\n' for user in users
+            ).encode('utf-8')
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+        if compressor:
+            yield compressor.flush()
 
     async def get_user_by_guid(self, guid_usuario: str):
-        return await self.user_repo.find_usuario_by_guid(guid_usuario)
+        """
+            Com o cache de usuários habilitado, o usuário é buscado no banco
+            de dados apenas quando não estiver em cache
+        """
+        if self.user_cache is None:
+            return await self.user_repo.find_usuario_by_guid(guid_usuario)
+
+        try:
+            guid_usuario = str(uuid.UUID(guid_usuario))
+        except ValueError:
+            return await self.user_repo.find_usuario_by_guid(guid_usuario)
+
+        async def carrega_usuario() -> Optional[UsuarioOutput]:
+            user = await self.user_repo.find_usuario_by_guid(guid_usuario)
+            return UsuarioOutput.from_orm(user) if user else None
+
+        return await self.user_cache.get_or_load(guid_usuario, carrega_usuario)
+
+    async def get_users_by_guids(self, guids: List[uuid.UUID]) -> dict:
+        """
+            Busca os usuários em uma única consulta. Os usuários encontrados são
+            retornados em um mapa indexado pelo GUID e os não encontrados são
+            listados explicitamente, na ordem em que foram enviados
+        """
+        guids = list(dict.fromkeys(guids))
+        users = {
+            str(user.guid): user
+            for user in await self.user_repo.find_usuarios_by_guids(guids)
+        }
+        return dict(
+            users=users,
+            not_found=[guid for guid in guids if str(guid) not in users]
+        )
 
     async def verify_email(self, request: Request, code: str):
         """
@@ -154,6 +289,8 @@ class UsuarioService:
         # Marca o email como confirmado
 
         await self.user_repo.verify_email(user)
+        if self.user_cache is not None:
+            agenda_apos_commit(self.user_repo.db_session, partial(self.user_cache.invalida, str(user.guid)))
 
         # Enviando um HTML de resposta
 
@@ -234,13 +371,14 @@ class UsuarioService:
         # clicar, com o token. Esse servidor implementará um
         # GET que trata essa URL, confirmando o e-mail
 
-        self.email_sender_service.send_email_background(
+        await self.email_sender_service.send_email_background(
             recipient_email_list=[user.email],
             subject="Plataforma de Match de Projetos - Verificação de Email",
             rendered_html=rendered_html
         )
 
-    async def gera_novo_token_login(self, form_data: OAuth2PasswordRequestForm) -> dict:
+    async def gera_novo_token_login(self, form_data: OAuth2PasswordRequestForm,
+                                    client_ip: Optional[str] = None) -> dict:
         """
             Função responsável por autenticar o usuário com a informação do form
             e verificar se o e-mail foi verificado.
@@ -248,17 +386,40 @@ class UsuarioService:
             contendo
 
         :param form_data: Dados de usuário e senha enviados a partir do requestForm
+        :param client_ip: IP do cliente, utilizado no limite de tentativas de login
         :return: Objeto de tokenOutput como definido no schema
         """
 
-        # Autenticando e verificando se e-mail foi confirmado
+        # O limite de tentativas é verificado antes da busca do usuário e do hashing
+
+        reserva = None
+        if self.login_throttle is not None:
+            reserva = await self.login_throttle.verifica(form_data.username, client_ip)
 
-        user: Usuario = await self.autentica_usuario(form_data.username, form_data.password)
+        # Autenticando e verificando se e-mail foi confirmado.
+        # Apenas as falhas de autenticação contam no limite do username:
+        # nos demais casos, a tentativa reservada é estornada
+
+        falha_de_autenticacao = False
+        try:
+            user, new_hashed_password = await self.autentica_usuario(form_data.username, form_data.password)
+        except exceptions.InvalidUsernamePasswordException:
+            falha_de_autenticacao = True
+            raise
+        finally:
+            if self.login_throttle is not None and not falha_de_autenticacao:
+                await self.login_throttle.estorna(form_data.username, reserva)
         if not user.email_verificado:
             raise exceptions.EmailNotConfirmedException(
                 detail=f'O email {user.email} ainda não foi verificado'
             )
 
+        # O hash com o custo atual é gravado apenas no login concluído: gravado antes
+        # da verificação do e-mail, seria desfeito junto com a transação do login
+
+        if new_hashed_password:
+            await self.user_repo.atualiza_hashed_password(user.id, user.hashed_password, new_hashed_password)
+
         # Construindo o objeto para ser codificado
 
         access_token_before_encode = {
@@ -271,17 +432,39 @@ class UsuarioService:
             )
         }
 
+        # No modo de permissões embutidas, as permissões efetivas do usuário são
+        # resolvidas uma única vez no login e assinadas no token (claim 'perms').
+        # Permissões desatualizadas ficam limitadas ao tempo de expiração do token
+
+        if self.environment.ACCESS_TOKEN_EMBED_PERMISSIONS:
+            permissions = await self.permission_snapshot.get_permissions(
+                access_token_before_encode['roles'],
+                self.permission_repo,
+                self.environment.PERMISSION_SNAPSHOT_TTL_IN_SECONDS
+            )
+            access_token_before_encode['perms'] = sorted(permissions)
+
         # Com o usuário autenticado, basta gerar um novo jwt com tempo de expiração bem definido
 
         access_token_expire_delta = timedelta(
             seconds=self.environment.ACCESS_TOKEN_EXPIRE_DELTA_IN_SECONDS
         )
 
+        # Com algoritmos assimétricos, o token é assinado com a chave ativa do chaveiro
+        # e o seu identificador é adicionado ao header 'kid'
+
+        key_ring = self.key_ring or KeyRingService(
+            self.environment.ACCESS_TOKEN_ALGORITHM,
+            self.environment.ACCESS_TOKEN_SECRET_KEY
+        )
+        signing_key, headers = key_ring.get_signing_key()
+
         access_token = UsuarioService.gera_token(
             data_to_encode=access_token_before_encode,
             expires_delta=access_token_expire_delta,
-            secret_key=self.environment.ACCESS_TOKEN_SECRET_KEY,
-            algorithm=self.environment.ACCESS_TOKEN_ALGORITHM
+            secret_key=signing_key,
+            algorithm=self.environment.ACCESS_TOKEN_ALGORITHM,
+            headers=headers
         )
 
         return {
@@ -290,6 +473,21 @@ class UsuarioService:
             'access_token': access_token
         }
 
+    async def verifica_conflitos_usuario(self, usuario_input: UsuarioInput):
+        """
+            Lança a exceção de conflito caso já exista um usuário
+            com o mesmo username ou e-mail
+        """
+        conflitos = await self.user_repo.find_conflitos_usuario(usuario_input.username, usuario_input.email)
+        if conflitos:
+            if any(conflict_user.username == usuario_input.username for conflict_user in conflitos):
+                raise exceptions.UsernameConflictException(
+                    detail=f"Já existe um usuário com o nome de usuário ({usuario_input.username})"
+                )
+            raise exceptions.EmailConflictException(
+                detail=f"Já existe um usuário com o e-mail ({conflitos[0].email})"
+            )
+
     async def cria_novo_usuario(self, usuario_input: UsuarioInput) -> UsuarioOutput:
         """
             Função responsável por validar o usuário:
@@ -297,6 +495,10 @@ class UsuarioService:
                - Não existe username e e-mail na base de dados
             E armazenar o usuário com a senha criptografada
 
+            A existência do username e do e-mail é verificada antes do hashing
+            da senha, para que cadastros duplicados não consumam o bcrypt. O
+            INSERT ... ON CONFLICT protege apenas contra cadastros concorrentes
+
         :param usuario_input: Body da requisição com informações como email e nome
         :return: Usuário criado pelo banco de dados no formato 'UsuarioOutput'
         """
@@ -315,45 +517,38 @@ class UsuarioService:
         # Valida usuário na base de dados
         # Não pode haver um usuário com mesmo usuário ou e-mail
 
-        filtros = [
-            or_(
-                Usuario.email == usuario_input.email,
-                Usuario.username == usuario_input.username
-            )
-        ]
-
-        usuarios_db = await self.user_repo.find_usuarios_by_filtros(filtros)
-
-        if len(usuarios_db):
-            conflict_user = usuarios_db[0]
-            if conflict_user.username == usuario_input.username:
-                raise exceptions.UsernameConflictException(
-                    detail=f"Já existe um usuário com o nome de usuário ({conflict_user.username})"
-                )
-            else:
-                raise exceptions.EmailConflictException(
-                    detail=f"Já existe um usuário com o e-mail ({conflict_user.email})"
-                )
+        await self.verifica_conflitos_usuario(usuario_input)
 
         # Aplica hashing na senha do usuário e cria o objeto do novo usuário
         # para inserção no banco de dados
 
         novo_usuario_dict = usuario_input.convert_to_dict()
-        novo_usuario_dict['hashed_password'] = UsuarioService.criptografa_senha(usuario_input.password)
+        novo_usuario_dict['hashed_password'] = await self.executa_hashing(
+            self.hashing_service.criptografa_senha, usuario_input.password)
         del novo_usuario_dict['password']
 
-        # Insere no banco de dados e retorna o usuário
+        # Insere no banco de dados em um único comando. Um cadastro concorrente
+        # do mesmo usuário ou e-mail é rejeitado pelas restrições de unicidade da tabela
 
-        user_created = await self.user_repo.insere_usuario(novo_usuario_dict)
+        user_created = await self.user_repo.insere_usuario_se_nao_existe(novo_usuario_dict)
 
-        if user_created:
+        if user_created is None:
 
-            # Define um payload para a mensagem para o publicador de mensagem
+            # Identifica qual campo conflitou com o cadastro concorrente
 
-            self.publisher_service.publish(
-                UsuarioService.get_user_created_payload(user_created),
-                self.environment.USER_CREATED_TOPIC_ARN
+            await self.verifica_conflitos_usuario(usuario_input)
+            raise exceptions.UnprocessableEntityException(
+                detail="Não foi possível criar o usuário. Tente novamente"
             )
 
+        # Define um payload para a mensagem e a grava no outbox, na mesma transação
+        # do novo usuário. A publicação é feita em segundo plano pelo OutboxDispatcherService
+
+        await self.outbox_repo.insere_evento(dict(
+            guid_usuario=user_created.guid,
+            topico_arn=self.environment.USER_CREATED_TOPIC_ARN,
+            payload=UsuarioService.get_user_created_payload(user_created)
+        ))
+
         return user_created
 
@@ -6,7 +6,12 @@ import time
 import asyncio
 from server.configuration.environment import IntegrationTestEnvironment
 from server.dependencies.get_environment_cached import get_environment_cached
-from server.dependencies.session import get_session
+from server.dependencies.session import get_lazy_session, get_lazy_read_only_session
+from server.configuration.db import LazyAsyncSession
+from server.dependencies.get_hashing_service import get_hashing_service
+from server.services.hashing_service import HashingService
+from server.dependencies.get_permission_snapshot import get_permission_snapshot_cached
+from server.services.permission_snapshot_service import PermissionSnapshotService
 from alembic.command import upgrade as alembic_upgrade
 from alembic.config import Config as AlembicConfig
 from server import _init_app
@@ -57,6 +62,22 @@ def mock_default_environment_variables():
         ACCESS_TOKEN_SECRET_KEY="secret",
         ACCESS_TOKEN_ALGORITHM="HS256",
         ACCESS_TOKEN_EXPIRE_DELTA_IN_SECONDS=86400,
+        ACCESS_TOKEN_EMBED_PERMISSIONS=False,
+        ACCESS_TOKEN_CACHE_MAX_SIZE=1000,
+        ACCESS_TOKEN_PRIVATE_KEYS={},
+        ACCESS_TOKEN_ACTIVE_KID='',
+        JWKS_CACHE_MAX_AGE_IN_SECONDS=3600,
+        PERMISSION_SNAPSHOT_TTL_IN_SECONDS=300,
+        USERS_EXPORT_BATCH_SIZE=2,
+        USER_CACHE_ENABLED=False,
+        HASHING_EXECUTOR_MAX_WORKERS=0,
+        HASHING_BCRYPT_ROUNDS=12,
+        HASHING_BULKHEAD_MAX_CONCURRENT=4,
+        HASHING_BULKHEAD_MAX_QUEUE=64,
+        HASHING_BULKHEAD_QUEUE_TIMEOUT_IN_SECONDS=1.0,
+        HASHING_BULKHEAD_RETRY_AFTER_IN_SECONDS=2,
+        LOGIN_THROTTLE_ENABLED=False,
+        TRUSTED_PROXY_HOPS=1,
         AUTHENTICATOR_DNS="/fake/users/token"
     )
 
@@ -68,6 +89,14 @@ async def get_test_async_session():
         await session.close()
 
 
+async def get_test_lazy_session():
+    lazy_session = LazyAsyncSession(build_test_async_session_maker)
+    try:
+        yield lazy_session
+    finally:
+        await lazy_session.close()
+
+
 @pytest.fixture
 async def db_docker_container():
 
@@ -118,7 +147,11 @@ async def db_docker_container():
 @pytest.fixture
 def _test_app(create_db_upgrade, scope="session"):
     app = _init_app()
-    app.dependency_overrides[get_session] = get_test_async_session
+    app.dependency_overrides[get_lazy_session] = get_test_lazy_session
+    app.dependency_overrides[get_lazy_read_only_session] = get_test_lazy_session
+    app.dependency_overrides[get_hashing_service] = HashingService
+    permission_snapshot = PermissionSnapshotService()
+    app.dependency_overrides[get_permission_snapshot_cached] = lambda: permission_snapshot
     return app
 
 
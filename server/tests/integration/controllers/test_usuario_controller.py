@@ -10,8 +10,7 @@ from fastapi.security import SecurityScopes
 from server.dependencies.get_security_scopes import get_security_scopes
 from server.dependencies.get_email_sender_service import get_email_sender_service
 from server.dependencies.get_environment_cached import get_environment_cached
-from server.dependencies.get_sns_publisher_service import get_sns_publisher_service
-from mock import Mock
+from mock import Mock, AsyncMock
 from server.tests.integration import build_test_async_session_maker
 from server.models.permissao_model import Permissao
 from server.models.funcao_model import Funcao
@@ -24,28 +23,22 @@ from httpx import AsyncClient
 from server.schemas.token_shema import DecodedAccessToken
 from server.repository.usuario_repository import UsuarioRepository
 from sqlalchemy import and_
+from server.dependencies.get_login_throttle import get_login_throttle
+from server.services.login_throttle_service import LoginThrottleService
+from server.utils.rate_limiter import InMemoryRateLimiter
 
 
 def build_mock_email_service():
     mock_email_service = Mock()
-    mock_email_service.send_email_background = Mock(
+    mock_email_service.send_email_background = AsyncMock(
         return_value=None
     )
     return mock_email_service
 
 
-def build_mock_sns_publisher_service():
-    mock_publisher_service = Mock()
-    mock_publisher_service.publish = Mock(
-        return_value=None
-    )
-    return mock_publisher_service
-
-
 @pytest.fixture
 def _test_app_default_environment_mock_services(_test_app_default_environment: FastAPI) -> FastAPI:
     _test_app_default_environment.dependency_overrides[get_email_sender_service] = build_mock_email_service
-    _test_app_default_environment.dependency_overrides[get_sns_publisher_service] = build_mock_sns_publisher_service
     return _test_app_default_environment
 
 
@@ -325,7 +318,56 @@ class TestUsuarioController:
             )
 
             assert response.status_code == 200
-            assert len(response.json()) == 3
+            assert len(response.json()['items']) == 3
+            assert response.json()['next_cursor'] is None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("username, email, guid, roles, name", ENOUGH_PERMISSION_READ_ALL_USERS_PARAMETRIZE)
+    async def test_get_all_users_paginated(
+        _test_app_default_environment: FastAPI, username, email,
+        guid, roles, name, write_default_db_for_get_all_users
+    ):
+
+        data_to_encode = dict(
+            username=username,
+            email=email,
+            guid=guid,
+            roles=roles,
+            name=name
+        )
+
+        usr_token = jwt.encode(
+            data_to_encode,
+            'secret',
+            algorithm="HS256"
+        )
+
+        async with AsyncClient(
+                app=_test_app_default_environment,
+                base_url='http://test'
+        ) as test_async_client:
+
+            test_async_client: AsyncClient
+
+            usernames = []
+            params = dict(limit=2)
+            for expected_page_size in [2, 1]:
+                response = await test_async_client.get(
+                    'users',
+                    params=params,
+                    headers=dict(
+                        Authorization=f"Bearer {usr_token}"
+                    ),
+                )
+                assert response.status_code == 200
+                assert len(response.json()['items']) == expected_page_size
+                assert all('hashed_password' not in user for user in response.json()['items'])
+                usernames.extend(user['username'] for user in response.json()['items'])
+                params['cursor'] = response.json()['next_cursor']
+
+            assert params['cursor'] is None
+            assert sorted(usernames) == ['user1', 'user2', 'user3']
 
     @staticmethod
     @pytest.mark.asyncio
@@ -365,6 +407,61 @@ class TestUsuarioController:
 
             assert response.status_code == 401
 
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("username, email, guid, roles, name", ENOUGH_PERMISSION_READ_ALL_USERS_PARAMETRIZE)
+    async def test_get_users_by_guids(
+        _test_app_default_environment: FastAPI, username, email,
+        guid, roles, name, write_default_db_for_get_all_users
+    ):
+
+        data_to_encode = dict(
+            username=username,
+            email=email,
+            guid=guid,
+            roles=roles,
+            name=name
+        )
+
+        usr_token = jwt.encode(
+            data_to_encode,
+            'secret',
+            algorithm="HS256"
+        )
+
+        async with AsyncClient(
+                app=_test_app_default_environment,
+                base_url='http://test'
+        ) as test_async_client:
+
+            test_async_client: AsyncClient
+
+            headers = dict(
+                Authorization=f"Bearer {usr_token}"
+            )
+
+            response = await test_async_client.get('users', headers=headers)
+            guids = [user['guid'] for user in response.json()['items']]
+            missing_guid = uuid.uuid4().__str__()
+
+            response = await test_async_client.post(
+                'users/batch',
+                json=dict(guids=guids + [missing_guid]),
+                headers=headers,
+            )
+
+            assert response.status_code == 200
+            assert sorted(response.json()['users'].keys()) == sorted(guids)
+            assert response.json()['not_found'] == [missing_guid]
+
+            response = await test_async_client.post(
+                'users/batch',
+                json=dict(guids=[missing_guid] * 501),
+                headers=headers,
+            )
+
+            assert response.status_code == 422
+
     """
         POST NEW USER
     """
@@ -500,6 +597,36 @@ class TestUsuarioController:
 
             assert response.status_code == 403
 
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("form_data", USER_WRONG_PASSWORD_FORM_DATA_LOGIN_PARAMETRIZE)
+    async def test_login_limite_por_ip_atras_do_proxy(form_data, _test_app_default_environment):
+        # Uma tentativa por IP, sem limite por username
+        login_throttle = LoginThrottleService(InMemoryRateLimiter(60, 1000), 0, 1)
+        _test_app_default_environment.dependency_overrides[get_login_throttle] = lambda: login_throttle
+
+        async with AsyncClient(
+            app=_test_app_default_environment,
+            base_url='http://test'
+        ) as test_async_client:
+            test_async_client: AsyncClient
+
+            # Todas as requisições chegam do mesmo endereço (o router), que adiciona
+            # o IP do cliente ao X-Forwarded-For enviado pelo próprio cliente
+            async def login(forwarded_for: str):
+                return await test_async_client.post(
+                    'users/token',
+                    data=form_data,
+                    headers={'X-Forwarded-For': forwarded_for}
+                )
+
+            assert (await login('198.51.100.1')).status_code == 403
+            assert (await login('198.51.100.2')).status_code == 403
+
+            response = await login('198.51.100.2, 198.51.100.1')
+            assert response.status_code == 429
+            assert 'retry-after' in response.headers
+
     @staticmethod
     @pytest.mark.asyncio
     @pytest.mark.parametrize("form_data", VALID_FORM_DATA_LOGIN_PARAMETRIZE)
@@ -0,0 +1,132 @@
+import json
+import logging
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from server.configuration.bulk_log_handler import BulkLogHandler
+
+
+"""
+    Fixtures
+"""
+
+
+class BulkRequestHandler(BaseHTTPRequestHandler):
+
+    """
+        Substituto local da API _bulk: guarda os documentos recebidos
+        e responde no formato do Elasticsearch
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        lines = body.splitlines()
+        documents = [json.loads(line) for line in lines[1::2]]
+        self.server.requests.append({
+            'path': self.path,
+            'content_type': self.headers['Content-Type'],
+            'actions': [json.loads(line) for line in lines[0::2]],
+            'documents': documents
+        })
+        status = self.server.status
+        items = [{'index': {'status': status}} for _ in documents]
+        response = json.dumps({'errors': status >= 300, 'items': items}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def bulk_server():
+    server = HTTPServer(('127.0.0.1', 0), BulkRequestHandler)
+    server.requests = []
+    server.status = 201
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def build_handler(bulk_server, **kwargs) -> BulkLogHandler:
+    handler = BulkLogHandler(f"http://127.0.0.1:{bulk_server.server_port}", "logs", **kwargs)
+    handler.setFormatter(logging.Formatter('{"message": "%(message)s"}'))
+    return handler
+
+
+def build_record(message: str) -> logging.LogRecord:
+    return logging.makeLogRecord({'msg': message})
+
+
+class TestBulkLogHandler:
+
+    """
+        Testes do envio dos logs em lotes
+    """
+
+    @staticmethod
+    def test_envio_em_lotes_pelo_tamanho(bulk_server):
+        handler = build_handler(bulk_server, batch_size=2, flush_interval=60)
+        for i in range(5):
+            handler.emit(build_record(f"registro {i}"))
+        handler.close()
+
+        assert [len(request['documents']) for request in bulk_server.requests] == [2, 2, 1]
+        assert bulk_server.requests[0]['path'] == '/_bulk'
+        assert bulk_server.requests[0]['content_type'] == 'application/x-ndjson'
+        assert bulk_server.requests[0]['actions'][0] == {'index': {'_index': 'logs'}}
+        assert [
+            document['message'] for request in bulk_server.requests for document in request['documents']
+        ] == [f"registro {i}" for i in range(5)]
+        assert handler.get_stats() == {'buffered': 0, 'sent': 5, 'failed': 0, 'dropped': 0}
+
+    @staticmethod
+    def test_envio_pelo_intervalo(bulk_server):
+        handler = build_handler(bulk_server, batch_size=100, flush_interval=0.05)
+        handler.emit(build_record("registro"))
+        handler.flush()
+
+        assert len(bulk_server.requests) == 1
+        assert handler.sent == 1
+        handler.close()
+
+    @staticmethod
+    def test_buffer_cheio_descarta_os_mais_antigos(bulk_server):
+        handler = build_handler(bulk_server, batch_size=100, flush_interval=60, buffer_size=3)
+        for i in range(5):
+            handler.emit(build_record(f"registro {i}"))
+
+        assert handler.dropped == 2
+        assert [json.loads(document)['message'] for document in handler.buffer] == [
+            "registro 2", "registro 3", "registro 4"
+        ]
+        handler.close()
+
+    @staticmethod
+    def test_falhas_contadas(bulk_server):
+        bulk_server.status = 400
+        handler = build_handler(bulk_server, batch_size=2, flush_interval=60)
+        handler.emit(build_record("registro 0"))
+        handler.emit(build_record("registro 1"))
+        handler.close()
+
+        assert handler.failed == 2
+        assert handler.sent == 0
+
+    @staticmethod
+    def test_falhas_informadas_com_limite(capsys):
+        # Servidor indisponível: todos os envios falham
+        handler = BulkLogHandler("http://127.0.0.1:1", "logs", batch_size=1, flush_interval=60)
+        handler.setFormatter(logging.Formatter('{"message": "%(message)s"}'))
+        for i in range(3):
+            handler.emit(build_record(f"registro {i}"))
+            handler.flush()
+        handler.close()
+
+        assert handler.failed == 3
+        assert len(capsys.readouterr().err.splitlines()) == 1
@@ -0,0 +1,141 @@
+import json
+import logging
+import queue
+import sys
+import pytest
+from fastapi import FastAPI
+from server import configura_eventos
+from server.configuration.custom_logging import Logger, DroppingQueueHandler, RequestFilter, CurrentUserFilter, \
+    JsonFormatter, SamplingFilter
+
+
+"""
+    Fixtures
+"""
+
+
+@pytest.fixture
+def logger_name():
+    yield "TEST_LOGGER"
+    Logger.stop_listener("TEST_LOGGER")
+
+
+class TestLogger:
+
+    """
+        Testes do pipeline de logs baseado em fila
+    """
+
+    @staticmethod
+    def test_logs_escritos_pela_thread_do_listener(logger_name, capsys):
+        logger = Logger(
+            logger_name,
+            logging.Formatter("%(levelname)s|%(request_path)s|%(username)s|%(message)s"),
+            [RequestFilter(), CurrentUserFilter()]
+        ).get_logger()
+
+        logger.info("mensagem %s", "formatada")
+        Logger.stop_listener(logger_name)
+
+        # Fora de uma requisição, os campos da requisição e do usuário ficam vazios
+        assert capsys.readouterr().out == "INFO|None||mensagem formatada\n"
+
+    @staticmethod
+    def test_listeners_encerrados_por_ultimo():
+        app = FastAPI()
+        configura_eventos(app)
+
+        # Os logs dos demais handlers de encerramento ainda devem ser enviados
+        assert app.router.on_shutdown[-1] == Logger.stop_listeners
+
+    @staticmethod
+    def test_reconfiguracao_nao_duplica_handlers(logger_name):
+        for _ in range(3):
+            logger = Logger(logger_name, logging.Formatter("%(message)s"), [RequestFilter()]).get_logger()
+
+        assert len(logger.handlers) == 1
+        assert len(logger.handlers[0].filters) == 1
+        assert list(Logger.LISTENERS).count(logger_name) == 1
+
+    @staticmethod
+    def test_fila_cheia_descarta_registros():
+        handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+        for i in range(5):
+            handler.emit(logging.makeLogRecord({'msg': f'registro {i}'}))
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+
+class TestJsonFormatter:
+
+    """
+        Testes do formato JSON compacto dos registros
+    """
+
+    @staticmethod
+    def test_registro_em_uma_linha_com_aspas_escapadas():
+        formatter = JsonFormatter({"levelname": "levelname", "message": "message", "ausente": "ausente"})
+        record = logging.makeLogRecord({
+            'levelname': 'INFO', 'msg': 'usuário "%s"\nsegunda linha', 'args': ('teste',)
+        })
+
+        output = formatter.format(record)
+
+        assert "\n" not in output
+        assert json.loads(output) == {
+            "levelname": "INFO",
+            "message": 'usuário "teste"\nsegunda linha',
+            "ausente": None
+        }
+
+    @staticmethod
+    def test_registro_com_excecao():
+        formatter = JsonFormatter({"message": "message"})
+        try:
+            raise ValueError("erro")
+        except ValueError:
+            record = logging.makeLogRecord({'msg': 'falha', 'exc_info': sys.exc_info()})
+
+        log = json.loads(formatter.format(record))
+
+        assert log['message'] == 'falha'
+        assert 'ValueError: erro' in log['exc_info']
+
+
+class TestSamplingFilter:
+
+    """
+        Testes da amostragem dos registros
+    """
+
+    @staticmethod
+    def test_avisos_e_erros_sempre_emitidos():
+        sampling_filter = SamplingFilter(0)
+
+        assert not sampling_filter.filter(logging.makeLogRecord({'levelno': logging.INFO}))
+        assert sampling_filter.filter(logging.makeLogRecord({'levelno': logging.WARNING}))
+        assert sampling_filter.filter(logging.makeLogRecord({'levelno': logging.ERROR}))
+        assert sampling_filter.sampled_out == 1
+
+    @staticmethod
+    def test_taxa_de_amostragem():
+        sampling_filter = SamplingFilter(0.25)
+
+        kept = sum(
+            sampling_filter.filter(logging.makeLogRecord({'levelno': logging.INFO}))
+            for _ in range(4000)
+        )
+
+        assert 800 < kept < 1200
+
+    @staticmethod
+    def test_configura_amostragem_substitui_filtro():
+        logger = logging.getLogger("TEST_LOGGER.amostrado")
+
+        Logger.configura_amostragem({"TEST_LOGGER.amostrado": 0.5})
+        Logger.configura_amostragem({"TEST_LOGGER.amostrado": 0.1})
+        assert [f.rate for f in logger.filters] == [0.1]
+
+        Logger.configura_amostragem({"TEST_LOGGER.amostrado": 1})
+        assert logger.filters == []
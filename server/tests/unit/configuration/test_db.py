@@ -0,0 +1,90 @@
+import pytest
+import time
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from server.configuration.db import possui_escritas_pendentes, ReplicaRouter
+
+
+"""
+    Fixtures
+"""
+
+
+METADATA = MetaData()
+TABELA = Table("tb_teste", METADATA, Column("id", Integer, primary_key=True))
+
+
+@pytest.fixture
+def session():
+    # A sessão assíncrona é montada sobre uma sessão síncrona em SQLite
+    # em memória, que dispara os mesmos eventos de Session
+    engine = create_engine("sqlite://")
+    METADATA.create_all(engine)
+    async_session = AsyncSession()
+    async_session.sync_session = Session(engine)
+    yield async_session
+    async_session.sync_session.close()
+
+
+class TestPossuiEscritasPendentes:
+
+    """
+        Testes da detecção das escritas da sessão, que decide o commit dos endpoints
+    """
+
+    @staticmethod
+    def test_leituras_nao_sao_escritas(session):
+        session.sync_session.execute(select(TABELA))
+
+        assert session.sync_session.in_transaction()
+        assert not possui_escritas_pendentes(session)
+
+    @staticmethod
+    def test_comando_de_escrita(session):
+        session.sync_session.execute(insert(TABELA).values(id=1))
+
+        assert possui_escritas_pendentes(session)
+
+    @staticmethod
+    def test_marca_removida_apos_commit_e_rollback(session):
+        session.sync_session.execute(insert(TABELA).values(id=1))
+        session.sync_session.commit()
+        assert not possui_escritas_pendentes(session)
+
+        session.sync_session.execute(insert(TABELA).values(id=2))
+        session.sync_session.rollback()
+        assert not possui_escritas_pendentes(session)
+
+
+class TestReplicaRouter:
+
+    """
+        Testes da distribuição das leituras entre as réplicas
+    """
+
+    @staticmethod
+    def test_round_robin():
+        router = ReplicaRouter(3, retry_after=30)
+
+        assert [router.escolhe() for _ in range(6)] == [0, 1, 2, 0, 1, 2]
+
+    @staticmethod
+    def test_replica_com_falha_ignorada():
+        router = ReplicaRouter(2, retry_after=30)
+        router.marca_falha(0)
+
+        assert [router.escolhe() for _ in range(3)] == [1, 1, 1]
+
+        # Sem réplicas disponíveis, a leitura vai para o banco de dados principal
+        router.marca_falha(1)
+        assert router.escolhe() is None
+
+    @staticmethod
+    def test_replica_disponivel_apos_retry_after():
+        router = ReplicaRouter(1, retry_after=0.01)
+        router.marca_falha(0)
+        assert router.escolhe() is None
+
+        time.sleep(0.02)
+        assert router.escolhe() == 0
@@ -0,0 +1,118 @@
+import pytest
+from mock import Mock, patch
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from server.configuration import db_metrics
+from server.configuration.db_metrics import DbMetrics, InstrumentedAsyncAdaptedQueuePool, instrumenta_engine
+
+
+"""
+    Fixtures
+"""
+
+
+@pytest.fixture
+def metrics():
+    metrics = DbMetrics()
+    with patch.object(db_metrics, 'DB_METRICS', metrics):
+        yield metrics
+
+
+@pytest.fixture
+def engine(metrics):
+    # O engine assíncrono é representado apenas pelo seu sync_engine, em SQLite
+    sync_engine = create_engine("sqlite://")
+    instrumenta_engine(Mock(sync_engine=sync_engine), 'teste', slow_statement_threshold_in_ms=0)
+    yield sync_engine
+    sync_engine.dispose()
+
+
+def get_sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestDbMetrics:
+
+    """
+        Testes das métricas dos comandos SQL
+    """
+
+    @staticmethod
+    def test_operacao_do_comando():
+        assert DbMetrics.get_operation("  select 1") == 'SELECT'
+        assert DbMetrics.get_operation("INSERT INTO tb_usuario") == 'INSERT'
+        assert DbMetrics.get_operation("BEGIN") == 'OTHER'
+
+    @staticmethod
+    def test_comandos_lentos_registrados():
+        metrics = DbMetrics()
+        metrics.slow_statement_threshold = 0.1
+        latency_before = get_sample('authenticator_db_statement_duration_seconds_count', {'operation': 'SELECT'})
+        slow_before = get_sample('authenticator_db_slow_statements_total', {'operation': 'SELECT'})
+
+        with patch.object(db_metrics, 'MAIN_LOGGER') as logger:
+            metrics.observe_statement("SELECT 1", 0.05)
+            metrics.observe_statement("SELECT 2", 0.2)
+
+        assert get_sample('authenticator_db_slow_statements_total', {'operation': 'SELECT'}) - slow_before == 1
+        assert get_sample(
+            'authenticator_db_statement_duration_seconds_count', {'operation': 'SELECT'}
+        ) - latency_before == 2
+        logger.warning.assert_called_once_with("Comando SQL lento (200 ms): SELECT 2")
+
+    @staticmethod
+    def test_comandos_contados_por_sessao(engine, metrics):
+        latency_before = get_sample('authenticator_db_statement_duration_seconds_count', {'operation': 'SELECT'})
+        slow_before = get_sample('authenticator_db_slow_statements_total', {'operation': 'SELECT'})
+
+        with patch.object(db_metrics, 'MAIN_LOGGER'):
+            session = Session(engine)
+            session.execute(text("SELECT 1"))
+            session.execute(text("SELECT 2"))
+            session.close()
+
+            # Comandos fora da sessão não são contados na sessão anterior
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 3"))
+
+        assert session.info['statements'] == 2
+        assert get_sample(
+            'authenticator_db_statement_duration_seconds_count', {'operation': 'SELECT'}
+        ) - latency_before == 3
+        assert get_sample('authenticator_db_slow_statements_total', {'operation': 'SELECT'}) - slow_before == 3
+
+    @staticmethod
+    def test_comandos_por_requisicao():
+        before = get_sample('authenticator_db_statements_per_request_count', {'endpoint': 'teste'})
+
+        DbMetrics.observe_statements_per_request('teste', 4)
+
+        assert get_sample('authenticator_db_statements_per_request_count', {'endpoint': 'teste'}) - before == 1
+        assert get_sample(
+            'authenticator_db_statements_per_request_bucket', {'endpoint': 'teste', 'le': '3.0'}
+        ) == 0
+
+
+class TestInstrumentedAsyncAdaptedQueuePool:
+
+    """
+        Testes das métricas do pool de conexões
+    """
+
+    @staticmethod
+    def test_estado_do_pool_no_checkout_e_checkin():
+        pool = InstrumentedAsyncAdaptedQueuePool(Mock, pool_size=2, max_overflow=1)
+        pool.metrics_name = 'teste_pool'
+        checkouts_before = get_sample('authenticator_db_pool_checkout_wait_seconds_count', {'engine': 'teste_pool'})
+
+        connection = pool.connect()
+        assert get_sample('authenticator_db_pool_connections', {'engine': 'teste_pool', 'state': 'checked_out'}) == 1
+        assert get_sample('authenticator_db_pool_connections', {'engine': 'teste_pool', 'state': 'checked_in'}) == 0
+
+        connection.close()
+        assert get_sample('authenticator_db_pool_connections', {'engine': 'teste_pool', 'state': 'checked_out'}) == 0
+        assert get_sample('authenticator_db_pool_connections', {'engine': 'teste_pool', 'state': 'checked_in'}) == 1
+        assert get_sample(
+            'authenticator_db_pool_checkout_wait_seconds_count', {'engine': 'teste_pool'}
+        ) - checkouts_before == 1
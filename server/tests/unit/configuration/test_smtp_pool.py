@@ -0,0 +1,228 @@
+import asyncio
+import time
+import aiosmtplib
+import pytest
+from mock import Mock, AsyncMock
+from fastapi_mail import MessageSchema
+from email import message_from_bytes
+from email.policy import default
+from server.configuration.smtp_pool import SMTPConnectionPool, build_email_message
+
+
+"""
+    Fixtures
+"""
+
+
+def build_smtp_mock():
+    smtp = Mock(is_connected=True)
+    smtp.mail = AsyncMock(return_value=None)
+    smtp.rcpt = AsyncMock(return_value=None)
+    smtp.data = AsyncMock(return_value=None)
+    smtp.noop = AsyncMock(return_value=None)
+    smtp.quit = AsyncMock(return_value=None)
+    return smtp
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def connect(connections):
+    async def connect():
+        smtp = build_smtp_mock()
+        connections.append(smtp)
+        return smtp
+    return connect
+
+
+@pytest.fixture
+def message():
+    return MessageSchema(
+        subject="Subject",
+        recipients=["a@dac.unicamp.br"],
+        html="HTML",
+        subtype="html"
+    )
+
+
+class TestSMTPConnectionPool:
+
+    """
+        Testes do pool de conexões SMTP
+    """
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_reutiliza_conexao(connect, connections, message):
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br")
+
+        for _ in range(5):
+            await pool.send_message(message)
+
+        assert len(connections) == 1
+        assert connections[0].data.await_count == 5
+        connections[0].noop.assert_not_awaited()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_limite_de_mensagens_por_conexao(connect, connections, message):
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br", max_messages=2)
+
+        for _ in range(5):
+            await pool.send_message(message)
+
+        assert len(connections) == 3
+        assert [smtp.data.await_count for smtp in connections] == [2, 2, 1]
+        assert connections[0].quit.await_count == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_noop_em_conexao_ociosa(connect, connections, message):
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br", noop_after=10)
+
+        await pool.send_message(message)
+        pool.idle[0].last_used = time.monotonic() - 20
+        connections[0].noop = AsyncMock(side_effect=aiosmtplib.SMTPServerDisconnected('timeout'))
+        await pool.send_message(message)
+
+        connections[0].noop.assert_awaited_once()
+        assert len(connections) == 2
+        connections[1].data.assert_awaited_once()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_reconecta_apos_desconexao(connect, connections, message):
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br")
+
+        await pool.send_message(message)
+        # Conexão ociosa encerrada pelo servidor, detectada no MAIL FROM
+        connections[0].mail = AsyncMock(side_effect=aiosmtplib.SMTPServerDisconnected('closed'))
+        await pool.send_message(message)
+
+        assert len(connections) == 2
+        connections[1].data.assert_awaited_once()
+        assert list(pool.idle)[0].smtp is connections[1]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_reenvio_em_nova_conexao(connect, connections, message):
+        """
+            Com várias conexões ociosas, o reenvio não utiliza outra conexão ociosa
+        """
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br")
+
+        async with pool.acquire():
+            async with pool.acquire():
+                pass
+        for smtp in connections:
+            smtp.mail = AsyncMock(side_effect=aiosmtplib.SMTPServerDisconnected('closed'))
+        await pool.send_message(message)
+
+        assert len(connections) == 3
+        connections[2].data.assert_awaited_once()
+        assert sum(smtp.mail.await_count for smtp in connections[:2]) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_desconexao_apos_data_nao_reenvia(connect, connections, message):
+        """
+            Após o DATA a mensagem pode ter sido aceita pelo servidor: o reenvio a duplicaria
+        """
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br")
+
+        await pool.send_message(message)
+        connections[0].data = AsyncMock(side_effect=aiosmtplib.SMTPServerDisconnected('closed'))
+        with pytest.raises(aiosmtplib.SMTPServerDisconnected):
+            await pool.send_message(message)
+
+        assert len(connections) == 1
+        assert len(pool.idle) == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_envelope(connect, connections):
+        pool = SMTPConnectionPool(connect, "Authenticator <noreply@unicamp.br>")
+
+        await pool.send_message(MessageSchema(
+            subject="Verificação",
+            recipients=["a@dac.unicamp.br"],
+            bcc=["b@dac.unicamp.br"],
+            html="<p>Olá</p>",
+            subtype="html"
+        ))
+
+        connections[0].mail.assert_awaited_once_with("noreply@unicamp.br")
+        assert [call.args[0] for call in connections[0].rcpt.await_args_list] == [
+            "a@dac.unicamp.br", "b@dac.unicamp.br"
+        ]
+
+        # A mensagem é enviada em ASCII, sem o header Bcc
+        data = connections[0].data.await_args.args[0]
+        data.decode('ascii')
+        sent = message_from_bytes(data, policy=default)
+        assert sent['Subject'] == "Verificação"
+        assert sent['To'] == "a@dac.unicamp.br"
+        assert sent['Bcc'] is None
+        assert sent.get_content_type() == 'text/html'
+        assert sent.get_content().strip() == "<p>Olá</p>"
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_destinatario_recusado(connect, connections, message):
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br")
+
+        await pool.send_message(message)
+        connections[0].rcpt = AsyncMock(
+            side_effect=aiosmtplib.SMTPRecipientRefused(550, 'unknown user', 'a@dac.unicamp.br'))
+        with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+            await pool.send_message(message)
+
+        connections[0].data.assert_awaited_once()
+
+    @staticmethod
+    def test_anexos_nao_suportados():
+        with pytest.raises(ValueError):
+            build_email_message(MessageSchema(
+                recipients=["a@dac.unicamp.br"],
+                body="texto",
+                template_body={'a': 1}
+            ), "noreply@unicamp.br")
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cancelamento_fecha_conexao(connect, connections, message):
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br", max_size=1)
+        sending = asyncio.Event()
+
+        async def slow_send(*_):
+            sending.set()
+            await asyncio.sleep(10)
+
+        await pool.send_message(message)
+        connections[0].data = AsyncMock(side_effect=slow_send)
+        task = asyncio.ensure_future(pool.send_message(message))
+        await sending.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        connections[0].close.assert_called_once()
+        assert len(pool.idle) == 0
+
+        # A vaga do pool é liberada: um novo envio abre uma nova conexão
+        await asyncio.wait_for(pool.send_message(message), timeout=1)
+        assert len(connections) == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_close(connect, connections, message):
+        pool = SMTPConnectionPool(connect, "noreply@unicamp.br")
+
+        await pool.send_message(message)
+        await pool.close()
+
+        connections[0].quit.assert_awaited_once()
+        assert len(pool.idle) == 0
@@ -0,0 +1,80 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from server.middleware.metrics_middleware import PrometheusMiddleware, UNMATCHED_ROUTE
+
+
+"""
+    Fixtures
+"""
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/metrics-test/{guid}")
+    async def get_item(guid: str):
+        return {"guid": guid}
+
+    @app.get("/metrics-test-error")
+    async def get_error():
+        raise RuntimeError("erro")
+
+    app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+def get_requests(method: str, route: str, status: str) -> float:
+    return REGISTRY.get_sample_value(
+        'authenticator_http_requests_total', {'method': method, 'route': route, 'status': status}
+    ) or 0
+
+
+def get_latency_count(method: str, route: str) -> float:
+    return REGISTRY.get_sample_value(
+        'authenticator_http_request_duration_seconds_count', {'method': method, 'route': route}
+    ) or 0
+
+
+class TestPrometheusMiddleware:
+
+    """
+        Testes das métricas das requisições HTTP
+    """
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_metricas_pelo_template_da_rota(app):
+        before = get_requests('GET', '/metrics-test/{guid}', '200')
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            for guid in ('a', 'b', 'c'):
+                assert (await client.get(f"/metrics-test/{guid}")).status_code == 200
+
+        assert get_requests('GET', '/metrics-test/{guid}', '200') - before == 3
+        assert get_latency_count('GET', '/metrics-test/{guid}') >= 3
+        assert get_requests('GET', '/metrics-test/a', '200') == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_rotas_inexistentes_agrupadas(app):
+        before = get_requests('GET', UNMATCHED_ROUTE, '404')
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/inexistente/1")
+            await client.get("/inexistente/2")
+
+        assert get_requests('GET', UNMATCHED_ROUTE, '404') - before == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_excecao_contada_como_erro(app):
+        before = get_requests('GET', '/metrics-test-error', '500')
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            with pytest.raises(RuntimeError):
+                await client.get("/metrics-test-error")
+
+        assert get_requests('GET', '/metrics-test-error', '500') - before == 1
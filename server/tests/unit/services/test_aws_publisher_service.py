@@ -0,0 +1,58 @@
+import pytest
+from botocore.stub import Stubber
+from server.dependencies.get_sns_publisher_service import build_sns_client
+from server.services.aws_publisher_service import AWSPublisherService
+
+
+"""
+    Fixtures
+"""
+
+
+TOPIC_ARN = 'arn:aws:sns:us-east-1:000000000000:user-created'
+
+
+@pytest.fixture
+def sns_client():
+    """
+        Client boto3 real, apontado para um SNS local. As respostas
+        são simuladas pelo Stubber, sem acesso à rede
+    """
+    return build_sns_client('test', 'test', 'us-east-1', 'http://localhost:4566')
+
+
+class TestAWSPublisherService:
+
+    """
+        Testes do publicador de mensagens SNS
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize("target_arn, fifo", [
+        (TOPIC_ARN, False),
+        (TOPIC_ARN + '.fifo', True),
+    ])
+    def test_publish_batch(sns_client, target_arn, fifo):
+        service = AWSPublisherService(sns_client)
+
+        expected_entries = [dict(Id='1', Message='{"a": 1}'), dict(Id='2', Message='{"b": 2}')]
+        if fifo:
+            expected_entries[0].update(MessageGroupId='g1', MessageDeduplicationId='1')
+            expected_entries[1].update(MessageGroupId='g2', MessageDeduplicationId='2')
+
+        with Stubber(sns_client) as stubber:
+            stubber.add_response(
+                'publish_batch',
+                {
+                    'Successful': [{'Id': '1', 'MessageId': 'm1'}],
+                    'Failed': [{'Id': '2', 'Code': 'InternalError', 'SenderFault': False, 'Message': 'erro'}]
+                },
+                {'TopicArn': target_arn, 'PublishBatchRequestEntries': expected_entries}
+            )
+            successful, failed = service.publish_batch(
+                [('1', '{"a": 1}', 'g1'), ('2', '{"b": 2}', 'g2')],
+                target_arn
+            )
+
+        assert successful == ['1']
+        assert failed == {'2': 'erro'}
@@ -17,32 +17,31 @@ class TestEmailService:
         (["a@dac.unicamp.br", "b@dac.unicamp.br"], "", ""),
         (["a@dac.unicamp.br"], "Subject", "HTML")
     ])
-    def test_send_email(recipients: List[EmailStr], subject, rendered_html):
+    @pytest.mark.asyncio
+    async def test_send_email(recipients: List[EmailStr], subject, rendered_html):
 
         """
-            Teste da função principal do serviço de envio de email
+            Teste da função principal do serviço de envio de email.
+            O e-mail deve ser gravado na fila, sem envio na requisição
         """
 
-        email_api_mock = Mock()
-        email_api_mock.send_message = Mock(
-            return_value=None
-        )
-
-        background_tasks_mock = Mock()
-        background_tasks_mock.add_task = Mock(
+        email_fila_repo_mock = Mock()
+        email_fila_repo_mock.insere_email = AsyncMock(
             return_value=None
         )
 
         email_service = EmailService(
-            email_api=email_api_mock,
-            background_tasks=background_tasks_mock
+            email_fila_repo=email_fila_repo_mock
         )
 
-        email_service.send_email_background(
+        await email_service.send_email_background(
             recipients,
             subject,
             rendered_html
         )
 
-        background_tasks_mock.add_task.assert_called()
-
+        email_fila_repo_mock.insere_email.assert_awaited_once_with(dict(
+            destinatarios=recipients,
+            assunto=subject,
+            html=rendered_html
+        ))
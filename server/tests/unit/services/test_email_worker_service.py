@@ -0,0 +1,106 @@
+import aiosmtplib
+import pytest
+from mock import Mock, AsyncMock
+from server.services.email_worker_service import EmailWorkerService
+
+
+"""
+    Fixtures
+"""
+
+
+def build_email(id_email: int, tentativas: int = 0):
+    return Mock(
+        id=id_email,
+        destinatarios=[f"teste{id_email}@unicamp.br"],
+        assunto="Verificação de Email",
+        html="HTML",
+        tentativas=tentativas
+    )
+
+
+def build_email_fila_repo_mock(emails):
+    email_fila_repo = Mock()
+    email_fila_repo.find_emails_pendentes = AsyncMock(return_value=emails)
+    email_fila_repo.marca_emails_enviados = AsyncMock(return_value=None)
+    email_fila_repo.agenda_nova_tentativa = AsyncMock(return_value=None)
+    email_fila_repo.marca_falha_definitiva = AsyncMock(return_value=None)
+    return email_fila_repo
+
+
+class TestEmailWorkerService:
+
+    """
+        Testes do envio dos e-mails da fila
+    """
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch():
+        emails = [build_email(i) for i in range(1, 6)]
+        email_fila_repo = build_email_fila_repo_mock(emails)
+        email_api = Mock()
+        email_api.send_message = AsyncMock(return_value=None)
+
+        worker = EmailWorkerService(Mock(), email_api, batch_size=50)
+        assert await worker.dispatch(email_fila_repo) == 5
+
+        email_fila_repo.find_emails_pendentes.assert_awaited_once_with(50)
+        assert email_api.send_message.await_count == 5
+        sent_recipients = [call.args[0].recipients for call in email_api.send_message.await_args_list]
+        assert sent_recipients == [email.destinatarios for email in emails]
+        email_fila_repo.marca_emails_enviados.assert_awaited_once_with([1, 2, 3, 4, 5])
+        email_fila_repo.agenda_nova_tentativa.assert_not_awaited()
+        assert worker.sent == 5
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch_reagenda_falhas():
+        emails = [build_email(1), build_email(2, tentativas=2)]
+        email_fila_repo = build_email_fila_repo_mock(emails)
+
+        async def send_message(message):
+            if message.recipients == emails[1].destinatarios:
+                raise ConnectionError('conexão recusada')
+
+        email_api = Mock()
+        email_api.send_message = AsyncMock(side_effect=send_message)
+
+        worker = EmailWorkerService(Mock(), email_api)
+        await worker.dispatch(email_fila_repo)
+
+        email_fila_repo.marca_emails_enviados.assert_awaited_once_with([1])
+        id_email, _, erro = email_fila_repo.agenda_nova_tentativa.await_args.args
+        assert id_email == 2
+        assert 'conexão recusada' in erro
+        assert worker.failed == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch_falha_definitiva_apos_max_tentativas():
+        emails = [build_email(1, tentativas=3), build_email(2, tentativas=4)]
+        email_fila_repo = build_email_fila_repo_mock(emails)
+        email_api = Mock()
+        email_api.send_message = AsyncMock(side_effect=ConnectionError('conexão recusada'))
+
+        worker = EmailWorkerService(Mock(), email_api, max_attempts=5)
+        await worker.dispatch(email_fila_repo)
+
+        assert email_fila_repo.agenda_nova_tentativa.await_args.args[0] == 1
+        id_email, erro = email_fila_repo.marca_falha_definitiva.await_args.args
+        assert id_email == 2
+        assert 'conexão recusada' in erro
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch_erro_permanente_smtp():
+        emails = [build_email(1)]
+        email_fila_repo = build_email_fila_repo_mock(emails)
+        email_api = Mock()
+        email_api.send_message = AsyncMock(side_effect=aiosmtplib.SMTPDataError(550, 'mailbox unavailable'))
+
+        worker = EmailWorkerService(Mock(), email_api)
+        await worker.dispatch(email_fila_repo)
+
+        email_fila_repo.agenda_nova_tentativa.assert_not_awaited()
+        email_fila_repo.marca_falha_definitiva.assert_awaited_once()
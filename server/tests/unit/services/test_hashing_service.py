@@ -0,0 +1,134 @@
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from mock import patch
+from server.services.hashing_service import HashingService
+from server.configuration import hashing_executor
+from server.configuration.hashing_executor import build_hashing_executor
+from server.calibra_bcrypt import escolhe_rounds
+
+
+class TestHashingService:
+
+    """
+        Testes do serviço de hashing de senhas executado fora do event loop
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize("executor_type, expected_executor_class", [
+        ("process", ProcessPoolExecutor),
+        ("thread", ThreadPoolExecutor),
+        ("desconhecido", ThreadPoolExecutor),
+    ])
+    def test_build_hashing_executor(executor_type, expected_executor_class):
+        executor = build_hashing_executor(executor_type, 1)
+        try:
+            assert isinstance(executor, expected_executor_class)
+        finally:
+            executor.shutdown()
+
+    @staticmethod
+    @pytest.mark.parametrize("executor_type", ["process", "thread"])
+    @pytest.mark.parametrize("pwd, pwd_to_compare, expected", [
+        ("senha", "senha", True),
+        ("senha", "senha123", False),
+    ])
+    @pytest.mark.asyncio
+    async def test_criptografa_verifica_senha_executor(executor_type, pwd, pwd_to_compare, expected):
+        executor = build_hashing_executor(executor_type, 1)
+        try:
+            service = HashingService(executor)
+            senha_criptografada = await service.criptografa_senha(pwd)
+            assert await service.verifica_senha(pwd_to_compare, senha_criptografada) is expected
+        finally:
+            executor.shutdown()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_criptografa_verifica_senha_executor_padrao():
+        service = HashingService()
+        senha_criptografada = await service.criptografa_senha("senha")
+        assert await service.verifica_senha("senha", senha_criptografada) is True
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_custo_criptografa_senha():
+        service = HashingService(rounds=5)
+        senha_criptografada = await service.criptografa_senha("senha")
+        assert senha_criptografada.split('$')[2] == '05'
+
+    @staticmethod
+    @pytest.mark.parametrize("hash_rounds, service_rounds, expected_update", [
+        (5, 5, False),
+        (5, 6, True),
+        (6, 5, True),
+    ])
+    @pytest.mark.asyncio
+    async def test_verifica_e_atualiza_senha(hash_rounds, service_rounds, expected_update):
+        senha_criptografada = await HashingService(rounds=hash_rounds).criptografa_senha("senha")
+        service = HashingService(rounds=service_rounds)
+
+        valid, new_hash = await service.verifica_e_atualiza_senha("senha", senha_criptografada)
+
+        assert valid is True
+        assert (new_hash is not None) is expected_update
+        if expected_update:
+            assert new_hash.split('$')[2] == f'{service_rounds:02d}'
+            assert await service.verifica_senha("senha", new_hash) is True
+
+        # Senhas inválidas nunca geram um novo hash
+        assert await service.verifica_e_atualiza_senha("errada", senha_criptografada) == (False, None)
+
+    @staticmethod
+    @pytest.mark.parametrize("target, min_rounds, expected", [
+        (0.25, 10, 11),
+        (0.30, 10, 12),
+        (0.01, 10, 10),
+        (1.10, 13, 14),
+    ])
+    def test_escolhe_rounds(target, min_rounds, expected):
+        # 64 ms no custo 10, dobrando a cada round
+        assert escolhe_rounds(target, min_rounds, lambda rounds: 0.064 * 2 ** (rounds - 10)) == expected
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_pool_de_processos_quebrado_recriado():
+        broken_executor = ProcessPoolExecutor(max_workers=1)
+        with pytest.raises(BrokenProcessPool):
+            # Simula um worker encerrado pelo sistema (ex.: OOM)
+            broken_executor.submit(os._exit, 1).result()
+
+        new_executor = ThreadPoolExecutor(max_workers=1)
+        recriados = []
+
+        def recria_executor(executor):
+            recriados.append(executor)
+            return new_executor
+
+        try:
+            service = HashingService(broken_executor, rounds=4, recria_executor=recria_executor)
+            senha_criptografada = await service.criptografa_senha("senha")
+            assert await service.verifica_senha("senha", senha_criptografada) is True
+            assert recriados == [broken_executor]
+            assert service.executor is new_executor
+        finally:
+            broken_executor.shutdown()
+            new_executor.shutdown()
+
+    @staticmethod
+    def test_recria_hashing_executor_uma_unica_vez():
+        executors = [ThreadPoolExecutor(max_workers=1), ThreadPoolExecutor(max_workers=1)]
+        with patch.object(hashing_executor, 'build_hashing_executor', side_effect=executors), \
+                patch.object(hashing_executor, 'get_environment_cached'):
+            hashing_executor.create_hashing_executor_cached.cache_clear()
+            try:
+                broken_executor = hashing_executor.create_hashing_executor_cached()
+
+                # Duas requisições encontram o mesmo executor quebrado
+                first = hashing_executor.recria_hashing_executor(broken_executor)
+                second = hashing_executor.recria_hashing_executor(broken_executor)
+
+                assert first is second is executors[1]
+            finally:
+                hashing_executor.shutdown_hashing_executor()
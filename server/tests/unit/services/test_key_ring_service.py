@@ -0,0 +1,130 @@
+import uuid
+import pytest
+import rsa
+from datetime import timedelta
+from jose import jwt, jwk, JWTError
+from server.services.key_ring_service import KeyRingService
+from server.services.usuario_service import UsuarioService
+
+
+"""
+    Fixtures
+"""
+
+
+def gera_chave_privada_rsa() -> str:
+    _, private_key = rsa.newkeys(1024)
+    return private_key.save_pkcs1().decode('utf-8')
+
+
+@pytest.fixture(scope='module')
+def private_keys():
+    return {
+        'k1': gera_chave_privada_rsa(),
+        'k2': gera_chave_privada_rsa()
+    }
+
+
+@pytest.fixture
+def data_to_encode():
+    return {
+        "username": "user",
+        "email": "teste@unicamp.br",
+        "guid": uuid.uuid4().__str__(),
+        "roles": [1],
+        "name": "Teste"
+    }
+
+
+class TestKeyRingService:
+
+    """
+        Testes do chaveiro dos tokens de acesso
+    """
+
+    @staticmethod
+    def gera_token(key_ring: KeyRingService, data_to_encode: dict) -> str:
+        signing_key, headers = key_ring.get_signing_key()
+        return UsuarioService.gera_token(
+            dict(data_to_encode),
+            timedelta(seconds=60),
+            signing_key,
+            key_ring.algorithm,
+            headers=headers
+        )
+
+    @staticmethod
+    def test_hmac(data_to_encode):
+        key_ring = KeyRingService('HS256', 'secret')
+        token = TestKeyRingService.gera_token(key_ring, data_to_encode)
+
+        assert not key_ring.is_asymmetric
+        assert 'kid' not in jwt.get_unverified_header(token)
+        assert data_to_encode.items() <= key_ring.decode(token).items()
+        assert key_ring.get_jwks() == {'keys': []}
+
+    @staticmethod
+    @pytest.mark.parametrize("active_kid", ['k1', 'k2'])
+    def test_rs256_assina_com_chave_ativa(private_keys, data_to_encode, active_kid):
+        key_ring = KeyRingService('RS256', private_keys=private_keys, active_kid=active_kid)
+        token = TestKeyRingService.gera_token(key_ring, data_to_encode)
+
+        assert jwt.get_unverified_header(token)['kid'] == active_kid
+        assert data_to_encode.items() <= key_ring.decode(token).items()
+
+    @staticmethod
+    def test_rs256_rotacao_de_chave(private_keys, data_to_encode):
+        """
+            Tokens assinados pela chave anterior continuam válidos enquanto
+            a chave permanecer no chaveiro
+        """
+        key_ring_antigo = KeyRingService('RS256', private_keys=private_keys, active_kid='k1')
+        token = TestKeyRingService.gera_token(key_ring_antigo, data_to_encode)
+
+        key_ring_novo = KeyRingService('RS256', private_keys=private_keys, active_kid='k2')
+        assert data_to_encode.items() <= key_ring_novo.decode(token).items()
+
+        key_ring_sem_chave_antiga = KeyRingService(
+            'RS256', private_keys={'k2': private_keys['k2']}, active_kid='k2'
+        )
+        with pytest.raises(JWTError):
+            key_ring_sem_chave_antiga.decode(token)
+
+    @staticmethod
+    def test_rs256_token_hmac_invalido(private_keys, data_to_encode):
+        key_ring = KeyRingService('RS256', private_keys=private_keys, active_kid='k1')
+        token = TestKeyRingService.gera_token(KeyRingService('HS256', 'secret'), data_to_encode)
+
+        with pytest.raises(JWTError):
+            key_ring.decode(token)
+
+    @staticmethod
+    def test_jwks_verifica_token_localmente(private_keys, data_to_encode):
+        """
+            Outro serviço deve conseguir verificar o token apenas com o JWKS publicado
+        """
+        key_ring = KeyRingService('RS256', private_keys=private_keys, active_kid='k1')
+        token = TestKeyRingService.gera_token(key_ring, data_to_encode)
+
+        jwks = key_ring.get_jwks()
+        assert {key['kid'] for key in jwks['keys']} == {'k1', 'k2'}
+        assert all('d' not in key for key in jwks['keys'])
+
+        kid = jwt.get_unverified_header(token)['kid']
+        public_key = [key for key in jwks['keys'] if key['kid'] == kid][0]
+        decoded_token = jwt.decode(token, jwk.construct(public_key), algorithms=['RS256'])
+        assert data_to_encode.items() <= decoded_token.items()
+
+    @staticmethod
+    def test_jwks_etag_estavel(private_keys):
+        key_ring = KeyRingService('RS256', private_keys=private_keys, active_kid='k1')
+        assert key_ring.get_jwks_response_content() == key_ring.get_jwks_response_content()
+
+    @staticmethod
+    @pytest.mark.parametrize("private_keys_config, active_kid", [
+        ({}, ''),
+        ({'k1': 'chave'}, 'k2'),
+    ])
+    def test_chaveiro_invalido(private_keys_config, active_kid):
+        with pytest.raises(ValueError):
+            KeyRingService('RS256', private_keys=private_keys_config, active_kid=active_kid)
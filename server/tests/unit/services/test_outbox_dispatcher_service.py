@@ -0,0 +1,125 @@
+import uuid
+import pytest
+from datetime import datetime
+from mock import Mock, AsyncMock
+from server.services.background_worker_service import BackgroundWorkerService
+from server.services.outbox_dispatcher_service import OutboxDispatcherService
+
+
+"""
+    Fixtures
+"""
+
+
+def build_evento(id_evento: int, topico_arn: str = 'topico', tentativas: int = 0):
+    return Mock(
+        id=id_evento,
+        guid_usuario=uuid.uuid4(),
+        topico_arn=topico_arn,
+        payload=f'{{"id": {id_evento}}}',
+        tentativas=tentativas
+    )
+
+
+def build_outbox_repo_mock(eventos):
+    outbox_repo = Mock()
+    outbox_repo.find_eventos_pendentes = AsyncMock(return_value=eventos)
+    outbox_repo.marca_eventos_publicados = AsyncMock(return_value=None)
+    outbox_repo.agenda_nova_tentativa = AsyncMock(return_value=None)
+    outbox_repo.marca_falha_definitiva = AsyncMock(return_value=None)
+    return outbox_repo
+
+
+def build_publisher_service_mock(failed_ids=()):
+    def publish_batch(messages, target_arn):
+        successful = [message[0] for message in messages if message[0] not in failed_ids]
+        failed = {message[0]: 'erro' for message in messages if message[0] in failed_ids}
+        return successful, failed
+
+    publisher_service = Mock(executor=None)
+    publisher_service.publish_batch = Mock(side_effect=publish_batch)
+    return publisher_service
+
+
+class TestOutboxDispatcherService:
+
+    """
+        Testes da publicação em segundo plano dos eventos do outbox
+    """
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch_agrupa_em_lotes_por_topico():
+        eventos = [build_evento(i, 'topico_a') for i in range(1, 24)] + [build_evento(24, 'topico_b')]
+        outbox_repo = build_outbox_repo_mock(eventos)
+        publisher_service = build_publisher_service_mock()
+
+        dispatcher = OutboxDispatcherService(Mock(), publisher_service, batch_size=100)
+        assert await dispatcher.dispatch(outbox_repo) == 24
+
+        batch_sizes = [
+            (call.args[1], len(call.args[0])) for call in publisher_service.publish_batch.call_args_list
+        ]
+        assert batch_sizes == [('topico_a', 10), ('topico_a', 10), ('topico_a', 3), ('topico_b', 1)]
+        outbox_repo.find_eventos_pendentes.assert_awaited_once_with(100)
+        outbox_repo.marca_eventos_publicados.assert_awaited_once_with(list(range(1, 25)))
+        outbox_repo.agenda_nova_tentativa.assert_not_awaited()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch_reagenda_falhas_com_backoff():
+        eventos = [build_evento(1), build_evento(2, tentativas=3)]
+        outbox_repo = build_outbox_repo_mock(eventos)
+        publisher_service = build_publisher_service_mock(failed_ids=('2',))
+
+        dispatcher = OutboxDispatcherService(Mock(), publisher_service, max_backoff=300)
+        antes = datetime.now()
+        await dispatcher.dispatch(outbox_repo)
+
+        outbox_repo.marca_eventos_publicados.assert_awaited_once_with([1])
+        id_evento, proxima_tentativa_em, erro = outbox_repo.agenda_nova_tentativa.await_args.args
+        assert id_evento == 2
+        assert erro == 'erro'
+        assert (proxima_tentativa_em - antes).total_seconds() >= 8
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch_erro_na_chamada_reagenda_lote():
+        eventos = [build_evento(1), build_evento(2)]
+        outbox_repo = build_outbox_repo_mock(eventos)
+        publisher_service = Mock(executor=None)
+        publisher_service.publish_batch = Mock(side_effect=Exception('timeout'))
+
+        dispatcher = OutboxDispatcherService(Mock(), publisher_service)
+        await dispatcher.dispatch(outbox_repo)
+
+        outbox_repo.marca_eventos_publicados.assert_not_awaited()
+        assert outbox_repo.agenda_nova_tentativa.await_count == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dispatch_falha_definitiva_apos_max_tentativas():
+        eventos = [build_evento(1, tentativas=8), build_evento(2, tentativas=9)]
+        outbox_repo = build_outbox_repo_mock(eventos)
+        publisher_service = build_publisher_service_mock(failed_ids=('1', '2'))
+
+        dispatcher = OutboxDispatcherService(Mock(), publisher_service, max_attempts=10)
+        await dispatcher.dispatch(outbox_repo)
+
+        assert outbox_repo.agenda_nova_tentativa.await_args.args[0] == 1
+        outbox_repo.marca_falha_definitiva.assert_awaited_once_with(2, 'erro')
+
+    @staticmethod
+    def test_background_worker_abstrato():
+        with pytest.raises(TypeError):
+            BackgroundWorkerService(10, 1.0)
+
+    @staticmethod
+    @pytest.mark.parametrize("tentativas, expected_seconds", [
+        (0, 1),
+        (3, 8),
+        (20, 300),
+    ])
+    def test_get_backoff(tentativas, expected_seconds):
+        dispatcher = OutboxDispatcherService(Mock(), Mock(), max_backoff=300)
+        assert dispatcher.get_backoff(tentativas).total_seconds() == expected_seconds
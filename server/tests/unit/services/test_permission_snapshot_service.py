@@ -0,0 +1,80 @@
+import pytest
+from mock import Mock, AsyncMock
+from server.services.permission_snapshot_service import PermissionSnapshotService
+
+
+"""
+    Fixtures
+"""
+
+
+@pytest.fixture
+def permission_repo_mock():
+    """
+        (F1 -> P1, P2, P3)
+        (F2 -> P4)
+        (F3 -> )
+    """
+    permission_repo = Mock()
+    permission_repo.find_all_role_permissions = AsyncMock(
+        return_value=[(1, 'P1'), (1, 'P2'), (1, 'P3'), (2, 'P4')]
+    )
+    return permission_repo
+
+
+class TestPermissionSnapshotService:
+
+    """
+        Testes do snapshot em memória de funções -> permissões
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize("roles, expected_permissions", [
+        ([1], {'P1', 'P2', 'P3'}),
+        ([1, 2], {'P1', 'P2', 'P3', 'P4'}),
+        ([2, 3], {'P4'}),
+        ([3], set()),
+        ([], set()),
+    ])
+    @pytest.mark.asyncio
+    async def test_get_permissions(permission_repo_mock, roles, expected_permissions):
+        snapshot = PermissionSnapshotService()
+        assert await snapshot.get_permissions(roles, permission_repo_mock, 300) == expected_permissions
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_permissions_snapshot_carregado_uma_vez(permission_repo_mock):
+        snapshot = PermissionSnapshotService()
+
+        for _ in range(5):
+            await snapshot.get_permissions([1], permission_repo_mock, 300)
+
+        permission_repo_mock.find_all_role_permissions.assert_awaited_once()
+        stats = snapshot.get_stats()
+        assert stats['version'] == 1
+        assert stats['roles'] == 2
+        assert stats['misses'] == 1
+        assert stats['hits'] == 4
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_permissions_snapshot_expirado(permission_repo_mock):
+        snapshot = PermissionSnapshotService()
+
+        await snapshot.get_permissions([1], permission_repo_mock, -1)
+        await snapshot.get_permissions([1], permission_repo_mock, -1)
+
+        assert permission_repo_mock.find_all_role_permissions.await_count == 2
+        assert snapshot.get_stats()['misses'] == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_invalidate(permission_repo_mock):
+        snapshot = PermissionSnapshotService()
+
+        await snapshot.get_permissions([1], permission_repo_mock, 300)
+        snapshot.invalidate()
+        await snapshot.get_permissions([1], permission_repo_mock, 300)
+
+        assert permission_repo_mock.find_all_role_permissions.await_count == 2
+        assert snapshot.get_stats()['version'] == 2
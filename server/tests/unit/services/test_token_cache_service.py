@@ -0,0 +1,80 @@
+import time
+import pytest
+from server.services.token_cache_service import TokenCacheService
+from server.schemas.usuario_schema import CurrentUserToken
+
+
+"""
+    Fixtures
+"""
+
+
+@pytest.fixture
+def current_user():
+    return CurrentUserToken(
+        name='Teste',
+        username='user',
+        guid='78628c23-aae3-4d58-84a9-0c8d7ea63672',
+        email='teste@unicamp.br',
+        roles=[1]
+    )
+
+
+class TestTokenCacheService:
+
+    """
+        Testes do cache de tokens de acesso verificados
+    """
+
+    @staticmethod
+    def test_get_put(current_user):
+        token_cache = TokenCacheService(10)
+
+        assert token_cache.get('token') is None
+        token_cache.put('token', current_user, time.time() + 60)
+        assert token_cache.get('token') is current_user
+
+        stats = token_cache.get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['size'] == 1
+
+    @staticmethod
+    def test_entrada_expirada(current_user):
+        token_cache = TokenCacheService(10)
+
+        token_cache.put('token', current_user, time.time() - 1)
+
+        assert token_cache.get('token') is None
+        assert token_cache.get_stats()['size'] == 0
+
+    @staticmethod
+    def test_token_sem_expiracao_nao_armazenado(current_user):
+        token_cache = TokenCacheService(10)
+
+        token_cache.put('token', current_user, None)
+
+        assert token_cache.get('token') is None
+
+    @staticmethod
+    def test_limite_lru(current_user):
+        token_cache = TokenCacheService(2)
+        exp = time.time() + 60
+
+        token_cache.put('t1', current_user, exp)
+        token_cache.put('t2', current_user, exp)
+        token_cache.get('t1')
+        token_cache.put('t3', current_user, exp)
+
+        # t2 é a entrada menos recentemente utilizada
+        assert token_cache.get('t2') is None
+        assert token_cache.get('t1') is current_user
+        assert token_cache.get('t3') is current_user
+        assert token_cache.get_stats()['size'] == 2
+
+    @staticmethod
+    def test_cache_desabilitado(current_user):
+        token_cache = TokenCacheService(0)
+
+        token_cache.put('token', current_user, time.time() + 60)
+
+        assert token_cache.get('token') is None
+        assert token_cache.get_stats()['size'] == 0
@@ -0,0 +1,194 @@
+import asyncio
+import uuid
+import aioredis
+import pytest
+from datetime import datetime
+from fakeredis.aioredis import FakeRedis
+from mock import AsyncMock, Mock
+from server.schemas.usuario_schema import UsuarioOutput
+from server.services.user_cache_service import UserCacheService
+
+
+"""
+    Fixtures
+"""
+
+
+GUID = str(uuid.uuid4())
+
+
+def build_user() -> UsuarioOutput:
+    return UsuarioOutput(
+        guid=GUID,
+        nome='Teste',
+        username='teste',
+        email='teste@unicamp.br',
+        email_verificado=False,
+        created_at=datetime(2021, 10, 1),
+        updated_at=datetime(2021, 10, 1)
+    )
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+class TestUserCacheService:
+
+    """
+        Testes do cache de usuários em dois níveis
+    """
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_usuario_carregado_uma_unica_vez(redis):
+        loader = AsyncMock(return_value=build_user())
+        user_cache = UserCacheService(redis)
+
+        first = await user_cache.get_or_load(GUID, loader)
+        second = await user_cache.get_or_load(GUID, loader)
+
+        assert first == second == build_user()
+        loader.assert_awaited_once()
+        assert user_cache.get_stats() == {'l1_size': 1, 'l1_hits': 1, 'l2_hits': 0, 'misses': 1, 'errors': 0}
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_redis_compartilhado_entre_processos(redis):
+        await UserCacheService(redis).get_or_load(GUID, AsyncMock(return_value=build_user()))
+
+        # Outro processo, com o L1 vazio, encontra o usuário no Redis
+        loader = AsyncMock()
+        other_cache = UserCacheService(redis)
+        assert await other_cache.get_or_load(GUID, loader) == build_user()
+        loader.assert_not_awaited()
+        assert other_cache.l2_hits == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_buscas_simultaneas_aguardam_uma_unica_carga(redis):
+        async def slow_loader():
+            await asyncio.sleep(0.05)
+            return build_user()
+
+        loader = AsyncMock(side_effect=slow_loader)
+        user_cache = UserCacheService(redis)
+
+        users = await asyncio.gather(*(user_cache.get_or_load(GUID, loader) for _ in range(20)))
+
+        assert all(user == build_user() for user in users)
+        loader.assert_awaited_once()
+        assert user_cache.loading == {}
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_invalidacao_remove_os_dois_niveis(redis):
+        loader = AsyncMock(return_value=build_user())
+        user_cache = UserCacheService(redis)
+        await user_cache.get_or_load(GUID, loader)
+
+        await user_cache.invalida(GUID)
+
+        assert GUID not in user_cache.l1
+        assert await redis.get(user_cache.get_key(GUID)) is None
+        await user_cache.get_or_load(GUID, loader)
+        assert loader.await_count == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_carga_durante_invalidacao_nao_gravada(redis):
+        invalidacao_concluida = asyncio.Event()
+        carga_iniciada = asyncio.Event()
+
+        async def stale_loader():
+            # Lê o usuário antes da alteração e só conclui a carga após a invalidação
+            carga_iniciada.set()
+            await invalidacao_concluida.wait()
+            return build_user()
+
+        user_cache = UserCacheService(redis)
+        carga = asyncio.ensure_future(user_cache.get_or_load(GUID, stale_loader))
+        await carga_iniciada.wait()
+        await user_cache.invalida(GUID)
+        invalidacao_concluida.set()
+
+        assert await carga == build_user()
+        assert GUID not in user_cache.l1
+        assert await redis.get(user_cache.get_key(GUID)) is None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_carga_logo_apos_invalidacao_nao_gravada(redis):
+        user_cache = UserCacheService(redis, invalidation_ttl=0.05)
+        await user_cache.invalida(GUID)
+
+        # A réplica de leitura ainda pode retornar o usuário anterior à alteração
+        loader = AsyncMock(return_value=build_user())
+        other_cache = UserCacheService(redis, invalidation_ttl=0.05)
+        assert await other_cache.get_or_load(GUID, loader) == build_user()
+        assert GUID not in other_cache.l1
+        assert await redis.get(other_cache.get_key(GUID)) is None
+
+        await asyncio.sleep(0.1)
+        await other_cache.get_or_load(GUID, loader)
+        assert await redis.get(other_cache.get_key(GUID)) is not None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_usuario_inexistente_nao_gravado(redis):
+        loader = AsyncMock(return_value=None)
+        user_cache = UserCacheService(redis)
+
+        assert await user_cache.get_or_load(GUID, loader) is None
+        assert await user_cache.get_or_load(GUID, loader) is None
+        assert loader.await_count == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_lock_liberado_apos_a_carga(redis):
+        user_cache = UserCacheService(redis)
+
+        await user_cache.get_or_load(GUID, AsyncMock(return_value=build_user()))
+
+        assert await redis.get(user_cache.get_lock_key(GUID)) is None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_lock_de_outro_processo_nao_liberado(redis):
+        user_cache = UserCacheService(redis)
+        assert await user_cache.acquire_lock(GUID, 'expirado')
+
+        # O lock expirou e foi obtido por outro processo antes da liberação
+        await redis.set(user_cache.get_lock_key(GUID), 'outro')
+        await user_cache.release_lock(GUID, 'expirado')
+
+        assert await redis.get(user_cache.get_lock_key(GUID)) == b'outro'
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_falha_do_redis_busca_no_banco():
+        redis = Mock()
+        redis.get = AsyncMock(side_effect=aioredis.ConnectionError())
+        redis.set = AsyncMock(side_effect=aioredis.ConnectionError())
+        redis.exists = AsyncMock(side_effect=aioredis.ConnectionError())
+        loader = AsyncMock(return_value=build_user())
+        user_cache = UserCacheService(redis, lock_wait=10)
+
+        # Sem o lock do Redis, a carga é feita sem aguardar lock_wait
+        user = await asyncio.wait_for(user_cache.get_or_load(GUID, loader), timeout=1)
+
+        assert user == build_user()
+        loader.assert_awaited_once()
+        assert user_cache.errors == 3
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_sem_redis_apenas_l1():
+        loader = AsyncMock(return_value=build_user())
+        user_cache = UserCacheService(None)
+
+        await user_cache.get_or_load(GUID, loader)
+        await user_cache.get_or_load(GUID, loader)
+
+        loader.assert_awaited_once()
@@ -1,14 +1,22 @@
+import asyncio
 import uuid
 import pytest
 import time
+import json
+import zlib
 
 from datetime import datetime, timedelta
 from server.services.usuario_service import UsuarioService
 from jose import jwt, JWTError
-from mock import Mock, AsyncMock
+from mock import Mock, AsyncMock, patch
 from server.configuration import exceptions
 from pydantic import EmailStr
 from server.schemas.usuario_schema import CurrentUserToken
+from server.configuration.db import executa_apos_commit
+from server.services.user_cache_service import UserCacheService
+from server.services.login_throttle_service import LoginThrottleService
+from server.utils.rate_limiter import InMemoryRateLimiter
+from server.services.hashing_service import HashingService
 
 
 """
@@ -338,6 +346,191 @@ class TestUsuarioService:
         with pytest.raises(exceptions.InvalidUsernamePasswordException):
             await service.gera_novo_token_login(form_data_mock)
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_autentica_usuario_atualiza_custo_do_hash(single_user_arr_email_verificado_db):
+
+        """
+            O hash do usuário tem custo 12. Com o custo atual 4, o login é
+            aceito e o hash com o novo custo é gravado ao final do login
+        """
+
+        user = single_user_arr_email_verificado_db[0]
+        old_hash = user.hashed_password
+        form_data_mock = Mock()
+        form_data_mock.username = "user"
+        form_data_mock.password = "pass"
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_by_filtros = AsyncMock(return_value=single_user_arr_email_verificado_db)
+        user_repo_mock.atualiza_hashed_password = AsyncMock(return_value=None)
+
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            environment=Mock(
+                ACCESS_TOKEN_EXPIRE_DELTA_IN_SECONDS=3600,
+                ACCESS_TOKEN_SECRET_KEY="secret",
+                ACCESS_TOKEN_ALGORITHM="HS256",
+                ACCESS_TOKEN_EMBED_PERMISSIONS=False
+            ),
+            hashing_service=HashingService(rounds=4)
+        )
+
+        authenticated_user, new_hashed_password = await service.autentica_usuario("user", "pass")
+        assert authenticated_user is user
+        assert new_hashed_password.split('$')[2] == '04'
+        assert UsuarioService.verifica_senha("pass", new_hashed_password)
+        user_repo_mock.atualiza_hashed_password.assert_not_awaited()
+
+        assert (await service.gera_novo_token_login(form_data_mock))['access_token']
+
+        user_repo_mock.atualiza_hashed_password.assert_awaited_once()
+        id_usuario, hashed_password, new_hashed_password = user_repo_mock.atualiza_hashed_password.await_args.args
+        assert (id_usuario, hashed_password) == (user.id, old_hash)
+        assert new_hashed_password.split('$')[2] == '04'
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_email_nao_verificado_nao_atualiza_custo_do_hash(single_user_arr_email_nao_verificado_db):
+
+        """
+            O login rejeitado pelo e-mail não verificado não grava o novo hash
+        """
+
+        form_data_mock = Mock()
+        form_data_mock.username = "user"
+        form_data_mock.password = "pass"
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_by_filtros = AsyncMock(return_value=single_user_arr_email_nao_verificado_db)
+        user_repo_mock.atualiza_hashed_password = AsyncMock(return_value=None)
+
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            hashing_service=HashingService(rounds=4)
+        )
+
+        with pytest.raises(exceptions.EmailNotConfirmedException):
+            await service.gera_novo_token_login(form_data_mock)
+
+        user_repo_mock.atualiza_hashed_password.assert_not_awaited()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_gera_novo_token_login_limite_de_tentativas(empty_arr):
+
+        """
+            Acima do limite de falhas do username, o login é rejeitado
+            sem consultar o banco de dados. As tentativas rejeitadas não
+            são contadas como falhas
+        """
+
+        form_data_mock = Mock()
+        form_data_mock.username = "user"
+        form_data_mock.password = "pass"
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_by_filtros = AsyncMock(return_value=empty_arr)
+
+        login_throttle = LoginThrottleService(
+            InMemoryRateLimiter(window=60),
+            max_attempts_per_username=2,
+            max_attempts_per_ip=0
+        )
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            login_throttle=login_throttle
+        )
+
+        for _ in range(2):
+            with pytest.raises(exceptions.InvalidUsernamePasswordException):
+                await service.gera_novo_token_login(form_data_mock, '10.0.0.1')
+
+        form_data_mock.username = "USER"
+        with pytest.raises(exceptions.TooManyLoginAttemptsException) as ex:
+            await service.gera_novo_token_login(form_data_mock, '10.0.0.1')
+
+        assert ex.value.status_code == 429
+        assert int(ex.value.headers['Retry-After']) >= 1
+        assert user_repo_mock.find_usuarios_by_filtros.await_count == 2
+        assert login_throttle.get_stats() == {'rejected': 1, 'errors': 0}
+        assert login_throttle.limiter.counters['username:user'][2] == 2
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_gera_novo_token_login_sucesso_nao_conta_no_limite(single_user_arr_email_verificado_db):
+
+        """
+            Logins bem-sucedidos não contam no limite do username
+        """
+
+        form_data_mock = Mock()
+        form_data_mock.username = "user"
+        form_data_mock.password = "pass"
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_by_filtros = AsyncMock(return_value=single_user_arr_email_verificado_db)
+
+        login_throttle = LoginThrottleService(
+            InMemoryRateLimiter(window=60),
+            max_attempts_per_username=2,
+            max_attempts_per_ip=0
+        )
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            environment=Mock(
+                ACCESS_TOKEN_EXPIRE_DELTA_IN_SECONDS=3600,
+                ACCESS_TOKEN_SECRET_KEY="secret",
+                ACCESS_TOKEN_ALGORITHM="HS256",
+                ACCESS_TOKEN_EMBED_PERMISSIONS=False
+            ),
+            login_throttle=login_throttle
+        )
+
+        for _ in range(3):
+            assert (await service.gera_novo_token_login(form_data_mock, '10.0.0.1'))['access_token']
+
+        assert login_throttle.limiter.counters['username:user'][2] == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_gera_novo_token_login_tentativas_simultaneas(single_user_arr_email_verificado_db):
+
+        """
+            Tentativas simultâneas do mesmo username, que ainda não falharam,
+            são contadas no limite: apenas max_attempts_per_username senhas
+            são verificadas
+        """
+
+        form_data_mock = Mock()
+        form_data_mock.username = "user"
+        form_data_mock.password = "wrong_pass"
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_by_filtros = AsyncMock(return_value=single_user_arr_email_verificado_db)
+
+        login_throttle = LoginThrottleService(
+            InMemoryRateLimiter(window=60),
+            max_attempts_per_username=2,
+            max_attempts_per_ip=0
+        )
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            login_throttle=login_throttle
+        )
+
+        results = await asyncio.gather(
+            *[service.gera_novo_token_login(form_data_mock, '10.0.0.1') for _ in range(4)],
+            return_exceptions=True
+        )
+
+        assert sorted(type(result).__name__ for result in results) == [
+            'InvalidUsernamePasswordException', 'InvalidUsernamePasswordException',
+            'TooManyLoginAttemptsException', 'TooManyLoginAttemptsException'
+        ]
+        assert user_repo_mock.find_usuarios_by_filtros.await_count == 2
+        assert login_throttle.limiter.counters['username:user'][2] == 2
+
     @staticmethod
     @pytest.mark.asyncio
     async def test_gera_novo_token_login_invalid_password(single_user_arr_email_verificado_db):
@@ -414,7 +607,8 @@ class TestUsuarioService:
         environment_mock = Mock(
             ACCESS_TOKEN_EXPIRE_DELTA_IN_SECONDS=expires_in,
             ACCESS_TOKEN_SECRET_KEY=secret,
-            ACCESS_TOKEN_ALGORITHM="HS256"
+            ACCESS_TOKEN_ALGORITHM="HS256",
+            ACCESS_TOKEN_EMBED_PERMISSIONS=False
         )
 
         service = UsuarioService(
@@ -439,6 +633,51 @@ class TestUsuarioService:
         assert "iat" in decoded_token and 'exp' in decoded_token
         assert len(decoded_token.keys()) == len(user_keys_to_check_in_access_token) + 2
 
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_gera_novo_token_login_permissoes_embutidas(
+            single_user_arr_email_verificado_db, user_keys_to_check_in_access_token):
+        """
+            No modo de permissões embutidas, as permissões das funções do usuário
+            são resolvidas no login e assinadas no token na claim 'perms'
+        """
+
+        form_data_mock = Mock()
+        form_data_mock.username = "user"
+        form_data_mock.password = "pass"
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_by_filtros = AsyncMock(return_value=single_user_arr_email_verificado_db)
+
+        permission_snapshot_mock = Mock()
+        permission_snapshot_mock.get_permissions = AsyncMock(return_value={'P2', 'P1'})
+
+        environment_mock = Mock(
+            ACCESS_TOKEN_EXPIRE_DELTA_IN_SECONDS=3600,
+            ACCESS_TOKEN_SECRET_KEY="secret",
+            ACCESS_TOKEN_ALGORITHM="HS256",
+            ACCESS_TOKEN_EMBED_PERMISSIONS=True,
+            PERMISSION_SNAPSHOT_TTL_IN_SECONDS=300
+        )
+
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            environment=environment_mock,
+            permission_snapshot=permission_snapshot_mock
+        )
+
+        response_json = await service.gera_novo_token_login(form_data_mock)
+
+        decoded_token = jwt.decode(
+            response_json['access_token'],
+            "secret",
+            algorithms=['HS256']
+        )
+
+        permission_snapshot_mock.get_permissions.assert_awaited_once()
+        assert decoded_token['perms'] == ['P1', 'P2']
+        assert len(decoded_token.keys()) == len(user_keys_to_check_in_access_token) + 3
+
     @staticmethod
     @pytest.mark.parametrize("email", [
         "s@hotmail.com",
@@ -470,14 +709,23 @@ class TestUsuarioService:
         usuario_input_mock.username = single_user_arr_email_nao_verificado_db[0].username
         usuario_input_mock.nome = nome
         usuario_input_mock.password = password
+        usuario_input_mock.convert_to_dict = Mock(
+            return_value=dict(
+                username=usuario_input_mock.username,
+                password=password,
+                nome=nome,
+                email=email
+            )
+        )
 
         user_repo_mock = Mock()
-        user_repo_mock.find_usuarios_by_filtros = AsyncMock(
+        user_repo_mock.insere_usuario_se_nao_existe = AsyncMock(return_value=None)
+        user_repo_mock.find_conflitos_usuario = AsyncMock(
             return_value=single_user_arr_email_nao_verificado_db
         )
 
-        publisher_service_mock = Mock()
-        publisher_service_mock.publish = Mock(return_value=None)
+        outbox_repo_mock = Mock()
+        outbox_repo_mock.insere_evento = AsyncMock(return_value=None)
 
         environment_mock = Mock(
             USER_CREATED_TOPIC_ARN="def"
@@ -485,13 +733,16 @@ class TestUsuarioService:
 
         service = UsuarioService(
             user_repo=user_repo_mock,
-            publisher_service=publisher_service_mock,
+            outbox_repo=outbox_repo_mock,
             environment=environment_mock
         )
 
         with pytest.raises(exceptions.UsernameConflictException):
             await service.cria_novo_usuario(usuario_input_mock)
 
+        # O conflito é identificado antes do hashing da senha e do INSERT
+        user_repo_mock.insere_usuario_se_nao_existe.assert_not_awaited()
+
     @staticmethod
     @pytest.mark.parametrize("username, nome, password", [
         ("userdiff", "Teste", "pass")
@@ -504,12 +755,21 @@ class TestUsuarioService:
         usuario_input_mock.username = username
         usuario_input_mock.nome = nome
         usuario_input_mock.password = password
+        usuario_input_mock.convert_to_dict = Mock(
+            return_value=dict(
+                username=username,
+                password=password,
+                nome=nome,
+                email=usuario_input_mock.email
+            )
+        )
 
-        publisher_service_mock = Mock()
-        publisher_service_mock.publish = Mock(return_value=None)
+        outbox_repo_mock = Mock()
+        outbox_repo_mock.insere_evento = AsyncMock(return_value=None)
 
         user_repo_mock = Mock()
-        user_repo_mock.find_usuarios_by_filtros = AsyncMock(
+        user_repo_mock.insere_usuario_se_nao_existe = AsyncMock(return_value=None)
+        user_repo_mock.find_conflitos_usuario = AsyncMock(
             return_value=single_user_arr_email_nao_verificado_db
         )
 
@@ -520,12 +780,52 @@ class TestUsuarioService:
         service = UsuarioService(
             environment=environment_mock,
             user_repo=user_repo_mock,
-            publisher_service=publisher_service_mock
+            outbox_repo=outbox_repo_mock
         )
 
         with pytest.raises(exceptions.EmailConflictException):
             await service.cria_novo_usuario(usuario_input_mock)
 
+        user_repo_mock.insere_usuario_se_nao_existe.assert_not_awaited()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cria_novo_usuario_conflito_concorrente(single_user_arr_email_nao_verificado_db, empty_arr):
+        """
+            Um cadastro concorrente do mesmo username, feito após a consulta
+            de conflitos, é rejeitado pelo INSERT ... ON CONFLICT
+        """
+        usuario_input_mock = Mock()
+        usuario_input_mock.email = "teste@unicamp.br"
+        usuario_input_mock.username = single_user_arr_email_nao_verificado_db[0].username
+        usuario_input_mock.password = "pass"
+        usuario_input_mock.convert_to_dict = Mock(
+            return_value=dict(
+                username=usuario_input_mock.username,
+                password="pass",
+                nome="Teste",
+                email=usuario_input_mock.email
+            )
+        )
+
+        user_repo_mock = Mock()
+        user_repo_mock.insere_usuario_se_nao_existe = AsyncMock(return_value=None)
+        user_repo_mock.find_conflitos_usuario = AsyncMock(
+            side_effect=[empty_arr, single_user_arr_email_nao_verificado_db]
+        )
+
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            outbox_repo=Mock(),
+            environment=Mock(USER_CREATED_TOPIC_ARN="def")
+        )
+
+        with pytest.raises(exceptions.UsernameConflictException):
+            await service.cria_novo_usuario(usuario_input_mock)
+
+        user_repo_mock.insere_usuario_se_nao_existe.assert_awaited_once()
+        assert user_repo_mock.find_conflitos_usuario.await_count == 2
+
     @staticmethod
     @pytest.mark.parametrize("username, nome, password, email", [
         ("user1", "Teste", "pass", "teste@unicamp.br"),
@@ -550,14 +850,16 @@ class TestUsuarioService:
             )
         )
 
+        user_created_mock = Mock(username=username, email=email)
+
         user_repo_mock = Mock()
-        user_repo_mock.find_usuarios_by_filtros = AsyncMock(
+        user_repo_mock.insere_usuario_se_nao_existe = AsyncMock(return_value=user_created_mock)
+        user_repo_mock.find_conflitos_usuario = AsyncMock(
             return_value=empty_arr
         )
-        user_repo_mock.insere_usuario = AsyncMock(return_value=None)
 
-        publisher_service_mock = Mock()
-        publisher_service_mock.publish = Mock(return_value=None)
+        outbox_repo_mock = Mock()
+        outbox_repo_mock.insere_evento = AsyncMock(return_value=None)
 
         environment_mock = Mock(
             USER_CREATED_TOPIC_ARN="def"
@@ -565,11 +867,25 @@ class TestUsuarioService:
 
         service = UsuarioService(
             user_repo=user_repo_mock,
-            publisher_service=publisher_service_mock,
+            outbox_repo=outbox_repo_mock,
             environment=environment_mock
         )
 
-        await service.cria_novo_usuario(usuario_input_mock)
+        with patch.object(UsuarioService, 'get_user_created_payload', return_value='{}'):
+            assert await service.cria_novo_usuario(usuario_input_mock) == user_created_mock
+
+        # Sem conflitos, uma única consulta antes do INSERT
+
+        user_repo_mock.insere_usuario_se_nao_existe.assert_awaited_once()
+        user_repo_mock.find_conflitos_usuario.assert_awaited_once_with(username, email)
+        inserted_dict = user_repo_mock.insere_usuario_se_nao_existe.await_args[0][0]
+        assert 'password' not in inserted_dict
+        assert UsuarioService.verifica_senha(password, inserted_dict['hashed_password'])
+        outbox_repo_mock.insere_evento.assert_awaited_once_with(dict(
+            guid_usuario=user_created_mock.guid,
+            topico_arn="def",
+            payload='{}'
+        ))
 
     @staticmethod
     @pytest.mark.parametrize("username", [
@@ -628,7 +944,7 @@ class TestUsuarioService:
         )
 
         email_sender_service_mock = Mock()
-        email_sender_service_mock.send_email_background = Mock(return_value=None)
+        email_sender_service_mock.send_email_background = AsyncMock(return_value=None)
 
         service = UsuarioService(
             user_repo=user_repo_mock,
@@ -638,7 +954,7 @@ class TestUsuarioService:
 
         await service.send_email_verification_link(username)
 
-        email_sender_service_mock.send_email_background.assert_called()
+        email_sender_service_mock.send_email_background.assert_awaited()
 
     @staticmethod
     @pytest.mark.asyncio
@@ -720,16 +1036,185 @@ class TestUsuarioService:
 
     @staticmethod
     @pytest.mark.asyncio
-    async def test_get_all_users(single_user_arr_email_nao_verificado_db):
+    async def test_verify_email_invalida_cache_apos_commit(verify_email_token_valid,
+                                                          single_user_arr_email_nao_verificado_db):
+
+        environment_mock = Mock(
+            MAIL_TOKEN_SECRET_KEY="secret",
+            MAIL_TOKEN_ALGORITHM="HS256"
+        )
 
         user_repo_mock = Mock()
+        user_repo_mock.db_session.sync_session.info = {}
         user_repo_mock.find_usuarios_by_filtros = AsyncMock(
             return_value=single_user_arr_email_nao_verificado_db
         )
+        user_repo_mock.verify_email = AsyncMock(
+            return_value=None
+        )
+        user_cache_mock = Mock()
+        user_cache_mock.invalida = AsyncMock()
+
+        service = UsuarioService(
+            environment=environment_mock,
+            user_repo=user_repo_mock,
+            user_cache=user_cache_mock
+        )
+
+        await service.verify_email(None, verify_email_token_valid)
+
+        # A invalidação é apenas agendada: só é feita após o commit
+        user_cache_mock.invalida.assert_not_awaited()
+        assert len(user_repo_mock.db_session.sync_session.info['after_commit_callbacks']) == 1
+        await executa_apos_commit(user_repo_mock.db_session)
+        user_cache_mock.invalida.assert_awaited_once_with(
+            str(single_user_arr_email_nao_verificado_db[0].guid)
+        )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_user_by_guid_com_cache():
+
+        guid = uuid.uuid4()
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuario_by_guid = AsyncMock(
+            return_value=Mock(
+                guid=guid,
+                nome="Teste",
+                username="user",
+                email="teste@unicamp.br",
+                email_verificado=True,
+                created_at=datetime(2021, 10, 1),
+                updated_at=datetime(2021, 10, 1)
+            )
+        )
+
+        service = UsuarioService(
+            user_repo=user_repo_mock,
+            user_cache=UserCacheService(None)
+        )
+
+        first = await service.get_user_by_guid(str(guid).upper())
+        second = await service.get_user_by_guid(str(guid))
+
+        assert first == second
+        assert first.guid == guid
+        user_repo_mock.find_usuario_by_guid.assert_awaited_once_with(str(guid))
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_users_by_guids():
+
+        found_guid, missing_guid = uuid.uuid4(), uuid.uuid4()
+        found_user = Mock(guid=found_guid)
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_by_guids = AsyncMock(
+            return_value=[found_user]
+        )
+
+        service = UsuarioService(
+            user_repo=user_repo_mock
+        )
+
+        result = await service.get_users_by_guids([missing_guid, found_guid, missing_guid])
+
+        # GUIDs repetidos são buscados apenas uma vez
+        user_repo_mock.find_usuarios_by_guids.assert_awaited_once_with([missing_guid, found_guid])
+        assert result == dict(
+            users={str(found_guid): found_user},
+            not_found=[missing_guid]
+        )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_all_users(single_user_arr_email_nao_verificado_db):
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_page = AsyncMock(
+            return_value=single_user_arr_email_nao_verificado_db
+        )
+
+        service = UsuarioService(
+            user_repo=user_repo_mock
+        )
+
+        page = await service.get_all_users(10)
+
+        user_repo_mock.find_usuarios_page.assert_awaited_once_with(11, None)
+        assert page['items'] == single_user_arr_email_nao_verificado_db
+        assert page['next_cursor'] is None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_get_all_users_proxima_pagina():
+
+        created_at = datetime(2021, 9, 25, 14, 48, 9)
+        users = [Mock(id=i, created_at=created_at) for i in range(1, 4)]
+
+        user_repo_mock = Mock()
+        user_repo_mock.find_usuarios_page = AsyncMock(return_value=users)
+
+        service = UsuarioService(
+            user_repo=user_repo_mock
+        )
+
+        page = await service.get_all_users(2)
+
+        assert page['items'] == users[:2]
+        assert UsuarioService.decode_cursor(page['next_cursor']) == (created_at, 2)
+
+        await service.get_all_users(2, page['next_cursor'])
+        user_repo_mock.find_usuarios_page.assert_awaited_with(3, (created_at, 2))
+
+    @staticmethod
+    @pytest.mark.parametrize("cursor", [
+        "invalido",
+        "e30=",  # {}
+        "WzFd",  # [1]
+        "WyJhIiwgMV0=",  # ["a", 1]
+    ])
+    def test_decode_cursor_invalido(cursor):
+        with pytest.raises(exceptions.InvalidCursorException):
+            UsuarioService.decode_cursor(cursor)
+
+
+    @staticmethod
+    @pytest.mark.parametrize("gzip", [False, True])
+    @pytest.mark.asyncio
+    async def test_exporta_usuarios_ndjson(gzip):
+
+        created_at = datetime(2021, 9, 25, 14, 48, 9)
+        users = [
+            Mock(
+                guid=uuid.uuid4(),
+                nome="Teste",
+                username=f"user{i}",
+                email=f"teste{i}@unicamp.br",
+                email_verificado=True,
+                created_at=created_at,
+                updated_at=created_at
+            )
+            for i in range(5)
+        ]
+
+        async def stream_usuarios(batch_size):
+            for i in range(0, len(users), batch_size):
+                yield users[i:i + batch_size]
+
+        user_repo_mock = Mock()
+        user_repo_mock.stream_usuarios = stream_usuarios
 
         service = UsuarioService(
             user_repo=user_repo_mock
         )
 
-        await service.get_all_users()
+        chunks = [chunk async for chunk in service.exporta_usuarios_ndjson(2, gzip)]
+        content = b''.join(chunks)
+        if gzip:
+            content = zlib.decompress(content, zlib.MAX_WBITS | 16)
+        else:
+            assert len(chunks) == 3
 
+        lines = content.decode('utf-8').splitlines()
+        assert [json.loads(line)['username'] for line in lines] == [user.username for user in users]
+        assert 'hashed_password' not in json.loads(lines[0])
@@ -0,0 +1,3 @@
+"""
+    Módulo dos testes unitários dos utilitários
+"""
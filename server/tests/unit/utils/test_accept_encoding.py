@@ -0,0 +1,32 @@
+import pytest
+from server.utils.accept_encoding import aceita_gzip, parse_accept_encoding
+
+
+class TestAcceptEncoding:
+
+    """
+        Testes da negociação da compressão pelo header Accept-Encoding
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize("accept_encoding, expected", [
+        ('', False),
+        ('gzip', True),
+        ('GZIP', True),
+        ('gzip, deflate, br', True),
+        ('deflate;q=1.0, gzip;q=0.5', True),
+        ('gzip;q=0', False),
+        ('gzip ; q=0.0, identity', False),
+        ('x-gzip', False),
+        ('*', True),
+        ('*;q=0', False),
+        ('gzip;q=0, *', False),
+        ('br, *;q=0.1', True),
+        ('gzip;q=abc', False),
+    ])
+    def test_aceita_gzip(accept_encoding, expected):
+        assert aceita_gzip(accept_encoding) == expected
+
+    @staticmethod
+    def test_parse_accept_encoding():
+        assert parse_accept_encoding('gzip;q=0.8, br') == {'gzip': 0.8, 'br': 1.0}
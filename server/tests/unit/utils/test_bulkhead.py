@@ -0,0 +1,108 @@
+import asyncio
+import json
+import pytest
+from server.configuration import exceptions
+from server.utils.bulkhead import Bulkhead
+
+
+def build_bulkhead(max_concurrent=1, max_queue=1, queue_timeout=1.0) -> Bulkhead:
+    return Bulkhead('teste', max_concurrent, max_queue, queue_timeout, retry_after=3)
+
+
+async def hold(bulkhead: Bulkhead, release: asyncio.Event):
+    async with bulkhead.acquire():
+        await release.wait()
+
+
+class TestBulkhead:
+
+    """
+        Testes do controle de admissão das operações de hashing
+    """
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_fila_cheia_rejeitada_imediatamente():
+        bulkhead = build_bulkhead(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+        tasks = [asyncio.ensure_future(hold(bulkhead, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert bulkhead.get_stats()['in_flight'] == 1
+        assert bulkhead.get_stats()['queue_depth'] == 1
+
+        with pytest.raises(exceptions.ServiceOverloadedException) as ex:
+            async with bulkhead.acquire():
+                pass
+
+        assert ex.value.status_code == 503
+        assert ex.value.headers == {'Retry-After': '3'}
+        assert bulkhead.rejected_queue_full == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert bulkhead.get_stats() == {
+            'in_flight': 0, 'queue_depth': 0, 'rejected_queue_full': 1, 'rejected_timeout': 0
+        }
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_espera_limitada_pelo_prazo():
+        bulkhead = build_bulkhead(max_concurrent=1, max_queue=5, queue_timeout=0.05)
+        release = asyncio.Event()
+        task = asyncio.ensure_future(hold(bulkhead, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(exceptions.ServiceOverloadedException):
+            async with bulkhead.acquire():
+                pass
+
+        assert bulkhead.rejected_timeout == 1
+        assert bulkhead.get_stats()['queue_depth'] == 0
+
+        release.set()
+        await task
+        assert bulkhead.get_stats()['in_flight'] == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_vaga_repassada_em_ordem():
+        bulkhead = build_bulkhead(max_concurrent=2, max_queue=10)
+        order = []
+
+        async def operation(i: int):
+            async with bulkhead.acquire():
+                order.append(i)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(operation(i) for i in range(8)))
+
+        assert order == list(range(8))
+        assert bulkhead.get_stats()['in_flight'] == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cancelamento_na_fila_libera_a_posicao():
+        bulkhead = build_bulkhead(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(hold(bulkhead, release))
+        waiting = asyncio.ensure_future(hold(bulkhead, release))
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert bulkhead.get_stats()['queue_depth'] == 0
+        release.set()
+        await holder
+        assert bulkhead.get_stats()['in_flight'] == 0
+
+    @staticmethod
+    def test_retry_after_na_resposta():
+        response = exceptions.api_base_exception_handler(
+            None, exceptions.ServiceOverloadedException(retry_after=5)
+        )
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+        assert json.loads(response.body)['error_id'] == 'SERVICE_OVERLOADED'
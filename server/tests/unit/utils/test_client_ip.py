@@ -0,0 +1,36 @@
+import pytest
+from starlette.requests import Request
+from server.utils.client_ip import get_client_ip
+
+
+def build_request(*forwarded_for: str) -> Request:
+    return Request({
+        'type': 'http',
+        'headers': [(b'x-forwarded-for', value.encode('latin-1')) for value in forwarded_for],
+        'client': ('10.1.2.3', 43210)
+    })
+
+
+class TestClientIp:
+
+    """
+        Testes da identificação do IP do cliente atrás de proxies
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize("forwarded_for, trusted_proxy_hops, expected", [
+        # Requisição direta, sem proxy à frente da API
+        ((), 0, '10.1.2.3'),
+        (('203.0.113.7',), 0, '10.1.2.3'),
+        # Atrás do router, que adiciona o IP do cliente ao final do header
+        (('203.0.113.7',), 1, '203.0.113.7'),
+        # O valor enviado pelo cliente é ignorado
+        (('1.1.1.1, 203.0.113.7',), 1, '203.0.113.7'),
+        (('1.1.1.1', '203.0.113.7'), 1, '203.0.113.7'),
+        (('1.1.1.1, 203.0.113.7, 10.0.0.5',), 2, '203.0.113.7'),
+        # Menos entradas que proxies: a mais externa
+        (('203.0.113.7',), 2, '203.0.113.7'),
+        ((), 1, '10.1.2.3'),
+    ])
+    def test_get_client_ip(forwarded_for, trusted_proxy_hops, expected):
+        assert get_client_ip(build_request(*forwarded_for), trusted_proxy_hops) == expected
@@ -0,0 +1,96 @@
+import pytest
+from fakeredis.aioredis import FakeRedis
+from mock import patch
+from server.utils.rate_limiter import InMemoryRateLimiter, RedisRateLimiter, calcula_espera
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def limiter(request):
+    if request.param == 'memory':
+        return InMemoryRateLimiter(window=60)
+    return RedisRateLimiter(FakeRedis(), window=60)
+
+
+class TestRateLimiter:
+
+    """
+        Testes do limite de tentativas por janela deslizante
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize("previous, current, elapsed, expected", [
+        (0, 3, 0, 0),
+        (4, 1, 30, 0),
+        # 6 * 0.5 + 1 = 4 > 3: aguarda o peso da janela anterior cair para 2/6
+        (6, 1, 30, 10),
+        # Janela atual acima do limite: aguarda seu fim e 1/4 da janela seguinte
+        (0, 4, 30, 45),
+    ])
+    def test_calcula_espera(previous, current, elapsed, expected):
+        assert calcula_espera(previous, current, elapsed, 60, 3) == pytest.approx(expected)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_limite_por_chave(limiter):
+        with patch('server.utils.rate_limiter.time.time', return_value=6000.0):
+            waits = [await limiter.registra([('username:user', 3)]) for _ in range(4)]
+            other_key = await limiter.registra([('username:other', 3)])
+
+        assert waits[:3] == [0, 0, 0]
+        assert waits[3] == pytest.approx(60 + 60 / 4)
+        assert other_key == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_maior_espera_entre_as_chaves(limiter):
+        with patch('server.utils.rate_limiter.time.time', return_value=6000.0):
+            for _ in range(2):
+                assert await limiter.registra([('username:user', 5), ('ip:10.0.0.1', 2)]) == 0
+            wait = await limiter.registra([('username:user', 5), ('ip:10.0.0.1', 2)])
+
+        assert wait > 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_janela_deslizante(limiter):
+        with patch('server.utils.rate_limiter.time.time', return_value=6000.0):
+            for _ in range(3):
+                await limiter.registra([('username:user', 3)])
+
+        # Na metade da janela seguinte, as 3 tentativas anteriores valem 1.5
+        with patch('server.utils.rate_limiter.time.time', return_value=6090.0):
+            assert await limiter.registra([('username:user', 3)]) == 0
+            assert await limiter.registra([('username:user', 3)]) > 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_estorno_desfaz_a_tentativa(limiter):
+        with patch('server.utils.rate_limiter.time.time', return_value=6000.0):
+            for _ in range(5):
+                assert await limiter.registra([('username:user', 2)], 6000.0) == 0
+                await limiter.estorna([('username:user', 2)], 6000.0)
+
+            for _ in range(2):
+                await limiter.registra([('username:user', 2)])
+            assert await limiter.registra([('username:user', 2)]) > 0
+
+        # Na metade da janela seguinte, as 3 tentativas anteriores valem 1.5
+        with patch('server.utils.rate_limiter.time.time', return_value=6090.0):
+            assert await limiter.registra([('username:user', 2)]) > 0
+
+            # Estorno de uma tentativa da janela anterior e da tentativa atual
+            await limiter.estorna([('username:user', 2)], 6000.0)
+            await limiter.estorna([('username:user', 2)], 6090.0)
+            await limiter.estorna([('username:other', 2)], 6090.0)
+            assert await limiter.registra([('username:user', 2)]) == 0
+            assert await limiter.registra([('username:other', 2)]) == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_quantidade_maxima_de_chaves():
+        limiter = InMemoryRateLimiter(window=60, max_keys=2)
+
+        for key in ['a', 'b', 'c']:
+            await limiter.registra([(key, 1)])
+
+        assert list(limiter.counters.keys()) == ['b', 'c']
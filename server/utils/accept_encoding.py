@@ -0,0 +1,36 @@
+from typing import Dict
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+
+    """
+        Retorna o peso (q) de cada codificação do header Accept-Encoding.
+        Codificações sem q têm peso 1; pesos inválidos são tratados como 0
+    """
+
+    codings = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+
+def aceita_gzip(accept_encoding: str) -> bool:
+
+    """
+        Indica se o cliente aceita a resposta comprimida com gzip: gzip (ou *, caso
+        gzip não seja listado) com peso maior que 0
+    """
+
+    codings = parse_accept_encoding(accept_encoding)
+    return codings.get('gzip', codings.get('*', 0.0)) > 0
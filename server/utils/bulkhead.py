@@ -0,0 +1,111 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from prometheus_client import Counter, Gauge
+from typing import AsyncIterator, Deque
+from server.configuration import exceptions
+
+
+BULKHEAD_IN_FLIGHT = Gauge(
+    'authenticator_bulkhead_in_flight',
+    'Operações em execução dentro do bulkhead',
+    ['bulkhead'],
+    multiprocess_mode='livesum'
+)
+BULKHEAD_QUEUE_DEPTH = Gauge(
+    'authenticator_bulkhead_queue_depth',
+    'Operações aguardando uma vaga no bulkhead',
+    ['bulkhead'],
+    multiprocess_mode='livesum'
+)
+BULKHEAD_REJECTIONS = Counter(
+    'authenticator_bulkhead_rejections',
+    'Operações rejeitadas pelo bulkhead, por motivo (queue_full ou timeout)',
+    ['bulkhead', 'reason']
+)
+
+
+class Bulkhead:
+
+    """
+        Limita a quantidade de operações simultâneas de um recurso caro
+        (ex.: hashing das senhas), isolando-o das demais rotas.
+
+        Até max_concurrent operações são executadas ao mesmo tempo e até max_queue
+        aguardam uma vaga por no máximo queue_timeout segundos. Com a fila cheia, ou
+        após o prazo, a operação é rejeitada com ServiceOverloadedException (503 com
+        Retry-After), em vez de acumular trabalho que só terminaria após o timeout do cliente
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int,
+                 queue_timeout: float, retry_after: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.in_flight_gauge = BULKHEAD_IN_FLIGHT.labels(name)
+        self.queue_depth_gauge = BULKHEAD_QUEUE_DEPTH.labels(name)
+
+    def rejeita(self, reason: str):
+        BULKHEAD_REJECTIONS.labels(self.name, reason).inc()
+        raise exceptions.ServiceOverloadedException(retry_after=self.retry_after)
+
+    async def aguarda_vaga(self):
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.queue_depth_gauge.set(len(self.waiters))
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as ex:
+            if waiter.done() and not waiter.cancelled():
+                # A vaga foi repassada junto com o fim do prazo (ou o cancelamento)
+                if isinstance(ex, asyncio.TimeoutError):
+                    return
+                self.libera()
+                raise
+            self.waiters.remove(waiter)
+            if isinstance(ex, asyncio.CancelledError):
+                raise
+            self.rejected_timeout += 1
+            self.rejeita('timeout')
+        finally:
+            self.queue_depth_gauge.set(len(self.waiters))
+
+    def libera(self):
+        # A vaga é repassada diretamente ao primeiro da fila, sem passar pelo contador
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+        self.in_flight_gauge.set(self.in_flight)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        if self.in_flight < self.max_concurrent and not self.waiters:
+            self.in_flight += 1
+            self.in_flight_gauge.set(self.in_flight)
+        elif len(self.waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            self.rejeita('queue_full')
+        else:
+            await self.aguarda_vaga()
+
+        try:
+            yield
+        finally:
+            self.libera()
+
+    def get_stats(self) -> dict:
+        return {
+            'in_flight': self.in_flight,
+            'queue_depth': len(self.waiters),
+            'rejected_queue_full': self.rejected_queue_full,
+            'rejected_timeout': self.rejected_timeout
+        }
@@ -0,0 +1,26 @@
+from typing import Optional
+from starlette.requests import Request
+
+
+def get_client_ip(request: Request, trusted_proxy_hops: int) -> Optional[str]:
+
+    """
+        Retorna o IP do cliente que originou a requisição.
+
+        Atrás de trusted_proxy_hops proxies (ex.: o router do Heroku), cada proxy
+        adiciona ao final do X-Forwarded-For o IP de quem se conectou a ele. O IP
+        do cliente é o adicionado pelo proxy mais externo, na posição trusted_proxy_hops
+        a partir do fim: as posições anteriores são enviadas pelo próprio cliente e
+        não são confiáveis. Sem proxies (trusted_proxy_hops igual a 0), o header é ignorado
+    """
+
+    if trusted_proxy_hops > 0:
+        forwarded_for = [
+            ip.strip()
+            for header in request.headers.getlist('x-forwarded-for')
+            for ip in header.split(',')
+            if ip.strip()
+        ]
+        if forwarded_for:
+            return forwarded_for[-min(trusted_proxy_hops, len(forwarded_for))]
+    return request.client.host if request.client else None
@@ -0,0 +1,129 @@
+import time
+import aioredis
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+def calcula_espera(previous: int, current: int, elapsed: float, window: float, limit: int) -> float:
+    """
+        Janela deslizante aproximada por duas janelas fixas: a quantidade de tentativas
+        na última janela é estimada como previous * (1 - elapsed / window) + current,
+        em que elapsed é o tempo decorrido desde o início da janela atual.
+
+        Retorna 0 caso a estimativa (já com a tentativa atual) não exceda o limite
+        ou, caso contrário, quantos segundos faltam para que ela fique abaixo do limite
+    """
+    if previous * (1 - elapsed / window) + current <= limit:
+        return 0.0
+    if current <= limit:
+        # Aguarda o peso da janela anterior diminuir
+        return max(0.0, (1 - (limit - current) / previous) * window - elapsed)
+    # Aguarda o fim da janela atual, que passa a ser a anterior
+    return (window - elapsed) + (1 - limit / current) * window
+
+
+class InMemoryRateLimiter:
+
+    """
+        Limitador de tentativas em memória, válido apenas para o processo atual.
+        São mantidas no máximo max_keys chaves: as menos usadas são descartadas
+    """
+
+    def __init__(self, window: float, max_keys: int = 100000):
+        self.window = window
+        self.max_keys = max_keys
+        self.counters: 'OrderedDict[str, List[int]]' = OrderedDict()
+
+    def get_counter(self, key: str, index: int) -> List[int]:
+        # [janela atual, tentativas da janela anterior, tentativas da janela atual]
+        counter = self.counters.get(key)
+        if counter is None:
+            return [index, 0, 0]
+        if counter[0] != index:
+            counter[1] = counter[2] if counter[0] == index - 1 else 0
+            counter[0], counter[2] = index, 0
+        return counter
+
+    async def registra(self, keys: List[Tuple[str, int]], now: Optional[float] = None) -> float:
+        """
+            Registra uma tentativa em cada chave, no instante now (por padrão, o atual), e
+            retorna 0 caso todas estejam dentro do seu limite ou, caso contrário, o maior
+            tempo de espera, em segundos
+        """
+        now = time.time() if now is None else now
+        index = int(now // self.window)
+        elapsed = now - index * self.window
+        wait = 0.0
+        for key, limit in keys:
+            counter = self.counters[key] = self.get_counter(key, index)
+            self.counters.move_to_end(key)
+            counter[2] += 1
+            wait = max(wait, calcula_espera(counter[1], counter[2], elapsed, self.window, limit))
+
+        while len(self.counters) > self.max_keys:
+            self.counters.popitem(last=False)
+        return wait
+
+    async def estorna(self, keys: List[Tuple[str, int]], now: float):
+        """
+            Desfaz a tentativa registrada em cada chave no instante now
+        """
+        index = int(now // self.window)
+        for key, _ in keys:
+            counter = self.counters.get(key)
+            if counter is None:
+                continue
+            # A tentativa pode já ter passado para a janela anterior
+            if counter[0] == index and counter[2] > 0:
+                counter[2] -= 1
+            elif counter[0] == index + 1 and counter[1] > 0:
+                counter[1] -= 1
+
+
+# Decrementa apenas os contadores que ainda existem: um contador já expirado
+# não deve ser recriado, negativo e sem expiração
+
+ESTORNA_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        redis.call('decr', key)
+    end
+end
+return 0
+"""
+
+
+class RedisRateLimiter:
+
+    """
+        Limitador de tentativas compartilhado pelos processos, no Redis. Cada chave
+        utiliza um contador por janela fixa, que expira após duas janelas. Todas as
+        chaves de uma tentativa são registradas em um único round trip
+    """
+
+    def __init__(self, redis: aioredis.Redis, window: int, key_prefix: str = 'authenticator:throttle:'):
+        self.redis = redis
+        self.window = window
+        self.key_prefix = key_prefix
+        self.estorna_script = redis.register_script(ESTORNA_SCRIPT)
+
+    async def registra(self, keys: List[Tuple[str, int]], now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        index = int(now // self.window)
+        elapsed = now - index * self.window
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key, _ in keys:
+                current_key = f"{self.key_prefix}{key}:{index}"
+                pipe.incr(current_key).expire(current_key, 2 * self.window).get(f"{self.key_prefix}{key}:{index - 1}")
+            result = await pipe.execute()
+
+        wait = 0.0
+        for i, (_, limit) in enumerate(keys):
+            current, _, previous = result[3 * i:3 * i + 3]
+            wait = max(wait, calcula_espera(int(previous or 0), current, elapsed, self.window, limit))
+        return wait
+
+    async def estorna(self, keys: List[Tuple[str, int]], now: float):
+        index = int(now // self.window)
+        await self.estorna_script(keys=[f"{self.key_prefix}{key}:{index}" for key, _ in keys])
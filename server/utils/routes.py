@@ -0,0 +1,31 @@
+from typing import Dict
+
+
+_ROUTE_PATHS_BY_ENDPOINT: Dict[int, str] = {}
+
+
+def get_route_path(scope: dict) -> str:
+    """
+        Retorna o template da rota atendida (ex.: /users/{guid_usuario}),
+        em vez do path bruto da requisição.
+
+        Só é possível identificar a rota após o roteamento. Antes disso,
+        ou caso nenhuma rota tenha sido encontrada, retorna o path bruto
+    """
+
+    endpoint = scope.get('endpoint')
+    if endpoint is None:
+        return scope.get('path', '')
+
+    route_path = _ROUTE_PATHS_BY_ENDPOINT.get(id(endpoint))
+    if route_path is None:
+        app = scope.get('app')
+        for route in getattr(app, 'routes', []):
+            if getattr(route, 'endpoint', None) is endpoint:
+                route_path = route.path
+                break
+        else:
+            return scope.get('path', '')
+        _ROUTE_PATHS_BY_ENDPOINT[id(endpoint)] = route_path
+
+    return route_path